@@ -1,9 +1,31 @@
 # feature_engineering.py - FIXED VERSION
 
+import importlib.util
+import os
+
 import numpy as np
 import pandas as pd
 
 
+# Shared O(n) rolling kernel lives with the pattern finder. Load it by
+# file path so the MLFolder scripts run from their own directory
+# without touching sys.path (MLFolder/config.py would shadow the
+# pattern finder's config if both were on it).
+def _load_rolling():
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "pattern_finder", "rolling.py"
+    )
+    spec = importlib.util.spec_from_file_location("_pattern_finder_rolling", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_rolling = _load_rolling()
+rolling_stats = _rolling.rolling_stats
+rolling_mean = _rolling.rolling_mean
+
+
 def add_features(df):
     """
     Add engineered features for congestion prediction.
@@ -30,14 +52,17 @@ def add_features(df):
     df["late_rate"] = df["late_rate"].clip(0, 1)
     
     # Rolling statistics on traffic
-    # FIX 3: Use min_periods to handle edge cases
-    df["traffic_mean"] = df["traffic_kbits"].rolling(window=5, min_periods=1).mean()
-    df["traffic_std"] = df["traffic_kbits"].rolling(window=5, min_periods=1).std().fillna(0)
-    df["traffic_max"] = df["traffic_kbits"].rolling(window=5, min_periods=1).max()
+    # FIX 3: Partial windows at the start (min_periods=1 semantics)
+    # One cumulative-sum pass shared by mean / std, O(n) sliding max
+    traffic = df["traffic_kbits"].to_numpy(dtype=float)
+    stats = rolling_stats(traffic, 5, stats=("mean", "std", "max"))
+    df["traffic_mean"] = stats["mean"]
+    df["traffic_std"] = stats["std"]
+    df["traffic_max"] = stats["max"]
     
     # Delta and growth features
     df["traffic_delta"] = df["traffic_kbits"].diff().fillna(0)
-    df["traffic_growth"] = df["traffic_delta"].rolling(window=3, min_periods=1).mean().fillna(0)
+    df["traffic_growth"] = rolling_mean(df["traffic_delta"].to_numpy(dtype=float), 3)
     
     # FIX 4: Additional useful features
     df["packet_rate"] = df["txPackets"] + df["rxPackets"]
@@ -1,8 +1,28 @@
-from flask import Flask, jsonify
+# Shares the pattern finder's config; run from the repo root with it
+# on the path:
+#   PYTHONPATH=pattern_finder python api_server.py
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-import json
+import gzip
+import hashlib
+import math
 import os
-from datetime import datetime
+import threading
+import numpy as np
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+from config import (
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP,
+    TRAFFIC_DEFAULT_POINTS,
+    TRAFFIC_MAX_POINTS
+)
+from snapshot_store import SnapshotStore
 
 # -------------------------------
 # Path Resolution (OS Safe)
@@ -13,11 +33,143 @@ OUTPUT_DIR = os.path.join(BASE_DIR, "pattern_finder", "outputs")
 TOPOLOGY_PATH = os.path.join(OUTPUT_DIR, "topology.json")
 TRAFFIC_PATH = os.path.join(OUTPUT_DIR, "traffic.json")  # Optional / future use
 
+# -------------------------------
+# Run snapshots (written by the FastAPI engine)
+# -------------------------------
+STORE = SnapshotStore(
+    os.path.join(BASE_DIR, "pattern_finder", SNAPSHOT_DIR), keep=SNAPSHOT_KEEP
+)
+_SNAPSHOT = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def current_snapshot():
+    """
+    Snapshot named by the store's CURRENT pointer, mapped once per
+    version (one stat call per request otherwise); None before the
+    first run is published
+    """
+    global _SNAPSHOT
+    version = STORE.current_version()
+    snapshot = _SNAPSHOT
+
+    if version is None or (snapshot and snapshot["version"] == version):
+        return snapshot
+
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None or _SNAPSHOT["version"] != version:
+            loaded = STORE.load(version)
+            if loaded is not None:
+                _SNAPSHOT = loaded
+        return _SNAPSHOT
+
+# -------------------------------
+# Encoded file cache
+# -------------------------------
+class EncodedFileCache:
+    """
+    Keeps each JSON file's bytes plus gzip / brotli variants, keyed by
+    (mtime, size). A request for an unchanged file costs one stat call;
+    the file is only re-read and re-compressed after it is rewritten.
+    """
+
+    def __init__(self, gzip_level=6, brotli_quality=5):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        Returns the cache entry for path, or None if it does not exist
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        key = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry["key"] == key:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["key"] != key:
+                entry = self._load(path, key, st.st_mtime)
+                self._entries[path] = entry
+
+        return entry
+
+    def _load(self, path, key, mtime):
+        with open(path, "rb") as f:
+            body = f.read()
+
+        variants = {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=self.gzip_level)
+        }
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=self.brotli_quality)
+
+        return {
+            "key": key,
+            "etag": hashlib.sha1(body).hexdigest(),
+            "last_modified": datetime.fromtimestamp(int(mtime), tz=timezone.utc),
+            "variants": variants
+        }
+
+
+FILE_CACHE = EncodedFileCache()
+
+
+def cached_json_response(entry):
+    """
+    Serves a cache entry with ETag / Last-Modified validation (304 for
+    unchanged polls) and the best encoding the client accepts
+    """
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(entry["etag"])
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and entry["last_modified"] <= since
+
+    if not_modified:
+        response = Response(status=304)
+    else:
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in entry["variants"] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        response = Response(
+            entry["variants"][encoding], mimetype="application/json"
+        )
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(entry["etag"])
+    response.last_modified = entry["last_modified"]
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
 # -------------------------------
 # Flask App
 # -------------------------------
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=[
+    "ETag",
+    "X-Series-Link",
+    "X-Series-Shape",
+    "X-Series-Columns",
+    "X-Series-Resolution",
+    "X-Series-Bucket-Sec",
+    "X-Series-Start",
+    "X-Series-End"
+])
 
 # -------------------------------
 # Health Check
@@ -36,16 +188,14 @@ def health_check():
 # -------------------------------
 @app.route("/api/topology", methods=["GET"])
 def get_topology():
-    if not os.path.exists(TOPOLOGY_PATH):
+    entry = FILE_CACHE.get(TOPOLOGY_PATH)
+    if entry is None:
         return jsonify({
             "error": "Topology not generated yet",
             "hint": "Run pattern_finder/main.py to generate topology.json"
         }), 404
 
-    with open(TOPOLOGY_PATH, "r") as f:
-        data = json.load(f)
-
-    return jsonify(data)
+    return cached_json_response(entry)
 
 
 # -------------------------------
@@ -57,16 +207,120 @@ def get_traffic():
     Returns time-series traffic / loss data for heatmap
     This can be generated by pattern_finder later
     """
-    if not os.path.exists(TRAFFIC_PATH):
+    entry = FILE_CACHE.get(TRAFFIC_PATH)
+    if entry is None:
         return jsonify({
             "warning": "Traffic data not available yet",
             "traffic": []
         }), 200
 
-    with open(TRAFFIC_PATH, "r") as f:
-        data = json.load(f)
+    return cached_json_response(entry)
+
+
+# -------------------------------
+# Link Traffic Endpoint
+# -------------------------------
+@app.route("/api/links/<link_id>/traffic", methods=["GET"])
+def get_link_traffic(link_id):
+    """
+    Link traffic (Gbps) for a time range, sliced from the current
+    snapshot's rollup tiers
+
+    resolution: raw | 1ms | 10ms | 100ms | 1s | auto
+    start / end: seconds from capture start
+    points: client point budget; larger ranges are downsampled
+    method: lttb | minmax
+    rolling: trailing window (buckets) for rolling mean / std / max
+    rolling_of: mean | max, the column rolling mean / std run over
+
+    Accept: application/octet-stream returns the columns as one
+    little-endian float32 body of shape (columns, points), described
+    by the X-Series-* headers
+    """
+    snapshot = current_snapshot()
+    pyramid = snapshot["artifacts"]["rollups"].get(link_id) if snapshot else None
+    if pyramid is None:
+        return jsonify({"error": f"No traffic for {link_id}"}), 404
+
+    try:
+        start = float(request.args.get("start", 0.0))
+        end = request.args.get("end")
+        end = float(end) if end is not None else None
+        points = request.args.get("points")
+        points = int(points) if points is not None else None
+        rolling = request.args.get("rolling")
+        rolling = int(rolling) if rolling is not None else None
+    except ValueError:
+        return jsonify({"error": "start / end / points / rolling must be numbers"}), 400
 
-    return jsonify(data)
+    if points is not None and points < 3:
+        return jsonify({"error": "points must be >= 3"}), 400
+
+    if points is not None and points > TRAFFIC_MAX_POINTS:
+        return jsonify({"error": f"points must be <= {TRAFFIC_MAX_POINTS}"}), 413
+
+    method = request.args.get("method", "lttb")
+    if method not in ("lttb", "minmax"):
+        return jsonify({"error": "method must be lttb or minmax"}), 400
+
+    if rolling is not None and rolling < 1:
+        return jsonify({"error": "rolling must be >= 1"}), 400
+
+    rolling_of = request.args.get("rolling_of", "mean")
+    if rolling_of not in ("mean", "max"):
+        return jsonify({"error": "rolling_of must be mean or max"}), 400
+
+    capture_end = pyramid.length * pyramid.slot_sec
+    end = capture_end if end is None else min(end, capture_end)
+    start = max(start, 0.0)
+
+    resolution = request.args.get("resolution", "auto")
+    if resolution == "auto":
+        resolution = pyramid.pick_level(
+            start, end, points or TRAFFIC_DEFAULT_POINTS
+        )
+
+    if resolution not in pyramid.levels:
+        return jsonify({
+            "error": f"resolution must be one of {pyramid.levels + ['auto']}"
+        }), 400
+
+    buckets = math.ceil(max(end - start, 0.0) / pyramid.bucket_sec(resolution))
+    if points is None and buckets > TRAFFIC_MAX_POINTS:
+        return jsonify({
+            "error": (
+                f"{buckets} {resolution} buckets requested, limit is "
+                f"{TRAFFIC_MAX_POINTS}; narrow the range, pick a coarser "
+                f"resolution or pass points"
+            )
+        }), 413
+
+    media = request.accept_mimetypes.best_match(
+        ["application/json", "application/octet-stream"]
+    )
+    if media == "application/octet-stream":
+        meta, columns = pyramid.query_arrays(
+            resolution, start, end, points=points, method=method,
+            rolling=rolling, rolling_of=rolling_of
+        )
+        body = np.asarray(list(columns.values()), dtype="<f4")
+        return Response(body.tobytes(), mimetype=media, headers={
+            "X-Series-Link": link_id,
+            "X-Series-Shape": ",".join(map(str, body.shape)),
+            "X-Series-Columns": ",".join(columns),
+            "X-Series-Resolution": meta["resolution"],
+            "X-Series-Bucket-Sec": str(meta["bucket_sec"]),
+            "X-Series-Start": str(meta["start"]),
+            "X-Series-End": str(meta["end"])
+        })
+
+    return jsonify({
+        "link": link_id,
+        **pyramid.query(
+            resolution, start, end, points=points, method=method,
+            rolling=rolling, rolling_of=rolling_of
+        )
+    })
 
 
 # -------------------------------
@@ -76,7 +330,8 @@ if __name__ == "__main__":
     print("🚀 Nokia Fronthaul Backend API")
     print("📡 Health:   http://localhost:5000/api/health")
     print("🧠 Topology: http://localhost:5000/api/topology")
-    print("📈 Traffic:  http://localhost:5000/api/traffic\n")
+    print("📈 Traffic:  http://localhost:5000/api/traffic")
+    print("🔗 Link:     http://localhost:5000/api/links/<id>/traffic\n")
 
     app.run(host="0.0.0.0", port=5000, debug=True)
     print(app.url_map)
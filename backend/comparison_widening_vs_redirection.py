@@ -0,0 +1,106 @@
+# Run from the repo root with the pattern finder on the path:
+#   PYTHONPATH=pattern_finder python backend/comparison_widening_vs_redirection.py
+import json
+import os
+import sys
+import time
+
+from traffic_simulator import (
+    TrafficSimulator,
+    cell_demand_from_handler,
+    widen,
+    redirect
+)
+from data_handler import RawFileDataHandler
+
+
+PATTERN_FINDER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "pattern_finder"
+)
+TOPOLOGY_PATH = os.path.join(PATTERN_FINDER_DIR, "outputs", "topology.json")
+DATA_DIR = os.path.join(PATTERN_FINDER_DIR, "..", "data", "raw")
+
+WIDEN_FACTORS = (1.1, 1.25, 1.5, 2.0)
+
+
+def load_topology(path):
+    with open(path) as f:
+        topology = json.load(f)
+
+    link_map = {l["id"]: l["cells"] for l in topology["links"]}
+    capacity = {
+        l["id"]: l.get("capacity", {}).get("safe_gbps") or 0.0
+        for l in topology["links"]
+    }
+    return link_map, capacity
+
+
+def build_scenarios(link_map, capacity):
+    """
+    Baseline, every link widened by WIDEN_FACTORS, and every cell
+    redirected to every other link
+    """
+    scenarios = [{"name": "baseline", "capacity": {}, "moves": []}]
+
+    for link, gbps in capacity.items():
+        for factor in WIDEN_FACTORS:
+            scenarios.append(widen(f"widen {link} x{factor}", link, gbps * factor))
+
+    for link, cells in link_map.items():
+        for cell in cells:
+            for target in link_map:
+                if target != link:
+                    scenarios.append(
+                        redirect(f"move cell {cell} -> {target}", cell, target)
+                    )
+
+    return scenarios
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else TOPOLOGY_PATH
+    if not os.path.exists(path):
+        print(f"Topology not found at {path}; run pattern_finder/main.py first")
+        return
+
+    link_map, capacity = load_topology(path)
+    cells = [c for members in link_map.values() for c in members]
+
+    handler = RawFileDataHandler(DATA_DIR)
+    demand = cell_demand_from_handler(handler, cells)
+
+    scenarios = build_scenarios(link_map, capacity)
+
+    start = time.time()
+    simulator = TrafficSimulator(link_map, cells, demand, capacity)
+    results = simulator.evaluate(scenarios)
+    elapsed = time.time() - start
+
+    print(f"Evaluated {len(results)} scenarios in {elapsed:.2f}s")
+
+    baseline = results[0]
+    print(f"\nBaseline loss: {baseline['loss_fraction']:.4%}, "
+          f"max utilisation: {baseline['max_utilisation']}")
+
+    ranked = sorted(
+        results[1:],
+        key=lambda r: (r["loss_fraction"], r["max_utilisation"] or 0)
+    )
+
+    print("\nBest mitigations:")
+    for r in ranked[:10]:
+        print(f"  {r['name']:<32} loss {r['loss_fraction']:.4%}  "
+              f"max util {r['max_utilisation']}")
+
+    widening = [r for r in ranked if r["name"].startswith("widen")]
+    redirection = [r for r in ranked if r["name"].startswith("move")]
+
+    if widening and redirection:
+        print("\nBest widening:     ", widening[0]["name"],
+              f"({widening[0]['loss_fraction']:.4%})")
+        print("Best redirection:  ", redirection[0]["name"],
+              f"({redirection[0]['loss_fraction']:.4%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+PATTERN_FINDER_DIR = os.path.join(ROOT_DIR, "pattern_finder")
+REPORT_DIR = os.path.join(PATTERN_FINDER_DIR, "outputs", "loadtest")
+
+# Endpoint mixes: (name, server, weight). Paths are built per request
+# by make_path, so traffic requests hit random links and ranges.
+SCENARIOS = {
+    # Dashboard tab: topology polls plus chart slices
+    "dashboard": [
+        ("flask topology", "flask", 6),
+        ("flask traffic 1s", "flask", 2),
+        ("flask traffic 100ms", "flask", 1),
+        ("fastapi topology", "fastapi", 2),
+        ("fastapi traffic auto", "fastapi", 2),
+        ("fastapi traffic binary", "fastapi", 1),
+    ],
+    "topology": [
+        ("flask topology", "flask", 1),
+        ("fastapi topology", "fastapi", 1),
+    ],
+    "traffic": [
+        ("flask traffic 1s", "flask", 1),
+        ("flask traffic 100ms", "flask", 1),
+        ("fastapi traffic auto", "fastapi", 1),
+        ("fastapi traffic window", "fastapi", 1),
+        ("fastapi traffic binary", "fastapi", 1),
+    ],
+    # Cached /api/run: cache lookup, snapshot switch and JSON encoding
+    "run": [
+        ("fastapi run", "fastapi", 1),
+    ],
+}
+
+
+# ----------------------------
+# Servers
+# ----------------------------
+def start_servers(fastapi_port, flask_port, workers):
+    """
+    FastAPI (uvicorn) from pattern_finder/ and Flask (threaded, no
+    reloader) from the repo root; returns the processes
+    """
+    fastapi = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "api:app",
+            "--port", str(fastapi_port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=PATTERN_FINDER_DIR,
+    )
+    flask = subprocess.Popen(
+        [
+            sys.executable, "-c",
+            "import logging, api_server;"
+            "logging.getLogger('werkzeug').setLevel(logging.WARNING);"
+            f"api_server.app.run(port={flask_port}, threaded=True)",
+        ],
+        cwd=ROOT_DIR,
+        env={**os.environ, "PYTHONPATH": PATTERN_FINDER_DIR},
+    )
+    return [fastapi, flask]
+
+
+def wait_ready(host, port, path, timeout):
+    """
+    Polls path until it answers 200 (the first FastAPI request may
+    wait for a full engine run)
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+
+    raise RuntimeError(f"{host}:{port}{path} not ready after {timeout}s")
+
+
+def fetch_json(host, port, path):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    conn.request("GET", path)
+    body = conn.getresponse().read()
+    conn.close()
+    return json.loads(body)
+
+
+# ----------------------------
+# Clients
+# ----------------------------
+def make_path(name, links, duration_sec, rng):
+    link = rng.choice(links)
+
+    if name.endswith("topology"):
+        return "/api/topology", {}
+    if name == "fastapi run":
+        return "/api/run", {}
+    if name == "flask traffic 1s":
+        return f"/api/links/{link}/traffic?resolution=1s", {}
+    if name == "flask traffic 100ms":
+        start = rng.uniform(0, max(duration_sec - 10, 0))
+        return f"/api/links/{link}/traffic?resolution=100ms&start={start:.3f}&end={start + 10:.3f}", {}
+    if name == "fastapi traffic auto":
+        return f"/api/links/{link}/traffic", {}
+    if name == "fastapi traffic window":
+        start = rng.uniform(0, max(duration_sec - 2, 0))
+        return f"/api/links/{link}/traffic?start={start:.3f}&end={start + 2:.3f}&rolling=20", {}
+    if name == "fastapi traffic binary":
+        return (
+            f"/api/links/{link}/traffic?points=1000",
+            {"Accept": "application/octet-stream"}
+        )
+
+    raise ValueError(name)
+
+
+class Client(threading.Thread):
+    """
+    One simulated dashboard: keep-alive connection per server, picks
+    endpoints by weight until the deadline. With `conditional`, it
+    revalidates with If-None-Match like a browser cache would.
+    """
+
+    def __init__(self, seed, targets, mix, links, duration_sec, deadline,
+                 think_sec, conditional):
+        super().__init__(daemon=True)
+        self.rng = random.Random(seed)
+        self.targets = targets
+        self.mix = mix
+        self.links = links
+        self.duration_sec = duration_sec
+        self.deadline = deadline
+        self.think_sec = think_sec
+        self.conditional = conditional
+        self.samples = []
+        self.etags = {}
+        self.conns = {}
+
+    def _conn(self, server):
+        if server not in self.conns:
+            host, port = self.targets[server]
+            self.conns[server] = http.client.HTTPConnection(host, port, timeout=60)
+        return self.conns[server]
+
+    def run(self):
+        names = [m[0] for m in self.mix]
+        servers = dict((m[0], m[1]) for m in self.mix)
+        weights = [m[2] for m in self.mix]
+
+        while time.time() < self.deadline:
+            name = self.rng.choices(names, weights)[0]
+            server = servers[name]
+            path, headers = make_path(name, self.links, self.duration_sec, self.rng)
+            headers = dict(headers, **{"Accept-Encoding": "gzip"})
+            if self.conditional and (server, path) in self.etags:
+                headers["If-None-Match"] = self.etags[(server, path)]
+
+            start = time.perf_counter()
+            try:
+                conn = self._conn(server)
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                status = response.status
+                etag = response.getheader("ETag")
+            except (OSError, http.client.HTTPException):
+                self.conns.pop(server, None)
+                body, status, etag = b"", 0, None
+            elapsed = time.perf_counter() - start
+
+            if etag:
+                self.etags[(server, path)] = etag
+            self.samples.append((name, status, elapsed, len(body)))
+
+            if self.think_sec:
+                time.sleep(self.think_sec)
+
+
+# ----------------------------
+# Report
+# ----------------------------
+def summarize(samples, wall_sec):
+    latencies = np.array([s[2] for s in samples]) * 1000
+    ok = [s for s in samples if s[1] in (200, 202, 304)]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "not_modified": sum(1 for s in samples if s[1] == 304),
+        "throughput_rps": round(len(samples) / wall_sec, 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(latencies.max()), 2) if len(latencies) else 0.0,
+        "mean_bytes": int(np.mean([s[3] for s in samples])) if samples else 0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """
+    Prints throughput / p95 change per endpoint against an older report
+    """
+    print(f"\nAgainst {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for name, now in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        print(
+            f"  {name:<26} rps {before['throughput_rps']:>8} -> {now['throughput_rps']:<8}"
+            f" p95 {before['p95_ms']:>8} -> {now['p95_ms']} ms"
+        )
+
+
+def print_table(report):
+    print(f"\n{'endpoint':<26} {'reqs':>6} {'err':>4} {'rps':>8} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'bytes':>9}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        print(f"{name:<26} {s['requests']:>6} {s['errors']:>4} {s['throughput_rps']:>8} "
+              f"{s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8} {s['mean_bytes']:>9}")
+
+
+# ----------------------------
+# Main
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Concurrent HTTP load against the FastAPI and Flask services"
+    )
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="dashboard")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="pause between one client's requests (s)")
+    parser.add_argument("--conditional", action="store_true",
+                        help="revalidate with If-None-Match like a browser")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--fastapi-port", type=int, default=8010)
+    parser.add_argument("--flask-port", type=int, default=5010)
+    parser.add_argument("--no-start", action="store_true",
+                        help="target servers that are already running")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="report path (default outputs/loadtest/)")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    targets = {"fastapi": (host, args.fastapi_port), "flask": (host, args.flask_port)}
+    processes = [] if args.no_start else start_servers(
+        args.fastapi_port, args.flask_port, args.workers
+    )
+
+    try:
+        # FastAPI first: its initial run also writes the topology and
+        # series files Flask serves
+        wait_ready(host, args.fastapi_port, "/api/topology", args.ready_timeout)
+        wait_ready(host, args.flask_port, "/api/topology", args.ready_timeout)
+
+        topology = fetch_json(host, args.fastapi_port, "/api/topology")
+        links = [link["id"] for link in topology["links"]]
+        series = topology["links"][0].get("series", {})
+        duration_sec = series.get("length", 0) * 0.0005 or 45.0
+
+        mix = SCENARIOS[args.scenario]
+        deadline = time.time() + args.duration
+        clients = [
+            Client(args.seed + i, targets, mix, links, duration_sec, deadline,
+                   args.think, args.conditional)
+            for i in range(args.clients)
+        ]
+
+        print(f"Running '{args.scenario}' with {args.clients} clients for {args.duration:.0f}s")
+        start = time.time()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        wall_sec = time.time() - start
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+    samples = [s for client in clients for s in client.samples]
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "scenario": args.scenario,
+            "clients": args.clients,
+            "duration_sec": args.duration,
+            "think_sec": args.think,
+            "conditional": args.conditional,
+            "workers": args.workers,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "wall_sec": round(wall_sec, 3),
+        "total": summarize(samples, wall_sec),
+        "endpoints": {
+            name: summarize([s for s in samples if s[0] == name], wall_sec)
+            for name, _, _ in mix
+        },
+    }
+
+    print_table(report)
+
+    output = args.output or os.path.join(
+        REPORT_DIR,
+        f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit'] or 'nogit'}-{args.scenario}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# Uses the pattern finder's FIFO kernel and config; run with it on
+# the path, e.g. from the repo root:
+#   PYTHONPATH=pattern_finder python backend/comparison_widening_vs_redirection.py
+import numpy as np
+
+from config import (
+    SLOT_SEC,
+    BUFFER_SYMBOLS,
+    SYMBOLS_PER_SLOT,
+    SIMULATOR_MAX_ELEMENTS
+)
+from buffer_simulator import simulate_fifo
+
+
+# ----------------------------
+# Scenario helpers
+# ----------------------------
+def widen(name, link, gbps):
+    """
+    Scenario: provision `link` at `gbps`
+    """
+    return {"name": name, "capacity": {link: gbps}, "moves": []}
+
+
+def redirect(name, cell, to_link):
+    """
+    Scenario: carry `cell` on `to_link` instead of its inferred link
+    """
+    return {"name": name, "capacity": {}, "moves": [(cell, to_link)]}
+
+
+def cell_demand_from_handler(handler, cells, slot_sec=SLOT_SEC, bytes_per_packet=1500):
+    """
+    cells x slots demand matrix (Gbps), aligned to the shortest cell
+    """
+    rows = [np.asarray(handler.get_tx_series(c), dtype=float) for c in cells]
+    min_len = min(len(r) for r in rows) if rows else 0
+    packets = np.vstack([r[:min_len] for r in rows]) if rows else np.zeros((0, 0))
+    return (packets * bytes_per_packet * 8) / (slot_sec * 1e9)
+
+
+# ----------------------------
+# Simulator
+# ----------------------------
+class TrafficSimulator:
+    """
+    Batch what-if evaluation of fronthaul mitigations
+
+    Scenarios change link capacities and/or move cells between links.
+    Each scenario becomes one links x cells assignment matrix, so all
+    link loads come from a single (scenario x link x cell) @
+    (cell x time) product. Loss then runs through one simulate_fifo
+    call over every (scenario, link) row; scenarios are processed in
+    batches that keep the load tensor under max_elements.
+
+    Every link buffers buffer_symbols radio symbols' worth of data at
+    its own rate, the same buffer model as LinkCapacityEstimator.
+    """
+
+    def __init__(
+        self,
+        link_map,
+        cells,
+        demand_gbps,
+        capacity_gbps,
+        slot_sec=SLOT_SEC,
+        buffer_symbols=BUFFER_SYMBOLS,
+        symbols_per_slot=SYMBOLS_PER_SLOT,
+        max_elements=SIMULATOR_MAX_ELEMENTS
+    ):
+        self.links = list(link_map)
+        self.cells = [str(c) for c in cells]
+        self.link_map = {l: [str(c) for c in link_map[l]] for l in self.links}
+        self.demand = np.asarray(demand_gbps, dtype=float)
+        self.capacity = np.array(
+            [float(capacity_gbps.get(l, 0.0)) for l in self.links]
+        )
+        self.slot_sec = slot_sec
+        self.buffer_symbols = buffer_symbols
+        self.symbols_per_slot = symbols_per_slot
+        self.max_elements = max_elements
+
+        self._col = {c: j for j, c in enumerate(self.cells)}
+        self._row = {l: i for i, l in enumerate(self.links)}
+
+        self.base_assignment = np.zeros((len(self.links), len(self.cells)))
+        for link, members in self.link_map.items():
+            for cell in members:
+                if cell in self._col:
+                    self.base_assignment[self._row[link], self._col[cell]] = 1
+
+    @property
+    def buffer_sec(self):
+        return self.buffer_symbols * self.slot_sec / self.symbols_per_slot
+
+    # ----------------------------
+    # Scenario tensors
+    # ----------------------------
+    def _tensors(self, scenarios):
+        n = len(scenarios)
+        assignment = np.repeat(self.base_assignment[None], n, axis=0)
+        capacity = np.repeat(self.capacity[None], n, axis=0)
+
+        for s, scenario in enumerate(scenarios):
+            for link, gbps in scenario.get("capacity", {}).items():
+                capacity[s, self._row[link]] = gbps
+
+            for cell, to_link in scenario.get("moves", []):
+                j = self._col[str(cell)]
+                assignment[s, :, j] = 0
+                assignment[s, self._row[to_link], j] = 1
+
+        return assignment, capacity
+
+    def _evaluate_batch(self, scenarios):
+        assignment, capacity = self._tensors(scenarios)
+        n, n_links = capacity.shape
+
+        load = assignment @ self.demand                   # (S, L, T)
+        steps = load.shape[-1]
+
+        volume = load.reshape(n * n_links, steps) * self.slot_sec
+        rate = capacity.reshape(n * n_links, 1)
+
+        # Unprovisioned links never drop (no capacity to compare against)
+        rate = np.where(rate > 0, rate, np.inf)
+        buffer_size = np.where(np.isfinite(rate), rate * self.buffer_sec, np.inf)
+
+        dropped = simulate_fifo(volume, rate * self.slot_sec, buffer_size)
+        dropped = dropped.reshape(n, n_links)
+
+        offered = volume.sum(axis=1).reshape(n, n_links)
+        peak = load.max(axis=2) if steps else np.zeros((n, n_links))
+
+        return load, capacity, peak, offered, dropped
+
+    def evaluate(self, scenarios):
+        """
+        Returns one result dict per scenario:
+        {name, links: {link: {...}}, max_utilisation, loss_fraction}
+        """
+        per_scenario = max(1, len(self.links) * self.demand.shape[1])
+        batch = max(1, self.max_elements // per_scenario)
+        results = []
+
+        for start in range(0, len(scenarios), batch):
+            chunk = scenarios[start:start + batch]
+            _, capacity, peak, offered, dropped = self._evaluate_batch(chunk)
+
+            utilisation = np.divide(
+                peak, capacity, out=np.full_like(peak, np.nan), where=capacity > 0
+            )
+            link_loss = np.divide(
+                dropped, offered, out=np.zeros_like(dropped), where=offered > 0
+            )
+            total_offered = offered.sum(axis=1)
+            total_loss = np.divide(
+                dropped.sum(axis=1), total_offered,
+                out=np.zeros_like(total_offered), where=total_offered > 0
+            )
+
+            for s, scenario in enumerate(chunk):
+                results.append({
+                    "name": scenario.get("name", f"scenario_{start + s}"),
+                    "links": {
+                        link: {
+                            "capacity_gbps": round(float(capacity[s, i]), 3),
+                            "peak_gbps": round(float(peak[s, i]), 3),
+                            "peak_utilisation": (
+                                None if np.isnan(utilisation[s, i])
+                                else round(float(utilisation[s, i]), 4)
+                            ),
+                            "loss_fraction": round(float(link_loss[s, i]), 6)
+                        }
+                        for i, link in enumerate(self.links)
+                    },
+                    "max_utilisation": round(float(np.nanmax(utilisation[s])), 4)
+                    if np.isfinite(utilisation[s]).any() else None,
+                    "loss_fraction": round(float(total_loss[s]), 6)
+                })
+
+        return results
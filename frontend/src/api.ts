@@ -1,4 +1,11 @@
-export const API_URL = "http://localhost:5000/api/topology"
+export const API_BASE = "http://localhost:5000/api"
+export const API_URL = `${API_BASE}/topology`
+
+// Engine API (pattern_finder/api.py)
+export const ENGINE_API_BASE = import.meta.env.VITE_ENGINE_API ?? "http://localhost:8000/api"
+
+// Server-Sent Events stream of the tailed capture
+export const LIVE_URL = import.meta.env.VITE_LIVE_URL ?? `${ENGINE_API_BASE}/live`
 
 export async function getTopology() {
   const res = await fetch(API_URL)
@@ -10,3 +17,42 @@ export async function getTopology() {
   return res.json()
 }
 
+// points: point budget, larger ranges are downsampled on the server
+// (lttb, or minmax to keep each bucket's extremes)
+// rolling: trailing window (buckets) of server-side rolling mean / std
+// / max; rolling_of picks the column the mean / std run over
+export interface TrafficQuery {
+  resolution?: string
+  start?: number
+  end?: number
+  points?: number
+  method?: "lttb" | "minmax"
+  rolling?: number
+  rolling_of?: "mean" | "max"
+}
+
+export async function getLinkTraffic(linkId: string, query: TrafficQuery = {}) {
+  const params = new URLSearchParams()
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined) params.set(key, String(value))
+  })
+
+  const res = await fetch(`${API_BASE}/links/${encodeURIComponent(linkId)}/traffic?${params}`)
+
+  if (!res.ok) {
+    throw new Error(`Failed to fetch traffic for ${linkId}`)
+  }
+
+  return res.json()
+}
+
+// links x time-bins congestion matrix, computed server-side
+export async function getHeatmap(binMs: number) {
+  const res = await fetch(`${ENGINE_API_BASE}/heatmap?format=json&bin_ms=${binMs}`)
+
+  if (!res.ok) {
+    throw new Error("Failed to fetch congestion heatmap")
+  }
+
+  return res.json()
+}
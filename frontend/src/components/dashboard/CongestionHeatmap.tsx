@@ -1,5 +1,6 @@
-import { useMemo, useRef } from "react"
+import { useMemo } from "react"
 import { useTopology } from "@/hooks/useTopology"
+import { heatmapRow, useHeatmap } from "@/hooks/useHeatmap"
 
 interface CongestionHeatmapProps {
   timeRange: [number, number]
@@ -12,64 +13,23 @@ export const CongestionHeatmap = ({
   const links = data?.links || []
   const [start, end] = timeRange
 
-  // ----------------------------
-  // EMA Baseline Store
-  // ----------------------------
-  const emaStore = useRef<Record<string, number>>({})
-
-  const getEMA = (key: string, value: number, alpha = 0.25) => {
-    const prev = emaStore.current[key] ?? value
-    const ema = alpha * value + (1 - alpha) * prev
-    emaStore.current[key] = ema
-    return ema
-  }
+  // Per-second links x bins matrix, computed server-side
+  // (bin index = seconds on the time axis)
+  const { data: heatmap } = useHeatmap(1000, data?.generated_at)
 
   // ----------------------------
   // Color logic (SLA driven)
   // ----------------------------
-  const getColor = (capacityRatio: number, trendRatio: number) => {
-    if (capacityRatio > 0.85 && trendRatio > 1.5)
-      return "#FF3355" // critical
-    if (capacityRatio > 0.6 || trendRatio > 1.25)
-      return "#FFD24D" // warning
-    return "#00FF99" // safe
+  const getStatus = (utilisation: number, loss: number) => {
+    if (loss > 0.05 || (utilisation > 0.85 && loss > 0)) return "CRITICAL"
+    if (loss > 0 || utilisation > 0.6) return "WARNING"
+    return "OK"
   }
 
-  // ----------------------------
-  // Build per-cell series
-  // ----------------------------
-  const buildCellSeries = (link: any, cell: string): number[] => {
-    if (data?.cell_timeseries?.[cell]) {
-      return data.cell_timeseries[cell]
-    }
-
-    const linkSeries = link.traffic_timeseries || []
-    const splitFactor = link.cells.length || 1
-
-    return linkSeries.map((v: number) => v / splitFactor)
-  }
-
-  // ----------------------------
-  // Shared congestion detector
-  // ----------------------------
-  const isCongestionColumn = (link: any, t: number) => {
-    const safe = link.capacity?.safe_gbps || 1
-    let stressed = 0
-
-    link.cells.forEach((cell: string) => {
-      const series = buildCellSeries(link, cell)
-      const val = series[t] || 0
-
-      const ema = getEMA(`${link.id}-${cell}`, val)
-      const capRatio = val / safe
-      const trendRatio = ema > 0 ? val / ema : 1
-
-      if (capRatio > 0.6 || trendRatio > 1.25) {
-        stressed++
-      }
-    })
-
-    return stressed / link.cells.length >= 0.5
+  const getColor = (status: string) => {
+    if (status === "CRITICAL") return "#FF3355"
+    if (status === "WARNING") return "#FFD24D"
+    return "#00FF99"
   }
 
   // ----------------------------
@@ -77,19 +37,19 @@ export const CongestionHeatmap = ({
   // ----------------------------
   const grid = useMemo(() => {
     return links.map((link: any) => {
-      const safe = link.capacity?.safe_gbps || 1
+      const slice = (metric: "utilisation" | "loss_ratio" | "peak_gbps") =>
+        heatmapRow(heatmap, metric, link.id).slice(start, end + 1)
 
       return {
         linkId: link.id,
         cells: link.cells,
-        safe,
-        rows: link.cells.map((cell: string) => {
-          const series = buildCellSeries(link, cell)
-          return series.slice(start, end + 1)
-        })
+        safe: link.capacity?.safe_gbps || 0,
+        utilisation: slice("utilisation"),
+        loss: slice("loss_ratio"),
+        peak: slice("peak_gbps")
       }
     })
-  }, [links, data, start, end])
+  }, [links, heatmap, start, end])
 
   // ----------------------------
   // Render
@@ -98,8 +58,7 @@ export const CongestionHeatmap = ({
     <div className="relative w-full overflow-x-auto">
       <div className="space-y-10 min-w-max">
         {grid.map((linkBlock: any) => {
-          const { linkId, rows, cells, safe } = linkBlock
-          const link = links.find((l: any) => l.id === linkId)
+          const { linkId, cells, safe, utilisation, loss, peak } = linkBlock
 
           return (
             <div key={linkId}>
@@ -113,88 +72,38 @@ export const CongestionHeatmap = ({
                 </span>
               </div>
 
-              <div className="relative">
-                {/* Congestion Column Overlay */}
-                <div className="absolute inset-0 flex pointer-events-none">
-                  {Array.from(
-                    { length: end - start + 1 },
-                    (_, i) => {
-                      const t = start + i
-                      const isHot = isCongestionColumn(link, t)
-
-                      return (
-                        <div
-                          key={t}
-                          style={{
-                            width: 16,
-                            backgroundColor: isHot
-                              ? "rgba(255,51,85,0.12)"
-                              : "transparent"
-                          }}
-                        />
-                      )
-                    }
-                  )}
+              <div className="flex items-center space-x-1">
+                {/* Cells sharing the link */}
+                <div className="w-24 truncate text-[10px] text-muted-foreground font-mono">
+                  {cells.join(" ")}
                 </div>
 
-                {/* Heatmap Rows */}
-                <div className="space-y-1 relative z-10">
-                  {rows.map((row: number[], rowIdx: number) => (
-                    <div
-                      key={rowIdx}
-                      className="flex items-center space-x-1"
-                    >
-                      {/* Cell Label */}
-                      <div className="w-14 text-[10px] text-muted-foreground font-mono">
-                        {cells[rowIdx]}
-                      </div>
+                {/* Time Bins */}
+                {utilisation.map((util: number, colIdx: number) => {
+                  const t = start + colIdx
+                  const status = getStatus(util, loss[colIdx])
+                  const color = getColor(status)
 
-                      {/* Time Cells */}
-                      {row.map((val: number, colIdx: number) => {
-                        const t = start + colIdx
-
-                        const emaKey = `${linkId}-${cells[rowIdx]}`
-                        const ema = getEMA(emaKey, val)
-
-                        const capacityRatio = val / safe
-                        const trendRatio =
-                          ema > 0 ? val / ema : 1
-
-                        const color = getColor(
-                          capacityRatio,
-                          trendRatio
-                        )
-
-                        return (
-                          <div
-                            key={colIdx}
-                            title={`Cell ${cells[rowIdx]}
+                  return (
+                    <div
+                      key={colIdx}
+                      title={`${linkId}
 T=${t}s
-Load: ${val.toFixed(2)} Gbps
-Capacity: ${(capacityRatio * 100).toFixed(1)}%
-Trend: ${trendRatio.toFixed(2)}x
-Status: ${
-  capacityRatio > 0.85 && trendRatio > 1.5
-    ? "CRITICAL"
-    : capacityRatio > 0.6 || trendRatio > 1.25
-    ? "WARNING"
-    : "OK"
-}`}
-                            className="w-4 h-4 rounded-sm transition-transform hover:scale-125"
-                            style={{
-                              backgroundColor: color,
-                              boxShadow:
-                                capacityRatio > 0.85 ||
-                                trendRatio > 1.5
-                                  ? "0 0 6px rgba(255,51,85,0.6)"
-                                  : "none"
-                            }}
-                          />
-                        )
-                      })}
-                    </div>
-                  ))}
-                </div>
+Peak: ${peak[colIdx].toFixed(2)} Gbps
+Utilisation: ${(util * 100).toFixed(1)}%
+Loss: ${(loss[colIdx] * 100).toFixed(2)}%
+Status: ${status}`}
+                      className="w-4 h-4 rounded-sm transition-transform hover:scale-125"
+                      style={{
+                        backgroundColor: color,
+                        boxShadow:
+                          status === "CRITICAL"
+                            ? "0 0 6px rgba(255,51,85,0.6)"
+                            : "none"
+                      }}
+                    />
+                  )
+                })}
               </div>
             </div>
           )
@@ -1,5 +1,6 @@
 import { useMemo } from "react"
 import { useTopology } from "@/hooks/useTopology"
+import { heatmapRow, useHeatmap } from "@/hooks/useHeatmap"
 
 interface TowerMapProps {
   time: number
@@ -9,6 +10,11 @@ export const TowerMap = ({ time }: TowerMapProps) => {
   const { data } = useTopology()
   const links = data?.links || []
 
+  // Per-second peak link load from the server-side heatmap
+  // (bin index = simulation time in seconds)
+  const { data: heatmap } = useHeatmap(1000, data?.generated_at)
+  const peakSeries = (link: any) => heatmapRow(heatmap, "peak_gbps", link.id)
+
   // ----------------------------
   // Layout system (auto grid)
   // ----------------------------
@@ -30,14 +36,13 @@ export const TowerMap = ({ time }: TowerMapProps) => {
   // ----------------------------
   const globalPeak = useMemo(() => {
     let max = 1
-    links.forEach((link: any) => {
-      const series = link.traffic_timeseries || []
+    heatmap?.metrics.peak_gbps.forEach((series: number[]) => {
       series.forEach((v: number) => {
         if (v > max) max = v
       })
     })
     return max
-  }, [links])
+  }, [heatmap])
 
   // ----------------------------
   // Rolling average (baseline)
@@ -57,7 +62,7 @@ export const TowerMap = ({ time }: TowerMapProps) => {
   // NOC-style congestion scoring
   // ----------------------------
   const getStatus = (link: any, load: number) => {
-  const series = link.traffic_timeseries || []
+  const series = peakSeries(link)
   const safe = link.capacity?.safe_gbps || globalPeak || 1
 
   const baseline = getRollingAverage(series, time, 20) || 1
@@ -138,7 +143,7 @@ export const TowerMap = ({ time }: TowerMapProps) => {
         {links.map((link: any, i: number) => {
           const pos = layout[i]
 
-          const series = link.traffic_timeseries || []
+          const series = peakSeries(link)
           const load = series[time] || 0
 
           const safe = link.capacity?.safe_gbps || globalPeak || 1
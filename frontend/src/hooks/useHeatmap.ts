@@ -0,0 +1,25 @@
+import { useQuery } from "@tanstack/react-query"
+
+import { getHeatmap } from "@/api"
+import { HeatmapData } from "@/types"
+
+// The matrix only changes when the topology is regenerated, so it is
+// keyed by generated_at and never polled
+export function useHeatmap(binMs: number, generatedAt: string | undefined) {
+  return useQuery<HeatmapData>({
+    queryKey: ["heatmap", binMs, generatedAt],
+    queryFn: () => getHeatmap(binMs),
+    enabled: !!generatedAt,
+    staleTime: Infinity,
+  })
+}
+
+// Row of one metric for a link; empty when the link is not in the matrix
+export function heatmapRow(
+  heatmap: HeatmapData | undefined,
+  metric: keyof HeatmapData["metrics"],
+  linkId: string
+): number[] {
+  const i = heatmap ? heatmap.links.indexOf(linkId) : -1
+  return i < 0 ? [] : heatmap.metrics[metric][i]
+}
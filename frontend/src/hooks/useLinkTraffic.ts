@@ -0,0 +1,19 @@
+import { useQuery } from "@tanstack/react-query"
+
+import { getLinkTraffic, TrafficQuery } from "@/api"
+import { TrafficSlice } from "@/types"
+
+// Series only change when the topology is regenerated, so they are
+// keyed by generated_at and never polled
+export function useLinkTraffic(
+  linkId: string | undefined,
+  generatedAt: string | undefined,
+  query: TrafficQuery = {}
+) {
+  return useQuery<TrafficSlice>({
+    queryKey: ["traffic", linkId, generatedAt, query],
+    queryFn: () => getLinkTraffic(linkId as string, query),
+    enabled: !!linkId && !!generatedAt,
+    staleTime: Infinity,
+  })
+}
@@ -0,0 +1,102 @@
+import { useEffect, useState } from "react"
+
+import { LIVE_URL } from "@/api"
+import { LiveDelta, LiveLinkDelta, LivePoints, LiveState } from "@/types"
+
+const MAX_LIVE_POINTS = 600
+
+// Places a delta's bucket maxima by their slot index: overlaps replace
+// earlier points, gaps (e.g. a missed delta) are left as null
+function placePoints(prev: LivePoints | undefined, d: LiveLinkDelta): LivePoints {
+  if (!prev || prev.bucketSlots !== d.bucket_slots || d.start < prev.start) {
+    return { start: d.start, bucketSlots: d.bucket_slots, max: [...d.max] }
+  }
+
+  const max = [...prev.max]
+  const offset = Math.round((d.start - prev.start) / d.bucket_slots)
+  while (max.length < offset) max.push(null)
+  d.max.forEach((v, i) => { max[offset + i] = v })
+
+  const drop = Math.max(0, max.length - MAX_LIVE_POINTS)
+  return {
+    start: prev.start + drop * d.bucket_slots,
+    bucketSlots: d.bucket_slots,
+    max: max.slice(drop),
+  }
+}
+
+function applyDelta(state: LiveState, delta: LiveDelta): LiveState {
+  const links = { ...state.links }
+
+  Object.entries(delta.links ?? {}).forEach(([id, d]) => {
+    const prev = links[id]
+    if (!prev) return
+    links[id] = {
+      ...prev,
+      slots: d.slots,
+      capacity: d.capacity ?? prev.capacity,
+      sla: d.sla ?? prev.sla,
+    }
+  })
+
+  return { ...state, seq: delta.seq, links }
+}
+
+// Live mode: running per-link totals from the "state" event, updated
+// by each "delta", plus the last MAX_LIVE_POINTS pushed bucket maxima
+// per link, positioned by slot index. EventSource reconnects by itself;
+// every connection starts with a fresh "state", and deltas it already
+// covers are skipped. A reset is honoured whatever its seq.
+export function useLiveFeed(enabled = true) {
+  const [state, setState] = useState<LiveState | null>(null)
+  const [points, setPoints] = useState<Record<string, LivePoints>>({})
+  const [connected, setConnected] = useState(false)
+  const [generation, setGeneration] = useState(0)
+
+  useEffect(() => {
+    if (!enabled) return
+
+    const source = new EventSource(LIVE_URL)
+    let seq = 0
+
+    source.onopen = () => setConnected(true)
+    source.onerror = () => setConnected(false)
+
+    source.addEventListener("state", (e) => {
+      const next: LiveState = JSON.parse((e as MessageEvent).data)
+      seq = next.seq
+      setState(next)
+      setPoints({})
+    })
+
+    source.addEventListener("delta", (e) => {
+      const delta: LiveDelta = JSON.parse((e as MessageEvent).data)
+
+      if (delta.reset) {
+        // Capture restarted on the server; reconnect for a new state
+        source.close()
+        setConnected(false)
+        setState(null)
+        setPoints({})
+        setGeneration((g) => g + 1)
+        return
+      }
+
+      if (delta.seq <= seq) return
+      seq = delta.seq
+
+      setState((prev) => (prev ? applyDelta(prev, delta) : prev))
+      setPoints((prev) => {
+        const next = { ...prev }
+        Object.entries(delta.links ?? {}).forEach(([id, d]) => {
+          next[id] = placePoints(prev[id], d)
+        })
+        return next
+      })
+    })
+
+    return () => source.close()
+  }, [enabled, generation])
+
+  return { state, points, connected }
+}
@@ -2,6 +2,7 @@ import { useMemo, useState } from "react"
 import { useParams, Link } from "react-router-dom"
 import { DashboardHeader } from "@/components/dashboard/DashboardHeader"
 import { useTopology } from "@/hooks/useTopology"
+import { useLinkTraffic } from "@/hooks/useLinkTraffic"
 
 interface MetricCardProps {
   label: string
@@ -42,6 +43,8 @@ export default function LinkAnalyticsPage() {
     return data?.links?.find((l: any) => l.id === linkId)
   }, [data, linkId])
 
+  const traffic = useLinkTraffic(linkId, data?.generated_at, { resolution: "10ms" })
+
   // ----------------------------
   // Loading / Error
   // ----------------------------
@@ -74,10 +77,12 @@ export default function LinkAnalyticsPage() {
   // ----------------------------
   // Metrics
   // ----------------------------
-  const series = link.traffic_timeseries || []
+  // 10 ms peaks for the graph and peak, 10 ms means for the average
+  const series = traffic.data?.max || []
+  const means = traffic.data?.mean || []
   const avg =
-    series.reduce((a: number, b: number) => a + b, 0) /
-    Math.max(1, series.length)
+    means.reduce((a: number, b: number) => a + b, 0) /
+    Math.max(1, means.length)
 
   const peak = Math.max(...series, 0)
 
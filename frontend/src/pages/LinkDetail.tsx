@@ -2,8 +2,10 @@ import { useMemo, useState } from "react"
 import { useParams, Link } from "react-router-dom"
 import { DashboardHeader } from "@/components/dashboard/DashboardHeader"
 import { useTopology } from "@/hooks/useTopology"
+import { useLinkTraffic } from "@/hooks/useLinkTraffic"
+import { useLiveFeed } from "@/hooks/useLiveFeed"
 
-const WINDOW = 10
+const WINDOW = 10 // buckets of the rolling peak average (1 s at 100 ms)
 const SLA_THRESHOLD = 1 // %
 const MAX_VISIBLE_POINTS = 120
 
@@ -32,8 +34,53 @@ const LinkDetail = () => {
 
   const link = useMemo(() => data?.links?.find((l) => l.id === linkId), [data, linkId])
 
+  // 100 ms peaks over the whole capture, downsampled on the server to
+  // MAX_VISIBLE_POINTS (minmax keeps the congestion spikes), with the
+  // rolling average of those peaks computed over every bucket
+  const traffic = useLinkTraffic(linkId, data?.generated_at, {
+    resolution: "100ms",
+    points: MAX_VISIBLE_POINTS,
+    method: "minmax",
+    rolling: WINDOW,
+    rolling_of: "max",
+  })
+
+  // Live 100 ms peaks pushed since this page connected
+  const live = useLiveFeed()
+  const livePoints = linkId ? live.points[linkId] : undefined
+
+  const slotSec = live.state?.slot_sec
+
   const series = useMemo(() => {
-    let raw = link?.traffic_timeseries
+    let raw = traffic.data?.max
+
+    // Live points go into the snapshot's buckets by time (a bucket's
+    // max over all points in it), extending past the snapshot's end.
+    // A downsampled slice lists the start time of each kept bucket in t.
+    if (raw && livePoints && slotSec && traffic.data) {
+      const { start, bucket_sec, t } = traffic.data
+      const times = t ? [...t] : raw.map((_, i) => start + i * bucket_sec)
+      const merged = [...raw]
+      livePoints.max.forEach((v, i) => {
+        if (v === null) return
+        const time = (livePoints.start + i * livePoints.bucketSlots) * slotSec
+        if (time < start) return
+
+        // Past the last bucket: new bucket_sec buckets, gaps as 0
+        let end = times.length ? times[times.length - 1] + bucket_sec : start
+        while (time >= end - 1e-9) {
+          times.push(end)
+          merged.push(0)
+          end += bucket_sec
+        }
+
+        // Last bucket starting at or before the point
+        let index = times.length - 1
+        while (index > 0 && times[index] > time + 1e-9) index--
+        merged[index] = Math.max(merged[index], v)
+      })
+      raw = merged
+    }
 
     if (!raw || raw.length === 0) {
       console.warn(`[${linkId}] NO REAL TRAFFIC DATA — falling back`)
@@ -46,24 +93,20 @@ const LinkDetail = () => {
 
     let trimmed = [...raw]
     while (trimmed.length > 0 && trimmed[trimmed.length - 1] === 0) trimmed.pop()
-    trimmed = trimmed.slice(-MAX_VISIBLE_POINTS)
 
     console.log(`[${linkId}] trimmed to ${trimmed.length}, max: ${Math.max(...trimmed).toFixed(2)}, avg: ${(trimmed.reduce((a,b)=>a+b,0)/trimmed.length || 0).toFixed(2)}`)
 
     return trimmed
-  }, [link, linkId])
+  }, [link, linkId, traffic.data, livePoints, slotSec])
 
   const barColor = LINK_COLORS[link?.id] || "#FFD24D"
 
+  // Snapshot buckets only; live points are not part of the average
   const rollingAvg = useMemo(() => {
-    const avg = series.map((_, i) => {
-      const start = Math.max(0, i - WINDOW)
-      const slice = series.slice(start, i + 1)
-      return slice.reduce((a, b) => a + b, 0) / slice.length
-    })
-    console.log(`[${linkId}] rollingAvg max: ${Math.max(...avg).toFixed(2)}`)
+    const avg = traffic.data?.rolling?.mean ?? []
+    console.log(`[${linkId}] rollingAvg max: ${Math.max(...avg, 0).toFixed(2)}`)
     return avg
-  }, [series, linkId])
+  }, [traffic.data, linkId])
 
   const requiredCapacity = useMemo(() => {
     // Use observed rolling peak instead of backend safe_gbps
@@ -147,11 +190,12 @@ const LinkDetail = () => {
 
         <div className="noc-panel p-4 rounded-lg">
           <div className="flex items-center justify-between mb-3">
-            <h3 className="text-sm font-medium text-foreground">Aggregated Traffic Over Time (recent {series.length} points)</h3>
+            <h3 className="text-sm font-medium text-foreground">Aggregated Traffic Over Time ({series.length} points)</h3>
             <div className="flex items-center space-x-4 text-xs font-mono">
               <span style={{ color: barColor }}>● Traffic</span>
               <span className="text-muted-foreground">● Required Capacity</span>
               <span className="text-status-critical">● SLA Breach</span>
+              {live.connected && <span className="text-status-ok">● Live</span>}
             </div>
           </div>
 
@@ -179,9 +223,9 @@ const LinkDetail = () => {
           </div>
 
           <div className="flex justify-between text-[10px] text-muted-foreground font-mono mt-2">
-            <span>Recent {series.length} points</span>
+            <span>{series.length} points</span>
             <span>max: {Math.max(...series).toFixed(1)} Gbps</span>
-            <span>total original: {link?.traffic_timeseries?.length || series.length}</span>
+            <span>total original: {traffic.data?.points || series.length}</span>
           </div>
         </div>
 
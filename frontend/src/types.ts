@@ -10,7 +10,43 @@ export interface Link {
   cells: string[]
   confidence: number
   capacity: Capacity
-  traffic_timeseries?: number[]
+}
+
+export interface TrafficSlice {
+  link: string
+  resolution: string
+  bucket_sec: number
+  start: number
+  end: number
+  points: number
+  // set when the range was downsampled to the point budget: the
+  // method and each kept bucket's start time (s)
+  downsampled?: "lttb" | "minmax"
+  t?: number[]
+  // set when rolling= was requested, one value per returned bucket
+  rolling?: {
+    window: number
+    of: "mean" | "max"
+    mean: number[]
+    std: number[]
+    max: number[]
+  }
+  min: number[]
+  mean: number[]
+  max: number[]
+  p99: number[]
+}
+
+// metrics[name][link][bin], links in the order of `links`
+export interface HeatmapData {
+  links: string[]
+  bin_ms: number
+  bins: number
+  metrics: {
+    utilisation: number[][]
+    loss_ratio: number[][]
+    peak_gbps: number[][]
+  }
 }
 
 export interface TopologyData {
@@ -20,3 +56,58 @@ export interface TopologyData {
   cell_count: number
   links: Link[]
 }
+
+export type LiveSlaState = "OK" | "WARNING" | "VIOLATION"
+
+export interface LiveCapacity {
+  peak_gbps: number
+  safe_gbps: number
+}
+
+export interface LiveSla {
+  state: LiveSlaState
+  buffer_mb: number
+  loss_ratio: number
+}
+
+export interface LiveLinkState {
+  slots: number
+  mean_gbps: number
+  loss_fraction: number
+  capacity: LiveCapacity
+  sla: LiveSla
+}
+
+export interface LiveState {
+  seq: number
+  slot_sec: number
+  bucket_slots: number
+  links: Record<string, LiveLinkState>
+}
+
+export interface LiveLinkDelta {
+  start: number
+  bucket_slots: number
+  max: number[]
+  mean: number[]
+  loss: number[]
+  slots: number
+  capacity?: LiveCapacity
+  sla?: LiveSla
+  stalled?: string[]
+}
+
+// Pushed bucket maxima of one link; max[i] covers slots
+// start + i * bucketSlots (null where no delta arrived)
+export interface LivePoints {
+  start: number
+  bucketSlots: number
+  max: (number | null)[]
+}
+
+export interface LiveDelta {
+  seq: number
+  time?: number
+  reset?: boolean
+  links?: Record<string, LiveLinkDelta>
+}
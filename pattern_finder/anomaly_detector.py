@@ -0,0 +1,308 @@
+import numpy as np
+
+from rolling import rolling_sum
+
+
+# ----------------------------
+# Recursive filters
+# ----------------------------
+def ewma_filter(u, alpha, init):
+    """
+    y_t = (1 - alpha) * y_{t-1} + alpha * u_t along the last axis,
+    starting from y_{-1} = init (one value per row)
+
+    Solved in closed form per chunk (weighted cumulative sums), so the
+    Python loop runs once per chunk, not per sample. Chunks are short
+    enough that the (1 - alpha)^-k weights stay well conditioned.
+    """
+    u = np.asarray(u, dtype=float)
+    y = np.empty_like(u)
+    prev = np.asarray(init, dtype=float).copy()
+
+    decay = 1 - alpha
+    chunk = max(1, int(6 / -np.log10(decay))) if 0 < alpha < 1 else u.shape[-1]
+
+    for start in range(0, u.shape[-1], chunk):
+        seg = u[..., start:start + chunk]
+        k = np.arange(1, seg.shape[-1] + 1)
+        grow = decay ** -k
+        shrink = decay ** k
+
+        y[..., start:start + chunk] = shrink * (
+            prev[..., None] + alpha * np.cumsum(seg * grow, axis=-1)
+        )
+        prev = y[..., start + seg.shape[-1] - 1]
+
+    return y
+
+
+def lindley(c, init):
+    """
+    s_t = max(0, s_{t-1} + c_t) along the last axis (CUSUM recursion),
+    via cumulative sum and running minimum
+    """
+    csum = np.cumsum(c, axis=-1)
+    floor = np.minimum.accumulate(csum, axis=-1)
+    return csum - np.minimum(-np.asarray(init, dtype=float)[..., None], floor)
+
+
+# ----------------------------
+# Run tracking
+# ----------------------------
+class _RunTracker:
+    """
+    Turns a (links, block) boolean mask into closed [start, end)
+    runs, carrying runs that are still open across blocks
+    """
+
+    def __init__(self, n_rows):
+        self.open_start = np.full(n_rows, -1, dtype=np.int64)
+        self.open_peak = np.zeros(n_rows)
+
+    def update(self, mask, score, offset):
+        n_rows, width = mask.shape
+        was_open = self.open_start >= 0
+
+        padded = np.concatenate(
+            [was_open[:, None], mask, np.zeros((n_rows, 1), dtype=bool)], axis=1
+        ).astype(np.int8)
+        edges = np.diff(padded, axis=1)
+
+        starts = [np.flatnonzero(row == 1) for row in edges]
+        ends = [np.flatnonzero(row == -1) for row in edges]
+        closed = []
+
+        for r in range(n_rows):
+            s_idx, e_idx = starts[r], ends[r]
+            if len(e_idx) == 0:
+                continue
+
+            # A carried run starts before this block
+            if was_open[r]:
+                s_idx = np.concatenate([[0], s_idx])
+
+            for s, e in zip(s_idx, e_idx):
+                peak = score[r, s:e].max() if e > s else -np.inf
+                if s == 0 and was_open[r]:
+                    start = self.open_start[r]
+                    peak = max(peak, self.open_peak[r])
+                else:
+                    start = offset + s
+
+                if e < width:
+                    closed.append((r, int(start), int(offset + e), float(peak)))
+                else:
+                    self.open_start[r] = start
+                    self.open_peak[r] = peak
+
+            if not mask[r, -1]:
+                self.open_start[r] = -1
+                self.open_peak[r] = 0.0
+
+        return closed
+
+    def flush(self, end):
+        closed = [
+            (r, int(s), int(end), float(self.open_peak[r]))
+            for r, s in enumerate(self.open_start) if s >= 0
+        ]
+        self.open_start[:] = -1
+        self.open_peak[:] = 0.0
+        return closed
+
+
+# ----------------------------
+# Detector
+# ----------------------------
+class LinkAnomalyDetector:
+    """
+    Load-shift and loss-burst detection on all links at once
+
+    Inputs are (links, slots) arrays; every rule is a vectorized
+    recursion or window over the time axis, so work per sample per
+    link is O(1). update() consumes consecutive blocks and keeps the
+    filter state between them; detect() is update() over a whole
+    capture, so batch and streaming results are identical.
+
+    Rules:
+    - ewma:       |z| > z_threshold, z = residual against the EWMA
+                  mean over the EWMA standard deviation
+    - cusum:      two-sided CUSUM on z (slack k) above h
+    - loss_burst: at least burst_count lossy slots within
+                  burst_window slots (a slot is lossy when any member
+                  cell reports loss)
+    Each rule reports one event per contiguous run of alarms.
+    """
+
+    RULES = ("ewma", "cusum", "loss_burst")
+
+    def __init__(
+        self,
+        links,
+        slot_sec=0.0005,
+        alpha=0.01,
+        z_threshold=8.0,
+        cusum_k=0.5,
+        cusum_h=100.0,
+        burst_window=20,
+        burst_count=10,
+        warmup=2000
+    ):
+        self.links = list(links)
+        self.slot_sec = slot_sec
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.burst_window = burst_window
+        self.burst_count = burst_count
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        n = len(self.links)
+        self.position = 0
+        self.mean = None
+        self.var = np.zeros(n)
+        self.cusum_pos = np.zeros(n)
+        self.cusum_neg = np.zeros(n)
+        self.loss_tail = np.zeros((n, 0))
+        self.trackers = {rule: _RunTracker(n) for rule in self.RULES}
+        self.events = []
+
+    # ----------------------------
+    # Streaming
+    # ----------------------------
+    def _event(self, rule, row, start, end, peak):
+        return {
+            "link": self.links[row],
+            "type": rule,
+            "start": round(start * self.slot_sec, 6),
+            "end": round(end * self.slot_sec, 6),
+            "slots": end - start,
+            "peak": round(peak, 4)
+        }
+
+    def update(self, traffic, loss=None):
+        """
+        traffic: (links, block) Gbps; loss: (links, block) lossy-slot
+        flags or None. Returns the events closed by this block.
+        """
+        x = np.asarray(traffic, dtype=float)
+        n, width = x.shape
+        if width == 0:
+            return []
+
+        offset = self.position
+        if self.mean is None:
+            self.mean = x[:, 0].copy()
+
+        # EWMA mean, then EWMA variance of the one-step residual
+        mean = ewma_filter(x, self.alpha, self.mean)
+        prev_mean = np.concatenate([self.mean[:, None], mean[:, :-1]], axis=1)
+        resid = x - prev_mean
+
+        var = ewma_filter((1 - self.alpha) * resid ** 2, self.alpha, self.var)
+        prev_var = np.concatenate([self.var[:, None], var[:, :-1]], axis=1)
+        std = np.sqrt(prev_var)
+        z = np.divide(resid, std, out=np.zeros_like(resid), where=std > 0)
+
+        self.mean, self.var = mean[:, -1].copy(), var[:, -1].copy()
+
+        # Alarms are suppressed until the filters have settled
+        live = (offset + np.arange(width)) >= self.warmup
+        z = np.where(live, z, 0.0)
+
+        pos = lindley(z - self.cusum_k, self.cusum_pos)
+        neg = lindley(-z - self.cusum_k, self.cusum_neg)
+        self.cusum_pos, self.cusum_neg = pos[:, -1].copy(), neg[:, -1].copy()
+        cusum = np.maximum(pos, neg)
+
+        masks = {
+            "ewma": (np.abs(z) > self.z_threshold, np.abs(z)),
+            "cusum": (cusum > self.cusum_h, cusum),
+        }
+
+        if loss is not None:
+            flags = (np.asarray(loss, dtype=float) > 0).astype(float)
+            history = np.concatenate([self.loss_tail, flags], axis=1)
+            counts = rolling_sum(history, self.burst_window)[:, -width:]
+            self.loss_tail = history[:, -(self.burst_window - 1):] \
+                if self.burst_window > 1 else history[:, :0]
+            masks["loss_burst"] = (counts >= self.burst_count, counts)
+
+        closed = []
+        for rule, (mask, score) in masks.items():
+            for row, start, end, peak in self.trackers[rule].update(mask, score, offset):
+                closed.append(self._event(rule, row, start, end, peak))
+
+        self.position += width
+        self.events.extend(closed)
+        return closed
+
+    def finish(self):
+        """
+        Closes runs still open at the end of the capture
+        """
+        closed = []
+        for rule, tracker in self.trackers.items():
+            for row, start, end, peak in tracker.flush(self.position):
+                closed.append(self._event(rule, row, start, end, peak))
+
+        self.events.extend(closed)
+        return closed
+
+    # ----------------------------
+    # Batch
+    # ----------------------------
+    def detect(self, traffic, loss=None, block_size=65536):
+        """
+        Runs a whole (links, slots) capture and returns all events,
+        sorted by start time
+        """
+        self.reset()
+        traffic = np.asarray(traffic, dtype=float)
+
+        for start in range(0, traffic.shape[1], block_size):
+            stop = start + block_size
+            self.update(
+                traffic[:, start:stop],
+                None if loss is None else np.asarray(loss)[:, start:stop]
+            )
+
+        self.finish()
+        self.events.sort(key=lambda e: (e["start"], e["link"], e["type"]))
+        return self.events
+
+
+def link_matrices(link_map, traffic_map, loss_vectors):
+    """
+    Aligned (links, slots) traffic and lossy-slot matrices for the
+    detector; links without traffic are left out
+    """
+    links = [link for link in link_map if len(traffic_map.get(link, [])) > 0]
+    steps = min((len(traffic_map[link]) for link in links), default=0)
+
+    traffic = np.zeros((len(links), steps))
+    loss = np.zeros((len(links), steps))
+
+    for i, link in enumerate(links):
+        traffic[i] = traffic_map[link][:steps]
+        for cell in link_map[link]:
+            flags = np.asarray(loss_vectors.get(cell, []), dtype=float)[:steps]
+            loss[i, :len(flags)] = np.maximum(loss[i, :len(flags)], flags)
+
+    return links, traffic, loss
+
+
+def query_events(events, start=None, end=None, link=None, rule=None):
+    """
+    Events overlapping [start, end], optionally for one link / rule
+    """
+    return [
+        e for e in events
+        if (start is None or e["end"] >= start)
+        and (end is None or e["start"] <= end)
+        and (link is None or e["link"] == link)
+        and (rule is None or e["type"] == rule)
+    ]
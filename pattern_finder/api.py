@@ -1,108 +1,494 @@
 import os
-from fastapi import FastAPI
+import math
+import asyncio
+import time
+import threading
+from typing import Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from config import (
     DATA_PATH,
     PROCESSED_DATA_PATH,
     CORRELATION_THRESHOLD,
-    OUTPUT_DIR
+    OUTPUT_DIR,
+    CAPACITY_MODE,
+    SLOT_SEC,
+    BUFFER_SYMBOLS,
+    LOSS_TARGET,
+    CAPACITY_QUANTILE,
+    SLA_MAX_BUFFER_MB,
+    TRAFFIC_DEFAULT_POINTS,
+    TRAFFIC_MAX_POINTS,
+    RESULT_CACHE_MAX_MB,
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP,
+    LIVE_POLL_SEC,
+    LIVE_BUCKET_MS,
+    LIVE_KEEPALIVE_SEC,
+    LIVE_MAX_LAG_MS,
+    HEATMAP_BIN_MS,
+    HEATMAP_MAX_BIN_MS,
+    METRICS_LATENCY_BUCKETS,
+    PROFILE_INTERVAL_MS
 )
 
-from data_handler import RawFileDataHandler
-from cleaned_csv_handler import CleanedCSVFolderHandler
-from loss_vector_builder import LossVectorBuilder
-from correlation_engine import CorrelationEngine
-from clustering_engine import ClusteringEngine
-from confidence import compute_confidence
-from exporter import export_topology
-from capacity_estimator import LinkCapacityEstimator
-from link_traffic_analyzer import LinkTrafficAnalyzer
+from engine import (
+    CAPACITY_MODES,
+    DATASET_MODES,
+    STAGE_CACHE,
+    engine_pipeline,
+    input_digests,
+    open_dataset
+)
+from heatmap_matrix import CongestionHeatmapBuilder
+from anomaly_detector import LinkAnomalyDetector, query_events
+from jobs import JobManager
+from result_cache import ResultCache, input_fingerprint
+from snapshot_store import SnapshotStore
+from live_tail import LiveTopology, LiveFeed
+from metrics import Registry, PipelineMetrics, SamplingProfiler
+from serialization import (
+    JSON_MEDIA_TYPE,
+    BINARY_MEDIA_TYPE,
+    REPORT,
+    dumps,
+    negotiate,
+    to_series_bytes
+)
 
 # ----------------------------
 # APP
 # ----------------------------
-app = FastAPI(title="Nokia Fronthaul Intelligence API")
+class CompactJSONResponse(Response):
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content):
+        return dumps(content)
+
+
+# Per worker process: each uvicorn worker exposes its own counters
+METRICS = Registry()
+HTTP_LATENCY = METRICS.histogram(
+    "pf_http_request_duration_seconds",
+    "Time to the start of the response",
+    ("method", "route", "status"),
+    buckets=METRICS_LATENCY_BUCKETS
+)
+PIPELINE_METRICS = PipelineMetrics(METRICS)
+
+
+class LatencyMiddleware:
+    """
+    Records every HTTP request in HTTP_LATENCY, labelled by route
+    template (not raw path) so link ids don't multiply the series.
+    Timed to the response start: streams (/api/live) would otherwise
+    count their whole lifetime.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        observed = False
+
+        def observe(status):
+            route = scope.get("route")
+            HTTP_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            )
+
+        async def timed_send(message):
+            nonlocal observed
+            if message["type"] == "http.response.start" and not observed:
+                observed = True
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            if not observed:
+                observe(500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    _warm_start()
+    yield
+
+
+app = FastAPI(
+    title="Nokia Fronthaul Intelligence API",
+    default_response_class=CompactJSONResponse,
+    lifespan=lifespan
+)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Heatmap-Shape",
+        "X-Heatmap-Links",
+        "X-Heatmap-Metrics",
+        "X-Heatmap-Bin-Ms",
+        "X-Series-Link",
+        "X-Series-Shape",
+        "X-Series-Columns",
+        "X-Series-Resolution",
+        "X-Series-Bucket-Sec",
+        "X-Series-Start",
+        "X-Series-End",
+        "X-Serialize-Ms",
+        "X-Cache"
+    ],
 )
+app.add_middleware(LatencyMiddleware)
+
+# Served snapshot: {"version", "result", "artifacts", "params", "key",
+# "submitted_at"}. Replaced as a whole when a run finishes, so a request
+# always reads one consistent run (artifacts are per-link results not
+# exported to JSON).
+SNAPSHOT = None
+SNAPSHOT_LOCK = threading.Lock()
 
-LAST_RESULT = None
+# On-disk versions shared by all worker processes; SNAPSHOT follows
+# the store's CURRENT pointer
+STORE = SnapshotStore(SNAPSHOT_DIR, keep=SNAPSHOT_KEEP)
+
+JOBS = JobManager(max_workers=1)
+
+# Loaded snapshots of recent runs by (dataset, threshold, capacity
+# mode, input fingerprint); arrays are memmaps into STORE
+RESULTS = ResultCache(max_bytes=RESULT_CACHE_MAX_MB * 2 ** 20)
+
+# Live tail for the served snapshot's link map: {"version", "feed"},
+# started by the first /api/live client
+LIVE = None
+LIVE_LOCK = threading.Lock()
+
+# Guards the per-snapshot artifacts["heatmaps"] dict of extra bin widths
+HEATMAP_LOCK = threading.Lock()
 
 # ----------------------------
 # ENGINE
 # ----------------------------
-def run_engine(dataset_mode="raw"):
+def run_engine(
+    dataset_mode="raw",
+    capacity_mode=CAPACITY_MODE,
+    progress=None,
+    threshold=CORRELATION_THRESHOLD,
+    profile=False
+):
+    """
+    Returns (topology, artifacts): the exported topology dict and
+    per-link results served by their own endpoints.
+    progress(stage, fraction) is called as stages start; independent
+    stages run concurrently (see engine.py). profile=True keeps every
+    stage in this process for SamplingProfiler.
+    """
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    if dataset_mode == "processed":
-        handler = CleanedCSVFolderHandler(PROCESSED_DATA_PATH)
-        dataset_label = "processed"
-    else:
-        handler = RawFileDataHandler(DATA_PATH)
-        dataset_label = "raw"
-
+    handler, dataset_label = open_dataset(dataset_mode)
     cells = handler.get_cells()
-    cell_count = len(cells)
 
-    if cell_count < 1:
+    if len(cells) < 1:
         return {
             "links": [],
             "cells": [],
             "error": "No cells found",
-            "cell_count": cell_count
+            "cell_count": len(cells)
+        }, {}
+
+    inputs = {
+        "handler": handler,
+        "cells": cells,
+        "dataset_label": dataset_label,
+        "threshold": threshold,
+        "capacity_mode": capacity_mode,
+        "output_dir": OUTPUT_DIR
+    }
+    values, report = engine_pipeline(profile=profile).run(
+        inputs, progress=progress, digests=input_digests(handler, inputs)
+    )
+
+    return values["topology"], {
+        "sla": values["sla_map"],
+        "rollups": values["rollups"],
+        "capacity": values["capacity_map"],
+        "heatmaps": {HEATMAP_BIN_MS: values["heatmap"]},
+        "pipeline": report
+    }
+
+
+def _run_params(dataset_mode, threshold, capacity_mode):
+    """
+    Run parameters plus the input fingerprint; unknown dataset /
+    capacity modes are a 400 (before any job or cache entry exists)
+    """
+    if dataset_mode not in DATASET_MODES:
+        raise HTTPException(
+            status_code=400, detail=f"dataset must be one of {list(DATASET_MODES)}"
+        )
+
+    if capacity_mode not in CAPACITY_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"capacity_mode must be one of {list(CAPACITY_MODES)}"
+        )
+
+    data_dir = PROCESSED_DATA_PATH if dataset_mode == "processed" else DATA_PATH
+    return {
+        "dataset": dataset_mode,
+        "threshold": threshold,
+        "capacity_mode": capacity_mode,
+        "fingerprint": input_fingerprint(data_dir)
+    }
+
+
+def _cache_key(params):
+    return (
+        params["dataset"],
+        params["threshold"],
+        params["capacity_mode"],
+        params["fingerprint"]
+    )
+
+
+def _activate(snapshot):
+    global SNAPSHOT
+    with SNAPSHOT_LOCK:
+        SNAPSHOT = snapshot
+
+
+def _compute(params, report, submitted_at, profile=False, activate=True):
+    """
+    Job body: one worker process computes while the others wait on the
+    store lock, then reuse what it published. activate=False stores
+    the version without making it the served one.
+    """
+    key = _cache_key(params)
+
+    with STORE.lock():
+        version = STORE.find(key, newer_than=submitted_at)
+
+        if version is None:
+            result, artifacts = run_engine(
+                params["dataset"],
+                params["capacity_mode"],
+                progress=report,
+                threshold=params["threshold"],
+                profile=profile
+            )
+            if "pipeline" in artifacts:
+                PIPELINE_METRICS.observe(artifacts["pipeline"])
+            report("publish", 0.99)
+            version = STORE.publish(
+                key, params, submitted_at, result, artifacts, activate=activate
+            )
+        elif activate:
+            STORE.set_current(version)
+
+    return STORE.load(version)
+
+
+def _remember(job, snapshot):
+    RESULTS.put(snapshot["key"], snapshot)
+
+
+def _publish(job, snapshot):
+    """
+    Caches a finished run and swaps it into the served snapshot,
+    unless a run submitted later has already been published
+    """
+    global SNAPSHOT
+    _remember(job, snapshot)
+
+    with SNAPSHOT_LOCK:
+        if SNAPSHOT is None or snapshot["submitted_at"] >= SNAPSHOT["submitted_at"]:
+            SNAPSHOT = snapshot
+
+
+def _submit_run(params, activate=True):
+    """
+    Returns (job, created); identical in-flight runs share one job.
+    activate=False computes and caches the result without serving it
+    (its own job, so a later serving run is not folded into it).
+    """
+    submitted_at = time.time()
+    key = _cache_key(params)
+
+    return JOBS.submit(
+        key if activate else key + ("compute-only",),
+        params,
+        lambda report: _compute(params, report, submitted_at, activate=activate),
+        on_done=_publish if activate else _remember
+    )
+
+
+def _profiled_run(params):
+    """
+    Computes on the request thread under the sampling profiler (no job
+    dedup). Stage cache lookups are bypassed, so the profile covers
+    the stages' real work rather than cache hits. The version is
+    stored and cached but not served: profiling never changes the
+    current snapshot.
+    """
+    submitted_at = time.time()
+
+    with STAGE_CACHE.bypassed():
+        with SamplingProfiler(interval=PROFILE_INTERVAL_MS / 1000) as profiler:
+            snapshot = _compute(
+                params, lambda stage, progress: None, submitted_at,
+                profile=True, activate=False
+            )
+    _remember(None, snapshot)
+
+    return {
+        "version": snapshot["version"],
+        "params": params,
+        "pipeline": snapshot["artifacts"]["pipeline"],
+        "profile": profiler.result()
+    }
+
+
+def _lookup(key):
+    """
+    Snapshot for key from memory or from the store, or None
+    """
+    snapshot = RESULTS.get(key)
+    if snapshot is not None and STORE.exists(snapshot["version"]):
+        return snapshot
+
+    version = STORE.find(key)
+    snapshot = STORE.load(version) if version else None
+    if snapshot is not None:
+        RESULTS.put(key, snapshot)
+    return snapshot
+
+
+def _current_snapshot():
+    """
+    Follows the store's CURRENT pointer (one stat call per request);
+    a version published by another worker is mapped on first use
+    """
+    snapshot = SNAPSHOT
+    version = STORE.current_version()
+
+    if version is None or (snapshot and snapshot["version"] == version):
+        return snapshot
+
+    loaded = STORE.load(version)
+    if loaded is None:
+        return snapshot
+
+    RESULTS.put(loaded["key"], loaded)
+    _activate(loaded)
+    return loaded
+
+
+def _ensure_snapshot():
+    """
+    Current snapshot; the first request waits for an initial run
+    (concurrent first requests, in any worker, wait for the same one)
+    """
+    snapshot = _current_snapshot()
+    if snapshot is None:
+        params = _run_params("raw", CORRELATION_THRESHOLD, CAPACITY_MODE)
+        job, _ = _submit_run(params)
+        job.future.result()
+        snapshot = _current_snapshot() or SNAPSHOT
+    return snapshot
+
+
+def _warm_start():
+    """
+    Startup: serves the last published snapshot immediately and
+    refreshes it in the background when the input files changed since
+    it was computed; with nothing published yet, the initial run
+    starts now instead of on the first request
+    """
+    snapshot = _current_snapshot()
+
+    if snapshot is None:
+        params = _run_params("raw", CORRELATION_THRESHOLD, CAPACITY_MODE)
+    else:
+        old = snapshot["params"]
+        params = _run_params(old["dataset"], old["threshold"], old["capacity_mode"])
+        if params["fingerprint"] == old["fingerprint"]:
+            return
+
+    _submit_run(params)
+
+
+def _live_feed():
+    """
+    Live feed for the served topology; a new snapshot (other links)
+    replaces it, which ends the old feed's streams so clients reconnect
+    """
+    global LIVE
+    snapshot = _ensure_snapshot()
+
+    with LIVE_LOCK:
+        if LIVE is not None and LIVE["version"] == snapshot["version"]:
+            return LIVE["feed"]
+
+        result = snapshot["result"]
+        topology = LiveTopology(
+            DATA_PATH,
+            {link["id"]: link["cells"] for link in result["links"]},
+            {link["id"]: link.get("capacity", {}) for link in result["links"]},
+            slot_sec=SLOT_SEC,
+            bucket_slots=max(1, int(round(LIVE_BUCKET_MS / 1000 / SLOT_SEC))),
+            max_buffer_mb=SLA_MAX_BUFFER_MB,
+            max_lag_slots=int(round(LIVE_MAX_LAG_MS / 1000 / SLOT_SEC))
+        )
+
+        old, LIVE = LIVE, {
+            "version": snapshot["version"],
+            "feed": LiveFeed(topology, interval=LIVE_POLL_SEC).start()
         }
+        if old is not None:
+            old["feed"].stop()
 
-    # ----------------------------
-    # Fingerprints
-    # ----------------------------
-    vectors = LossVectorBuilder(handler).build()
-
-    # ----------------------------
-    # Correlation
-    # ----------------------------
-    corr_df = CorrelationEngine(CORRELATION_THRESHOLD).compute_matrix(vectors)
-
-    # ----------------------------
-    # Topology
-    # ----------------------------
-    link_map = ClusteringEngine(CORRELATION_THRESHOLD).cluster(corr_df)
-
-    # ----------------------------
-    # Confidence
-    # ----------------------------
-    confidences = compute_confidence(link_map, corr_df)
-
-    # ----------------------------
-    # Capacity
-    # ----------------------------
-    capacity_engine = LinkCapacityEstimator()
-    capacity_map = capacity_engine.estimate(link_map, handler)
-
-    # ----------------------------
-    # Traffic Timeseries
-    # ----------------------------
-    traffic_engine = LinkTrafficAnalyzer()
-    traffic_map = traffic_engine.build_timeseries(link_map, handler)
-
-    # ----------------------------
-    # Export
-    # ----------------------------
-    export_path = os.path.join(OUTPUT_DIR, "topology.json")
-
-    return export_topology(
-        export_path,
-        link_map,
-        confidences,
-        CORRELATION_THRESHOLD,
-        dataset_label,
-        cell_count,
-        capacity_map,
-        traffic_map
+        return LIVE["feed"]
+
+# ----------------------------
+# SERIALIZATION
+# ----------------------------
+def _json_response(name, payload):
+    with REPORT.timer(name) as entry:
+        body = dumps(payload)
+        entry["bytes"] = len(body)
+
+    return Response(
+        content=body,
+        media_type=JSON_MEDIA_TYPE,
+        headers={"X-Serialize-Ms": f"{entry['seconds'] * 1000:.3f}"}
+    )
+
+
+def _binary_response(name, body_fn, headers):
+    with REPORT.timer(name) as entry:
+        body = body_fn()
+        entry["bytes"] = len(body)
+
+    return Response(
+        content=body,
+        media_type=BINARY_MEDIA_TYPE,
+        headers={**headers, "X-Serialize-Ms": f"{entry['seconds'] * 1000:.3f}"}
     )
 
 # ----------------------------
@@ -116,24 +502,402 @@ def root():
     }
 
 @app.get("/api/run")
-def run(dataset: str = "raw"):
-    global LAST_RESULT
-    LAST_RESULT = run_engine(dataset)
-    return LAST_RESULT
+def run(
+    dataset: str = "raw",
+    capacity_mode: str = CAPACITY_MODE,
+    threshold: float = CORRELATION_THRESHOLD,
+    wait: bool = False,
+    force: bool = False,
+    profile: bool = False
+):
+    """
+    Serves a cached result for these parameters immediately (200,
+    X-Cache: hit) and makes it the current snapshot. Otherwise submits
+    a run and returns its job (202); poll /api/jobs/{id}. A run with
+    the same parameters already in flight is reused.
+    wait=true blocks and returns the topology; force=true skips the
+    cache. profile=true runs now, on this request, and returns the
+    per-stage report and a sampled profile instead of the topology
+    (every stage recomputes, bypassing the stage cache); the served
+    snapshot stays as it was.
+    """
+    params = _run_params(dataset, threshold, capacity_mode)
+
+    if profile:
+        return _json_response("profile", _profiled_run(params))
+
+    cached = None if force else _lookup(_cache_key(params))
+    if cached is not None:
+        STORE.set_current(cached["version"])
+        _activate(cached)
+        response = _json_response("run", cached["result"])
+        response.headers["X-Cache"] = "hit"
+        return response
+
+    job, created = _submit_run(params)
+
+    if wait:
+        response = _json_response("run", job.future.result()["result"])
+    else:
+        response = CompactJSONResponse(
+            status_code=202,
+            content={
+                **job.to_dict(),
+                "deduplicated": not created,
+                "status_url": f"/api/jobs/{job.id}"
+            }
+        )
+
+    response.headers["X-Cache"] = "miss"
+    return response
+
+@app.get("/api/jobs")
+def list_jobs():
+    return JOBS.list()
+
+@app.get("/api/jobs/{job_id}")
+def job_status(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+    return job.to_dict()
 
 @app.get("/api/topology")
-def topology():
-    global LAST_RESULT
+def topology(
+    dataset: Optional[str] = None,
+    capacity_mode: Optional[str] = None,
+    threshold: Optional[float] = None
+):
+    """
+    Current snapshot's topology. With parameters, the cached result
+    for them (computed first on a miss) without changing the current
+    snapshot.
+    """
+    if dataset is None and capacity_mode is None and threshold is None:
+        return _json_response("topology", _ensure_snapshot()["result"])
+
+    params = _run_params(
+        dataset or "raw",
+        CORRELATION_THRESHOLD if threshold is None else threshold,
+        capacity_mode or CAPACITY_MODE
+    )
+
+    cached = _lookup(_cache_key(params))
+    if cached is None:
+        job, _ = _submit_run(params, activate=False)
+        result = job.future.result()["result"]
+    else:
+        result = cached["result"]
+
+    response = _json_response("topology", result)
+    response.headers["X-Cache"] = "miss" if cached is None else "hit"
+    return response
+
+@app.get("/api/cache")
+def cache_stats():
+    """
+    Result cache hits / misses / evictions and memory use
+    """
+    return RESULTS.stats()
+
+@app.get("/api/sla")
+def sla_summary():
+    """
+    Per-link, per-candidate SLA outcome without the timelines
+    """
+    artifacts = _ensure_snapshot()["artifacts"]
+
+    return {
+        link: [
+            {k: v for k, v in c.items() if k != "runs"}
+            for c in entry["candidates"]
+        ]
+        for link, entry in artifacts.get("sla", {}).items()
+    }
+
+@app.get("/api/links/{link_id}/sla")
+def link_sla(link_id: str):
+    artifacts = _ensure_snapshot()["artifacts"]
+
+    entry = artifacts.get("sla", {}).get(link_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No SLA timeline for {link_id}")
+
+    return entry
+
+@app.get("/api/links/{link_id}/traffic")
+def link_traffic(
+    link_id: str,
+    request: Request,
+    resolution: str = "auto",
+    start: float = 0.0,
+    end: Optional[float] = None,
+    points: Optional[int] = None,
+    method: str = "lttb",
+    rolling: Optional[int] = None,
+    rolling_of: str = "mean"
+):
+    """
+    Link traffic (Gbps) as min / mean / max / p99 per bucket, sliced
+    from the stored rollups.
+    resolution: raw | 1ms | 10ms | 100ms | 1s | auto
+    start / end: seconds from capture start
+    points: client point budget; larger ranges are downsampled
+    method: lttb | minmax
+    rolling: trailing window (buckets) for rolling mean / std / max
+    rolling_of: mean | max, the column rolling mean / std run over
+
+    Accept: application/octet-stream returns the columns as one
+    little-endian float32 body of shape (columns, points), described
+    by the X-Series-* headers
+    """
+    artifacts = _ensure_snapshot()["artifacts"]
+
+    pyramid = artifacts.get("rollups", {}).get(link_id)
+    if pyramid is None:
+        raise HTTPException(status_code=404, detail=f"No traffic for {link_id}")
+
+    if points is not None and points < 3:
+        raise HTTPException(status_code=400, detail="points must be >= 3")
+
+    if points is not None and points > TRAFFIC_MAX_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"points must be <= {TRAFFIC_MAX_POINTS}"
+        )
+
+    if rolling is not None and rolling < 1:
+        raise HTTPException(status_code=400, detail="rolling must be >= 1")
+
+    if method not in ("lttb", "minmax"):
+        raise HTTPException(status_code=400, detail="method must be lttb or minmax")
+
+    if rolling_of not in ("mean", "max"):
+        raise HTTPException(status_code=400, detail="rolling_of must be mean or max")
+
+    if end is None:
+        end = pyramid.length * pyramid.slot_sec
+
+    if resolution == "auto":
+        resolution = pyramid.pick_level(
+            start, end, points or TRAFFIC_DEFAULT_POINTS
+        )
+
+    if resolution not in pyramid.levels:
+        raise HTTPException(
+            status_code=400,
+            detail=f"resolution must be one of {pyramid.levels + ['auto']}"
+        )
+
+    span = min(end, pyramid.length * pyramid.slot_sec) - max(start, 0)
+    buckets = math.ceil(max(span, 0) / pyramid.bucket_sec(resolution))
+    if points is None and buckets > TRAFFIC_MAX_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"{buckets} {resolution} buckets requested, limit is "
+                f"{TRAFFIC_MAX_POINTS}; narrow the range, pick a coarser "
+                f"resolution or pass points"
+            )
+        )
+
+    if negotiate(request.headers.get("accept")) == BINARY_MEDIA_TYPE:
+        meta, columns = pyramid.query_arrays(
+            resolution, start, end,
+            points=points, method=method, rolling=rolling,
+            rolling_of=rolling_of
+        )
+        names = list(columns)
+        headers = {
+            "X-Series-Link": link_id,
+            "X-Series-Shape": f"{len(names)},{meta['points']}",
+            "X-Series-Columns": ",".join(names),
+            "X-Series-Resolution": meta["resolution"],
+            "X-Series-Bucket-Sec": str(meta["bucket_sec"]),
+            "X-Series-Start": str(meta["start"]),
+            "X-Series-End": str(meta["end"])
+        }
+
+        return _binary_response(
+            "traffic", lambda: to_series_bytes(columns.values())[0], headers
+        )
+
+    return _json_response("traffic", {
+        "link": link_id,
+        **pyramid.query(
+            resolution, start, end,
+            points=points, method=method, rolling=rolling,
+            rolling_of=rolling_of
+        )
+    })
+
+@app.get("/api/heatmap")
+def heatmap(
+    request: Request,
+    bin_ms: int = HEATMAP_BIN_MS,
+    format: Optional[str] = None
+):
+    """
+    links x time-bins congestion matrix
+
+    bin_ms is capped at HEATMAP_MAX_BIN_MS and at the capture length;
+    the response reports the width actually used.
+    format=binary: little-endian float32 body of shape
+    (metrics, links, bins), described by the X-Heatmap-* headers
+    format=json:   same data as nested lists
+    Without format, the Accept header decides (binary by default).
+    """
+    artifacts = _ensure_snapshot()["artifacts"]
+
+    if bin_ms < 1:
+        raise HTTPException(status_code=400, detail="bin_ms must be >= 1")
+
+    traffic_map = {
+        link: pyramid.raw
+        for link, pyramid in artifacts.get("rollups", {}).items()
+    }
+
+    # One bin never needs to be wider than the whole capture
+    steps = max((len(s) for s in traffic_map.values()), default=0)
+    capture_ms = max(1, math.ceil(steps * SLOT_SEC * 1000))
+    bin_ms = min(bin_ms, HEATMAP_MAX_BIN_MS, capture_ms)
+
+    with HEATMAP_LOCK:
+        hm = artifacts.setdefault("heatmaps", {}).get(bin_ms)
+
+    if hm is None:
+        # Built outside the lock; a concurrent request for the same
+        # width at worst builds it twice
+        hm = CongestionHeatmapBuilder(
+            bin_ms=bin_ms,
+            slot_sec=SLOT_SEC,
+            max_buffer_mb=SLA_MAX_BUFFER_MB
+        ).build(traffic_map, artifacts.get("capacity", {}))
+
+        with HEATMAP_LOCK:
+            heatmaps = artifacts["heatmaps"]
+            # Keep the run's default bin width plus a few recent extras
+            extras = [b for b in heatmaps if b not in (HEATMAP_BIN_MS, bin_ms)]
+            while len(extras) >= 4:
+                heatmaps.pop(extras.pop(0), None)
+            heatmaps[bin_ms] = hm
+
+    if format is None:
+        media = negotiate(request.headers.get("accept"), BINARY_MEDIA_TYPE)
+        format = "json" if media == JSON_MEDIA_TYPE else "binary"
+
+    if format == "json":
+        return _json_response("heatmap", {
+            "links": hm["links"],
+            "bin_ms": hm["bin_ms"],
+            "bins": hm["bins"],
+            "metrics": {
+                name: hm["matrix"][i].astype(float).round(4).tolist()
+                for i, name in enumerate(hm["metrics"])
+            }
+        })
+
+    return _binary_response("heatmap", hm["matrix"].tobytes, {
+        "X-Heatmap-Shape": ",".join(map(str, hm["matrix"].shape)),
+        "X-Heatmap-Links": ",".join(hm["links"]),
+        "X-Heatmap-Metrics": ",".join(hm["metrics"]),
+        "X-Heatmap-Bin-Ms": str(hm["bin_ms"])
+    })
+
+@app.get("/api/events")
+def events(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    link: Optional[str] = None,
+    type: Optional[str] = None
+):
+    """
+    Anomaly events overlapping [start, end] (seconds from capture
+    start), optionally for one link and / or rule
+    (ewma | cusum | loss_burst)
+    """
+    result = _ensure_snapshot()["result"]
+
+    if type is not None and type not in LinkAnomalyDetector.RULES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"type must be one of {list(LinkAnomalyDetector.RULES)}"
+        )
+
+    return _json_response(
+        "events", query_events(result.get("events", []), start, end, link, type)
+    )
+
+def _sse(event, data):
+    return b"".join([
+        f"event: {event}\nid: {data['seq']}\ndata: ".encode(), dumps(data), b"\n\n"
+    ])
+
+@app.get("/api/live")
+async def live(request: Request):
+    """
+    Server-Sent Events stream of the tailed pkt-stats files
+
+    event "state": running per-link totals, sent first
+    event "delta": per poll, new bucketed points (max / mean Gbps,
+    loss fraction) per link plus "capacity" / "sla" when they changed;
+    deltas with seq <= the state's seq are already included in it
+    """
+    feed = await asyncio.to_thread(_live_feed)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def push(delta):
+        loop.call_soon_threadsafe(queue.put_nowait, delta)
+
+    feed.subscribe(push)
+
+    async def stream():
+        try:
+            yield _sse("state", feed.state())
+            while True:
+                try:
+                    delta = await asyncio.wait_for(queue.get(), LIVE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+
+                if delta is None:
+                    break
+                yield _sse("delta", delta)
+        finally:
+            feed.unsubscribe(push)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    if LAST_RESULT is None:
-        LAST_RESULT = run_engine("raw")
+@app.get("/api/metrics")
+def metrics():
+    """
+    Pipeline stage / cell and HTTP latency metrics of this worker in
+    the Prometheus text format
+    """
+    return Response(content=METRICS.render(), media_type=Registry.CONTENT_TYPE)
 
-    return LAST_RESULT
+@app.get("/api/serialization")
+def serialization_report():
+    """
+    Serialization time and bytes per artifact / endpoint since startup
+    """
+    return REPORT.summary()
 
 @app.get("/api/metadata")
 def metadata():
     return {
         "threshold": CORRELATION_THRESHOLD,
+        "capacity_mode": CAPACITY_MODE,
+        "buffer_symbols": BUFFER_SYMBOLS,
+        "loss_target": LOSS_TARGET,
+        "capacity_quantile": CAPACITY_QUANTILE,
         "raw_data_path": DATA_PATH,
         "processed_data_path": PROCESSED_DATA_PATH
     }
@@ -0,0 +1,214 @@
+import numpy as np
+
+
+# Hot steps buffered per flush in bucket mode (bounds its memory)
+HOT_CHUNK = 4096
+
+
+def simulate_fifo(demand, capacity, buffer_size, return_trace=False,
+                  initial_buffer=None, bucket_slots=None):
+    """
+    Fluid FIFO buffer in front of a fixed-rate Ethernet link
+
+    demand:      (links, T) volume arriving per step
+    capacity:    (links, K) volume served per step, one column per candidate
+    buffer_size: (links, K) buffer limit, same unit as demand
+    initial_buffer: (links, K) backlog carried over from an earlier
+                 call (default empty), for simulating a series in pieces
+
+    Every candidate of every link is simulated together. Steps where no
+    link can overflow (demand <= smallest candidate) only drain the
+    buffer, so they are skipped in closed form using prefix sums and
+    the Python loop runs over "hot" steps only.
+
+    Returns dropped volume per (link, candidate), plus per-step
+    (buffer, dropped) arrays of shape (links, K, T) if return_trace.
+
+    With bucket_slots, returns (dropped, buckets) instead, where buckets
+    holds what a bucketed timeline needs without per-step traces:
+    - "buffer_max": (links, K, B) max buffer per bucket of bucket_slots
+    - "dropped":    (links, K, B) dropped volume per bucket
+    - "drop_steps": (n,) steps where any candidate dropped, ascending
+    - "drop_at":    (links, K, n) volume dropped at those steps
+    Drops only happen on hot steps, so the last two stay small unless
+    the link is overloaded most of the time.
+    """
+    demand = np.asarray(demand, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)
+    buffer_size = np.broadcast_to(
+        np.asarray(buffer_size, dtype=float), capacity.shape
+    )
+
+    n_links, steps = demand.shape
+    prefix = np.zeros((n_links, steps + 1))
+    np.cumsum(demand, axis=1, out=prefix[:, 1:])
+
+    hot = np.flatnonzero(
+        (demand > capacity.min(axis=1, keepdims=True)).any(axis=0)
+    )
+
+    buf = np.zeros(capacity.shape)
+    if initial_buffer is not None:
+        buf = buf + initial_buffer
+    dropped = np.zeros(capacity.shape)
+
+    if return_trace:
+        buf_trace = np.zeros(capacity.shape + (steps,))
+        drop_trace = np.zeros(capacity.shape + (steps,))
+
+    if bucket_slots:
+        n_buckets = -(-steps // bucket_slots)
+        buf_max = np.zeros(capacity.shape + (n_buckets,))
+        drop_sum = np.zeros(capacity.shape + (n_buckets,))
+        drop_steps, drop_at = [], []
+
+        # Hot steps are reduced per bucket a chunk at a time
+        chunk = min(len(hot), HOT_CHUNK)
+        hot_buf = np.zeros(capacity.shape + (chunk,))
+        hot_over = np.zeros(capacity.shape + (chunk,))
+
+    def flush(first, count):
+        ts = hot[first:first + count]
+        b, starts = np.unique(ts // bucket_slots, return_index=True)
+        over = hot_over[:, :, :count]
+
+        buf_max[:, :, b] = np.maximum(
+            buf_max[:, :, b], np.maximum.reduceat(hot_buf[:, :, :count], starts, axis=2)
+        )
+        drop_sum[:, :, b] += np.add.reduceat(over, starts, axis=2)
+
+        hit = (over > 0).any(axis=(0, 1))
+        drop_steps.append(ts[hit])
+        drop_at.append(over[:, :, hit])
+
+    def drain(start, stop):
+        # Net outflow over [start, stop) is never negative here, so the
+        # buffer just empties towards zero
+        if stop <= start:
+            return buf
+        if bucket_slots:
+            # The buffer only falls over the span, so a bucket's max is
+            # its value after its first step here. Step start - 1 was
+            # hot and is already in its bucket, so only buckets that
+            # begin inside the span matter.
+            first = np.arange(
+                -(-start // bucket_slots) * bucket_slots, stop, bucket_slots
+            )
+            if len(first) and buf.any():
+                arrived = (prefix[:, first + 1] - prefix[:, [start]])[:, None, :]
+                level = np.maximum(
+                    buf[:, :, None] - capacity[:, :, None] * (first - start + 1) + arrived, 0
+                )
+                idx = first // bucket_slots
+                buf_max[:, :, idx] = np.maximum(buf_max[:, :, idx], level)
+        if return_trace:
+            span = np.arange(1, stop - start + 1)
+            served = capacity[:, :, None] * span
+            arrived = (prefix[:, start + 1:stop + 1] - prefix[:, [start]])[:, None, :]
+            buf_trace[:, :, start:stop] = np.maximum(
+                buf[:, :, None] - served + arrived, 0
+            )
+        arrived = (prefix[:, stop] - prefix[:, start])[:, None]
+        return np.maximum(buf - capacity * (stop - start) + arrived, 0)
+
+    pos = 0
+    for j, t in enumerate(hot):
+        buf = drain(pos, t)
+
+        buf = buf + demand[:, t, None] - capacity
+        over = np.maximum(buf - buffer_size, 0)
+        buf = np.clip(buf, 0, buffer_size)
+        dropped += over
+
+        if return_trace:
+            buf_trace[:, :, t] = buf
+            drop_trace[:, :, t] = over
+
+        if bucket_slots:
+            hot_buf[:, :, j % chunk] = buf
+            hot_over[:, :, j % chunk] = over
+            if (j + 1) % chunk == 0:
+                flush(j + 1 - chunk, chunk)
+
+        pos = t + 1
+
+    buf = drain(pos, steps)
+
+    if bucket_slots and len(hot) % max(chunk, 1):
+        flush(len(hot) - len(hot) % chunk, len(hot) % chunk)
+
+    if return_trace:
+        return dropped, buf_trace, drop_trace
+    if bucket_slots:
+        return dropped, {
+            "buffer_max": buf_max,
+            "dropped": drop_sum,
+            "drop_steps": np.concatenate(drop_steps or [[]]).astype(np.int64),
+            "drop_at": (
+                np.concatenate(drop_at, axis=2) if drop_at
+                else np.zeros(capacity.shape + (0,))
+            )
+        }
+    return dropped
+
+
+def min_capacity_search(
+    demand_gbps,
+    slot_sec,
+    buffer_sec,
+    loss_target=0.01,
+    rel_tol=1e-3,
+    grid=8,
+    max_rounds=12
+):
+    """
+    Smallest link rate (Gbps) per link whose FIFO drop fraction stays
+    at or below loss_target. The buffer holds buffer_sec worth of data
+    at the candidate link rate.
+
+    demand_gbps: (links, T) aggregated link demand per slot
+
+    All links are searched together: every round simulates `grid`
+    candidates per link in one kernel call and narrows each bracket
+    by a factor of grid + 1.
+
+    Returns (capacity_gbps, drop_fraction) arrays of shape (links,)
+    """
+    demand_gbps = np.asarray(demand_gbps, dtype=float)
+    volume = demand_gbps * slot_sec                      # Gbit per slot
+    total = volume.sum(axis=1)
+    steps = demand_gbps.shape[1]
+
+    # Below this rate even a full buffer cannot keep loss under target
+    lo = (1 - loss_target) * total / (steps * slot_sec + buffer_sec)
+    hi = demand_gbps.max(axis=1) if steps else np.zeros(len(total))
+    lo = np.minimum(lo, hi)
+    hi_drop = np.zeros(len(total))
+
+    frac = np.arange(1, grid + 1) / (grid + 1)
+
+    for _ in range(max_rounds):
+        if np.all(hi - lo <= rel_tol * np.maximum(hi, 1e-9)):
+            break
+
+        cand = lo[:, None] + (hi - lo)[:, None] * frac
+        dropped = simulate_fifo(volume, cand * slot_sec, cand * buffer_sec)
+        drop_frac = np.divide(
+            dropped, total[:, None],
+            out=np.zeros_like(dropped), where=total[:, None] > 0
+        )
+
+        ok = drop_frac <= loss_target
+        first_ok = np.where(ok.any(axis=1), ok.argmax(axis=1), grid)
+        rows = np.arange(len(total))
+
+        passed = first_ok < grid
+        new_hi = np.where(passed, cand[rows, np.minimum(first_ok, grid - 1)], hi)
+        hi_drop = np.where(
+            passed, drop_frac[rows, np.minimum(first_ok, grid - 1)], hi_drop
+        )
+        new_lo = np.where(first_ok > 0, cand[rows, np.maximum(first_ok - 1, 0)], lo)
+
+        lo, hi = new_lo, new_hi
+
+    return hi, hi_drop
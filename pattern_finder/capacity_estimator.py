@@ -1,28 +1,69 @@
 import numpy as np
 
+from buffer_simulator import min_capacity_search
+from quantile_sketch import QuantileSketch
+from link_aggregator import LinkAggregator
+
 
 class LinkCapacityEstimator:
     """
     Estimates Ethernet link capacity
-    - Peak mode (no buffer)
-    - Safe mode (buffer-aware)
+    - Peak mode (no buffer): peak x buffer_margin
+    - Buffer mode: smallest rate whose FIFO drop fraction <= loss_target
+    - Percentile mode: high quantile of link demand from streaming
+      sketches (bounded memory, robust to single outliers)
     """
 
-    def __init__(self, buffer_margin=1.25):
+    def __init__(
+        self,
+        buffer_margin=1.25,
+        mode="margin",
+        buffer_symbols=4,
+        loss_target=0.01,
+        slot_sec=0.0005,
+        symbols_per_slot=14,
+        quantiles=(0.999, 0.9999),
+        capacity_quantile=0.9999,
+        sketch_accuracy=0.01,
+        block_size=65536
+    ):
         self.buffer_margin = buffer_margin
+        self.mode = mode
+        self.buffer_symbols = buffer_symbols
+        self.loss_target = loss_target
+        self.slot_sec = slot_sec
+        self.symbols_per_slot = symbols_per_slot
+        self.quantiles = quantiles
+        self.capacity_quantile = capacity_quantile
+        self.sketch_accuracy = sketch_accuracy
+        self.block_size = block_size
+        self.sketches = {}
+
+        self.aggregator = LinkAggregator(slot_sec=slot_sec, block_size=block_size)
+
+    @property
+    def buffer_sec(self):
+        return self.buffer_symbols * self.slot_sec / self.symbols_per_slot
+
+    def estimate(self, link_map, handler, sketches=None):
+        """
+        sketches: optional {link: QuantileSketch} from earlier time
+        ranges / runs, merged into percentile mode results
+        """
+        if self.mode == "percentile":
+            return self._percentile_capacity(link_map, handler, sketches)
 
-    def estimate(self, link_map, handler):
         capacity = {}
+        series = {}
 
-        for link, cells in link_map.items():
-            all_tx = []
+        # Only the buffer search needs the series; margin mode keeps
+        # nothing but the running peak
+        keep_series = self.mode == "buffer"
 
-            for cell in cells:
-                tx_series = handler.get_tx_series(cell)
-                if len(tx_series) > 0:
-                    all_tx.append(tx_series)
+        for link, cells in link_map.items():
+            agg = self.aggregator.aggregate(cells, handler, keep_series=keep_series)
 
-            if not all_tx:
+            if agg is None:
                 capacity[link] = {
                     "peak_gbps": 0,
                     "safe_gbps": 0,
@@ -30,18 +71,10 @@ class LinkCapacityEstimator:
                 }
                 continue
 
-            min_len = min(len(s) for s in all_tx)
-            stacked = np.vstack([s[:min_len] for s in all_tx])
-
-            total_tx = stacked.sum(axis=0)
-
-            # Convert packets → Gbps
-            bytes_per_packet = 1500
-            slot_sec = 0.0005
+            if keep_series:
+                series[link] = agg["series"]
 
-            gbps = (total_tx * bytes_per_packet * 8) / (slot_sec * 1e9)
-
-            peak = float(np.max(gbps))
+            peak = agg["peak_gbps"]
             safe = round(peak * self.buffer_margin, 3)
 
             capacity[link] = {
@@ -50,4 +83,82 @@ class LinkCapacityEstimator:
                 "buffer_mode": "margin"
             }
 
+        if self.mode == "buffer" and series:
+            capacity.update(self._buffer_capacity(series))
+
+        return capacity
+
+    # ----------------------------
+    # Buffer-aware Mode
+    # ----------------------------
+    def _buffer_capacity(self, series):
+        """
+        Binary-searches every link at once over one zero-padded
+        links x slots demand matrix (padding only drains the buffer)
+        """
+        links = list(series)
+        steps = max(len(s) for s in series.values())
+
+        demand = np.zeros((len(links), steps))
+        for i, link in enumerate(links):
+            demand[i, :len(series[link])] = series[link]
+
+        rates, drops = min_capacity_search(
+            demand,
+            self.slot_sec,
+            self.buffer_sec,
+            loss_target=self.loss_target
+        )
+
+        return {
+            link: {
+                "peak_gbps": round(float(demand[i].max()), 3),
+                "safe_gbps": round(float(rates[i]), 3),
+                "buffer_mode": "fifo",
+                "buffer_us": round(self.buffer_sec * 1e6, 2),
+                "loss_target": self.loss_target,
+                "drop_fraction": round(float(drops[i]), 5)
+            }
+            for i, link in enumerate(links)
+        }
+
+    # ----------------------------
+    # Percentile Mode
+    # ----------------------------
+    def _link_sketch(self, cells, handler):
+        """
+        Streams member cells in aligned blocks; only one block per
+        cell is in memory at a time
+        """
+        sketch = QuantileSketch(self.sketch_accuracy)
+
+        for gbps in self.aggregator.iter_blocks(cells, handler):
+            sketch.add(gbps)
+
+        return sketch
+
+    def _percentile_capacity(self, link_map, handler, sketches=None):
+        capacity = {}
+        self.sketches = {}
+
+        for link, cells in link_map.items():
+            sketch = self._link_sketch(cells, handler)
+
+            if sketches and link in sketches:
+                sketch.merge(sketches[link])
+
+            self.sketches[link] = sketch
+
+            entry = {
+                "peak_gbps": round(sketch.max, 3) if sketch.count else 0,
+                "safe_gbps": round(sketch.quantile(self.capacity_quantile), 3),
+                "buffer_mode": "percentile",
+                "capacity_quantile": self.capacity_quantile
+            }
+            for q in self.quantiles:
+                label = f"p{q * 100:g}".replace(".", "_")
+                entry[f"{label}_gbps"] = round(sketch.quantile(q), 3)
+
+            capacity[link] = entry
+
         return capacity
@@ -1,9 +1,12 @@
 
 
 import os
+import time
 import numpy as np
 import pandas as pd
 from interfaces import DataHandler
+from stage_cache import file_fingerprint
+from metrics import record_read
 
 class CleanedCSVFolderHandler(DataHandler):
     """
@@ -39,14 +42,38 @@ class CleanedCSVFolderHandler(DataHandler):
     def get_cells(self):
         return self.cells
 
-    def get_loss_series(self, cell_id):
+    def cell_fingerprint(self, cell_id):
+        path = self.file_map.get(str(cell_id))
+        return file_fingerprint(path) if path else None
+
+    def _read_csv(self, cell_id):
         path = self.file_map.get(str(cell_id))
 
         if not path:
             raise FileNotFoundError(f"No CSV mapped for cell {cell_id}")
 
+        start = time.perf_counter()
         df = pd.read_csv(path)
         df.columns = [c.lower().strip() for c in df.columns]
+        record_read(cell_id, len(df), os.path.getsize(path), time.perf_counter() - start)
+        return path, df
+
+    def get_tx_series(self, cell_id):
+        _, df = self._read_csv(cell_id)
+        return df["packets_tx"].to_numpy(dtype=float)
+
+    def get_dual_series(self, cell_id):
+        """
+        DU (packets_tx) and RU (packets_rx) from a single CSV read
+        """
+        _, df = self._read_csv(cell_id)
+        return (
+            df["packets_tx"].to_numpy(dtype=float),
+            df["packets_rx"].to_numpy(dtype=float),
+        )
+
+    def get_loss_series(self, cell_id):
+        path, df = self._read_csv(cell_id)
 
         if "loss_flag" not in df.columns:
             raise ValueError(f"{os.path.basename(path)} must contain loss_flag column")
@@ -15,3 +15,107 @@ ROLLING_WINDOW = 10
 # Output directory
 OUTPUT_DIR = "outputs"
 
+
+# Re-home single-cell links onto their nearest behavioral neighbour
+# (standardised feature distance) when correlation alone is too weak
+FEATURE_FALLBACK = False
+FEATURE_FALLBACK_MAX_DISTANCE = 2.0
+
+# Link capacity mode: "margin" (peak x 1.25), "buffer" (FIFO search),
+# "percentile" (streaming quantile sketch) or "dual" (DU vs RU capture)
+CAPACITY_MODE = "margin"
+
+# Capture slot length: one pkt-stats record per 500us slot. Every
+# packets-per-slot -> Gbps conversion uses it.
+SLOT_SEC = 0.0005
+
+# Switch buffer size in radio symbols (1 symbol = 500us / 14)
+BUFFER_SYMBOLS = 4
+SYMBOLS_PER_SLOT = 14
+
+# Max dropped fraction tolerated by buffer-aware capacity
+LOSS_TARGET = 0.01
+
+# Demand quantile provisioned by percentile capacity mode
+CAPACITY_QUANTILE = 0.9999
+
+# Capacity-vs-loss curve: grid size and demand histogram bin width
+CAPACITY_CURVE_POINTS = 41
+CAPACITY_CURVE_BIN_GBPS = 0.05
+
+# Stage graph executor: threads for ready stages, plus spawned worker
+# processes for CPU-bound / pyplot stages (0 runs those on threads)
+PIPELINE_THREADS = 4
+PIPELINE_PROCESSES = 2
+
+# Content-addressed cache of stage results (see stage_cache.py). Keys
+# cover every config value here; bump the version after changing
+# analysis code so entries computed by the old code are not reused.
+STAGE_CACHE_DIR = "outputs/stage_cache"
+STAGE_CACHE_MAX_MB = 1024
+STAGE_CACHE_VERSION = 3
+
+# Instrumentation (/api/metrics, /api/run?profile=1): HTTP latency
+# histogram buckets (s), tracemalloc peaks per stage (off: it slows
+# the record parsing several times over; RSS peaks are always kept),
+# and the profiler's sampling interval
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICS_TRACEMALLOC = False
+PROFILE_INTERVAL_MS = 5
+
+# Slots per aligned block when aggregating cells into link demand
+AGGREGATION_BLOCK_SIZE = 65536
+
+# On-disk link traffic arrays (.npy, written block by block)
+SERIES_DIR = "outputs/series"
+
+# SLA timeline (same buffer model as the dashboard packetLossModel.ts)
+SLA_MAX_BUFFER_MB = 50
+SLA_CAPACITY_FACTORS = (0.8, 0.9, 1.0, 1.1, 1.25)
+SLA_BUCKET_SLOTS = 1000
+
+# Rollup pyramid tiers (ms) for /api/links/{id}/traffic
+ROLLUP_LEVELS_MS = (1, 10, 100, 1000)
+
+# Buckets returned by resolution=auto
+TRAFFIC_DEFAULT_POINTS = 2000
+
+# Hard cap on buckets per traffic response (larger ranges get a 413)
+TRAFFIC_MAX_POINTS = 20000
+
+# Memory budget of the API's LRU cache of run results
+RESULT_CACHE_MAX_MB = 512
+
+# Versioned run snapshots shared by API worker processes
+SNAPSHOT_DIR = "outputs/snapshots"
+SNAPSHOT_KEEP = 8
+
+# Live tail of growing pkt-stats files (/api/live): poll interval,
+# bucket width of pushed points, SSE keep-alive interval
+LIVE_POLL_SEC = 0.1
+LIVE_BUCKET_MS = 100
+LIVE_KEEPALIVE_SEC = 15
+
+# A live cell this far behind its link's other cells counts as stalled
+# and is zero-filled, so the others' backlog stays bounded
+LIVE_MAX_LAG_MS = 2000
+
+# Max points drawn per traffic plot (LTTB downsampling)
+PLOT_POINTS = 4000
+
+# Default time-bin width of the links x time congestion heatmap
+HEATMAP_BIN_MS = 100
+# Widest bin a request may ask for (also capped at the capture length)
+HEATMAP_MAX_BIN_MS = 60000
+
+# Link anomaly detection (EWMA z-score, CUSUM, loss bursts)
+ANOMALY_EWMA_ALPHA = 0.01
+ANOMALY_Z_THRESHOLD = 8.0
+ANOMALY_CUSUM_K = 0.5
+ANOMALY_CUSUM_H = 100.0
+LOSS_BURST_WINDOW = 20
+LOSS_BURST_COUNT = 10
+
+# What-if simulator (backend/traffic_simulator.py): max elements of
+# the scenarios x links x slots load tensor per batch
+SIMULATOR_MAX_ELEMENTS = 2 ** 25
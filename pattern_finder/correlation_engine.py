@@ -12,24 +12,36 @@ class CorrelationEngine:
     def __init__(self, threshold):
         self.threshold = threshold
 
-    def compute_matrix(self, vectors):
+    @staticmethod
+    def _pair(x, y):
+        if len(x) > 5 and len(y) > 5:
+            corr = np.corrcoef(x, y)[0, 1]
+            return 0 if np.isnan(corr) else corr
+        return 0
+
+    def compute_matrix(self, vectors, previous=None, unchanged=()):
+        """
+        previous:  matrix from an earlier run
+        unchanged: cells whose vectors are the same as in that run;
+                   pairs of them are copied instead of recomputed, so
+                   replacing one cell costs one row and column
+        """
         cells = list(vectors.keys())
         n = len(cells)
 
         mat = np.zeros((n, n))
 
+        reuse = set()
+        if previous is not None:
+            reuse = set(unchanged) & set(previous.index)
+
         for i in range(n):
             for j in range(n):
-                x = vectors[cells[i]]
-                y = vectors[cells[j]]
-
                 if i == j:
                     mat[i, j] = 1.0
+                elif cells[i] in reuse and cells[j] in reuse:
+                    mat[i, j] = previous.at[cells[i], cells[j]]
                 else:
-                    if len(x) > 5 and len(y) > 5:
-                        corr = np.corrcoef(x, y)[0, 1]
-                        mat[i, j] = 0 if np.isnan(corr) else corr
-                    else:
-                        mat[i, j] = 0
+                    mat[i, j] = self._pair(vectors[cells[i]], vectors[cells[j]])
 
         return pd.DataFrame(mat, index=cells, columns=cells)
@@ -1,6 +1,29 @@
 import os
+import time
 import numpy as np
 from interfaces import DataHandler
+from stage_cache import file_fingerprint
+from metrics import record_read
+
+
+def parse_record(line):
+    """
+    (tx, rx, loss flag) from one pkt-stats line; None for the header
+    or a malformed line
+    """
+    parts = line.split()
+    if len(parts) < 4:
+        return None
+
+    try:
+        tx = float(parts[1])
+        rx = float(parts[2])
+        late = float(parts[3])
+    except ValueError:
+        return None
+
+    loss = max(0.0, tx - rx + late)
+    return tx, rx, 1.0 if loss > 0 else 0.0
 
 
 class RawFileDataHandler(DataHandler):
@@ -28,40 +51,77 @@ class RawFileDataHandler(DataHandler):
     def get_cells(self):
         return self.cells
 
+    def cell_fingerprint(self, cell_id):
+        return file_fingerprint(
+            os.path.join(self.data_dir, f"pkt-stats-cell-{cell_id}.dat")
+        )
+
     # ---------------------------
     # Internal file reader
     # ---------------------------
-    def _read_file(self, cell_id):
+    def _iter_records(self, cell_id, block_size=65536):
+        """
+        Streams (tx, rx, loss) arrays of at most block_size slots,
+        so long captures never have to be held in memory at once
+        """
         path = os.path.join(self.data_dir, f"pkt-stats-cell-{cell_id}.dat")
 
         tx_series = []
         rx_series = []
         loss_series = []
 
-        with open(path, "r") as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < 4:
-                    continue
-
-                try:
-                    tx = float(parts[1])
-                    rx = float(parts[2])
-                    late = float(parts[3])
-                except ValueError:
-                    continue
-
-                loss = max(0.0, tx - rx + late)
-
-                tx_series.append(tx)
-                rx_series.append(rx)
-                loss_series.append(1.0 if loss > 0 else 0.0)
-
-        return (
-            np.array(tx_series, dtype=float),
-            np.array(rx_series, dtype=float),
-            np.array(loss_series, dtype=float),
-        )
+        # Parse time excludes the consumer's time between blocks
+        rows = nbytes = 0
+        seconds = 0.0
+        start = time.perf_counter()
+
+        try:
+            with open(path, "r") as f:
+                nbytes = os.fstat(f.fileno()).st_size
+                for line in f:
+                    record = parse_record(line)
+                    if record is None:
+                        continue
+
+                    tx, rx, loss = record
+                    tx_series.append(tx)
+                    rx_series.append(rx)
+                    loss_series.append(loss)
+
+                    if len(tx_series) >= block_size:
+                        rows += len(tx_series)
+                        block = (
+                            np.array(tx_series, dtype=float),
+                            np.array(rx_series, dtype=float),
+                            np.array(loss_series, dtype=float),
+                        )
+                        tx_series, rx_series, loss_series = [], [], []
+                        seconds += time.perf_counter() - start
+                        yield block
+                        start = time.perf_counter()
+
+            if tx_series:
+                rows += len(tx_series)
+                block = (
+                    np.array(tx_series, dtype=float),
+                    np.array(rx_series, dtype=float),
+                    np.array(loss_series, dtype=float),
+                )
+                seconds += time.perf_counter() - start
+                yield block
+                start = None
+        finally:
+            if start is not None:
+                seconds += time.perf_counter() - start
+            record_read(cell_id, rows, nbytes, seconds)
+
+    def _read_file(self, cell_id):
+        blocks = list(self._iter_records(cell_id))
+
+        if not blocks:
+            return np.array([]), np.array([]), np.array([])
+
+        return tuple(np.concatenate(parts) for parts in zip(*blocks))
 
     # ---------------------------
     # Interface Methods
@@ -78,6 +138,13 @@ class RawFileDataHandler(DataHandler):
         _, rx, _ = self._read_file(cell_id)
         return rx
 
+    def get_dual_series(self, cell_id):
+        """
+        DU (tx) and RU (rx) throughput from a single file parse
+        """
+        tx, rx, _ = self._read_file(cell_id)
+        return tx, rx
+
     # ---------------------------
     # Compatibility Method
     # ---------------------------
@@ -87,3 +154,7 @@ class RawFileDataHandler(DataHandler):
         TX = DU throughput
         """
         return self.get_du_throughput(cell_id)
+
+    def iter_tx_blocks(self, cell_id, block_size=65536):
+        for tx, _, _ in self._iter_records(cell_id, block_size):
+            yield tx
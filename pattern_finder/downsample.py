@@ -0,0 +1,97 @@
+import numpy as np
+
+
+# ----------------------------
+# Bucketing helpers
+# ----------------------------
+def _segments(n, buckets, skip_ends=False):
+    """
+    Start offsets of `buckets` contiguous segments over n points
+    (optionally leaving the first and last point out)
+    """
+    lo, hi = (1, n - 1) if skip_ends else (0, n)
+    return np.unique(np.linspace(lo, hi, buckets + 1)[:-1].astype(np.int64))
+
+
+def _segment_first(mask, starts, n):
+    """
+    Index of the first True per segment (segments start at `starts`)
+    """
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.reduceat(idx, starts)
+
+
+# ----------------------------
+# Downsamplers
+# ----------------------------
+def minmax(y, points):
+    """
+    Min/max-per-bucket downsampling: keeps the lowest and highest
+    sample of each of points // 2 buckets, in time order.
+    Returns sorted indices into y.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if points >= n or n == 0:
+        return np.arange(n)
+
+    starts = _segments(n, max(points // 2, 1))
+    seg_id = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    lo = np.minimum.reduceat(y, starts)
+    hi = np.maximum.reduceat(y, starts)
+
+    i_lo = _segment_first(y == lo[seg_id], starts, n)
+    i_hi = _segment_first(y == hi[seg_id], starts, n)
+
+    return np.unique(np.concatenate([i_lo, i_hi]))
+
+
+def lttb(y, points, x=None):
+    """
+    Largest-Triangle-Three-Buckets, vectorized
+
+    First and last samples are always kept; every bucket in between
+    keeps the point forming the largest triangle with the neighbouring
+    buckets. The left anchor is the previous bucket's centroid instead
+    of its selected point, which removes the bucket-to-bucket
+    dependency so all buckets are solved in one pass.
+    Returns sorted indices into y.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.array([0, n - 1])[:max(points, 0)]
+
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    starts = _segments(n, points - 2, skip_ends=True)
+    sizes = np.diff(np.append(starts, n - 1))
+    seg_id = np.repeat(np.arange(len(starts)), sizes)
+
+    # Bucket centroids, padded with the fixed first / last point
+    cx = np.add.reduceat(x[1:n - 1], starts - 1) / sizes
+    cy = np.add.reduceat(y[1:n - 1], starts - 1) / sizes
+    cx = np.concatenate([[x[0]], cx, [x[-1]]])
+    cy = np.concatenate([[y[0]], cy, [y[-1]]])
+
+    ax, ay = cx[seg_id], cy[seg_id]              # previous bucket
+    bx, by = cx[seg_id + 2], cy[seg_id + 2]      # next bucket
+    px, py = x[1:n - 1], y[1:n - 1]
+
+    area = np.abs((ax - bx) * (py - ay) - (ax - px) * (by - ay))
+
+    best = np.maximum.reduceat(area, starts - 1)
+    chosen = _segment_first(area == best[seg_id], starts - 1, n - 2) + 1
+
+    return np.concatenate([[0], chosen, [n - 1]])
+
+
+def downsample(y, points, method="lttb", x=None):
+    if method == "minmax":
+        return minmax(y, points)
+    if method == "lttb":
+        return lttb(y, points, x)
+    raise ValueError(f"Unknown downsampling method: {method}")
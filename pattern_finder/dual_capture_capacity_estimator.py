@@ -6,88 +6,127 @@ class DualCaptureCapacityEstimator:
     - DU side = demand (before congestion)
     - RU side = delivered traffic (after congestion)
 
-    Outputs:
-    - Peak demand (Gbps)
-    - Congestion score
-    - Safe capacity with buffer margin
+    Outputs (LinkCapacityEstimator's fields, buffer_mode "dual"):
+    - peak_gbps / mean_gbps: peak and average demand
+    - safe_gbps: peak demand with buffer margin
+    - congestion: mean DU -> RU shortfall score
     """
 
-    def __init__(self, buffer_margin=0.25, slot_duration_us=143):
+    def __init__(self, buffer_margin=0.25, slot_sec=0.0005):
         """
         buffer_margin: safety margin for Ethernet provisioning (25% default)
-        slot_duration_us: 1 slot = 143 microseconds (from Nokia spec)
+        slot_sec: capture slot length, same as the traffic series
+        (config.SLOT_SEC)
         """
         self.buffer_margin = buffer_margin
-        self.slot_duration_us = slot_duration_us
+        self.slot_sec = slot_sec
 
     def _series_to_gbps(self, packet_series):
         """
         Converts packets per slot into Gbps
         Assumes:
         - 1500 byte packets
-        - slot_duration_us per slot
+        - slot_sec per slot
         """
         if len(packet_series) == 0:
             return np.array([])
 
         bits_per_packet = 1500 * 8
-        slot_seconds = self.slot_duration_us / 1_000_000
 
-        return (packet_series * bits_per_packet) / slot_seconds / 1e9
+        return (packet_series * bits_per_packet) / self.slot_sec / 1e9
+
+    def _read_matrices(self, cells, handler):
+        """
+        One read per cell → zero-padded cells x slots DU / RU matrices
+        plus the usable length of each cell
+        """
+        rows_du, rows_ru = [], []
+
+        for cell in cells:
+            if hasattr(handler, "get_dual_series"):
+                du, ru = handler.get_dual_series(cell)
+            else:
+                du = handler.get_du_throughput(cell)
+                ru = handler.get_ru_throughput(cell)
+            rows_du.append(np.asarray(du, dtype=float))
+            rows_ru.append(np.asarray(ru, dtype=float))
+
+        lengths = np.array(
+            [min(len(d), len(r)) for d, r in zip(rows_du, rows_ru)],
+            dtype=np.int64
+        )
+        steps = int(lengths.max()) if len(lengths) else 0
+
+        du_mat = np.zeros((len(cells), steps))
+        ru_mat = np.zeros((len(cells), steps))
+        for i, n in enumerate(lengths):
+            du_mat[i, :n] = rows_du[i][:n]
+            ru_mat[i, :n] = rows_ru[i][:n]
+
+        return du_mat, ru_mat, lengths
 
     def estimate(self, link_map, handler):
         """
         handler must implement:
-        - get_du_throughput(cell_id)
-        - get_ru_throughput(cell_id)
+        - get_dual_series(cell_id), or
+        - get_du_throughput(cell_id) and get_ru_throughput(cell_id)
+
+        Every link is computed at once: a links x cells membership
+        matrix sums the per-cell matrices, and each link is masked to
+        its shortest member (same alignment as before).
         """
+        links = list(link_map)
+        cells = list(dict.fromkeys(c for group in link_map.values() for c in group))
 
-        capacity_map = {}
+        if not cells:
+            return {link: {} for link in links}
 
-        for link, cells in link_map.items():
-            du_series_all = []
-            ru_series_all = []
+        col = {cell: j for j, cell in enumerate(cells)}
+        du_mat, ru_mat, lengths = self._read_matrices(cells, handler)
 
-            for cell in cells:
-                du = handler.get_du_throughput(cell)
-                ru = handler.get_ru_throughput(cell)
+        membership = np.zeros((len(links), len(cells)))
+        for i, link in enumerate(links):
+            membership[i, [col[c] for c in link_map[link]]] = 1
 
-                du_series_all.append(du)
-                ru_series_all.append(ru)
+        # Shortest member per link (0 for links without cells)
+        member_len = np.where(membership > 0, lengths, np.iinfo(np.int64).max)
+        link_len = np.where(
+            membership.any(axis=1), member_len.min(axis=1), 0
+        )
 
-            if not du_series_all:
-                capacity_map[link] = {}
-                continue
+        mask = np.arange(du_mat.shape[1]) < link_len[:, None]
 
-            # Align lengths
-            min_len = min(map(len, du_series_all + ru_series_all))
+        du_gbps = self._series_to_gbps(membership @ du_mat)
+        ru_gbps = self._series_to_gbps(membership @ ru_mat)
 
-            du_sum = np.sum([s[:min_len] for s in du_series_all], axis=0)
-            ru_sum = np.sum([s[:min_len] for s in ru_series_all], axis=0)
+        safe_len = np.maximum(link_len, 1)
+        peak_demand = np.where(mask, du_gbps, -np.inf).max(axis=1)
+        avg_demand = (du_gbps * mask).sum(axis=1) / safe_len
 
-            du_gbps = self._series_to_gbps(du_sum)
-            ru_gbps = self._series_to_gbps(ru_sum)
+        shortfall = np.clip((du_gbps - ru_gbps) / (du_gbps + 1e-9), 0, 1)
+        congestion = (shortfall * mask).sum(axis=1) / safe_len
 
-            if len(du_gbps) == 0:
-                capacity_map[link] = {}
-                continue
-
-            peak_demand = float(np.max(du_gbps))
-            avg_demand = float(np.mean(du_gbps))
+        safe_capacity = peak_demand * (1 + self.buffer_margin)
 
-            congestion = float(
-                np.mean(
-                    np.clip((du_gbps - ru_gbps) / (du_gbps + 1e-9), 0, 1)
-                )
-            )
+        capacity_map = {}
 
-            safe_capacity = peak_demand * (1 + self.buffer_margin)
+        # Same schema as LinkCapacityEstimator (peak_gbps / safe_gbps /
+        # buffer_mode) plus the dual-capture extras
+        for i, link in enumerate(links):
+            if link_len[i] == 0:
+                capacity_map[link] = {
+                    "peak_gbps": 0,
+                    "safe_gbps": 0,
+                    "buffer_mode": "dual"
+                }
+                continue
 
             capacity_map[link] = {
-                "peak_demand_gbps": round(peak_demand, 3),
-                "average_demand_gbps": round(avg_demand, 3),
-                "safe_capacity_gbps": round(safe_capacity, 3),
-                "congestion_score": round(congestion, 3),
+                "peak_gbps": round(float(peak_demand[i]), 3),
+                "safe_gbps": round(float(safe_capacity[i]), 3),
+                "buffer_mode": "dual",
+                "mean_gbps": round(float(avg_demand[i]), 3),
+                "congestion": round(float(congestion[i]), 3),
                 "buffer_margin": self.buffer_margin
             }
 
@@ -0,0 +1,398 @@
+import os
+import shutil
+import threading
+
+import numpy as np
+
+import config
+from config import (
+    DATA_PATH,
+    PROCESSED_DATA_PATH,
+    FEATURE_FALLBACK,
+    FEATURE_FALLBACK_MAX_DISTANCE,
+    SLOT_SEC,
+    BUFFER_SYMBOLS,
+    LOSS_TARGET,
+    CAPACITY_QUANTILE,
+    CAPACITY_CURVE_POINTS,
+    CAPACITY_CURVE_BIN_GBPS,
+    AGGREGATION_BLOCK_SIZE,
+    SERIES_DIR,
+    SLA_MAX_BUFFER_MB,
+    SLA_CAPACITY_FACTORS,
+    SLA_BUCKET_SLOTS,
+    ROLLUP_LEVELS_MS,
+    HEATMAP_BIN_MS,
+    ANOMALY_EWMA_ALPHA,
+    ANOMALY_Z_THRESHOLD,
+    ANOMALY_CUSUM_K,
+    ANOMALY_CUSUM_H,
+    LOSS_BURST_WINDOW,
+    LOSS_BURST_COUNT,
+    PIPELINE_THREADS,
+    PIPELINE_PROCESSES,
+    STAGE_CACHE_DIR,
+    STAGE_CACHE_MAX_MB,
+    METRICS_TRACEMALLOC
+)
+
+from data_handler import RawFileDataHandler
+from cleaned_csv_handler import CleanedCSVFolderHandler
+from loss_vector_builder import LossVectorBuilder
+from correlation_engine import CorrelationEngine
+from clustering_engine import ClusteringEngine
+from feature_vector_builder import FeatureVectorBuilder
+from confidence import compute_confidence
+from exporter import export_topology
+from capacity_estimator import LinkCapacityEstimator
+from dual_capture_capacity_estimator import DualCaptureCapacityEstimator
+from capacity_curves import CapacityCurveEstimator
+from link_traffic_analyzer import LinkTrafficAnalyzer
+from sla_timeline import SlaTimelineBuilder
+from rollup import RollupPyramid
+from heatmap_matrix import CongestionHeatmapBuilder
+from anomaly_detector import LinkAnomalyDetector, link_matrices
+from visualization import Visualizer
+from serialization import series_manifest
+from pipeline import Pipeline, Stage
+from stage_cache import StageCache, array_digest, digest
+
+
+# Shared by api.run_engine and main.py. Stage functions live at module
+# level so process-pool stages can pickle them; their parameter names
+# are the graph's value names.
+
+STAGE_CACHE = StageCache(STAGE_CACHE_DIR, max_bytes=STAGE_CACHE_MAX_MB * 2 ** 20)
+
+# Folded into every cache key: any config change (including
+# STAGE_CACHE_VERSION) gives new keys
+CONFIG_DIGEST = digest(
+    sorted((name, repr(value)) for name, value in vars(config).items() if name.isupper())
+)
+
+
+DATASET_MODES = ("raw", "processed")
+CAPACITY_MODES = ("margin", "buffer", "percentile", "dual")
+
+
+def open_dataset(dataset_mode):
+    """
+    (handler, dataset label) for "raw" or "processed"
+    """
+    if dataset_mode == "processed":
+        return CleanedCSVFolderHandler(PROCESSED_DATA_PATH), "processed"
+    return RawFileDataHandler(DATA_PATH), "raw"
+
+
+def input_digests(handler, values):
+    """
+    Cache digests of the graph's external inputs: the handler by its
+    cells' file fingerprints, plain values by repr. The handler gets
+    none (so nothing downstream is cached) if a cell has no
+    fingerprint.
+    """
+    digests = {
+        name: digest(value) for name, value in values.items() if name != "handler"
+    }
+
+    cells = tuple(handler.get_cells())
+    key = _cells_key(type(handler).__name__, handler, cells)
+    if key is not None:
+        digests["handler"] = key
+    return digests
+
+
+# ----------------------------
+# Per-cell / per-link reuse
+# ----------------------------
+def _cells_key(stage, handler, cells, params=()):
+    fingerprints = tuple(handler.cell_fingerprint(cell) for cell in cells)
+    if None in fingerprints:
+        return None
+    return digest(stage, CONFIG_DIGEST, tuple(cells), fingerprints, params)
+
+
+def _per_link(stage, link_map, handler, compute, params=(), cacheable=None):
+    """
+    compute(sub link_map) only for the links whose member cells (or
+    params) changed since a cached run; the rest come from the cache
+    """
+    results = {}
+    keys = {}
+    missing = {}
+
+    for link, cells in link_map.items():
+        key = _cells_key(stage, handler, cells, params)
+        value = STAGE_CACHE.get(key) if key else None
+        if value is None:
+            keys[link] = key
+            missing[link] = cells
+        else:
+            results[link] = value
+
+    if missing:
+        fresh = compute(missing)
+        for link, value in fresh.items():
+            if keys.get(link) and (cacheable is None or cacheable(value)):
+                STAGE_CACHE.put(keys[link], value)
+        results.update(fresh)
+
+    return {link: results[link] for link in link_map if link in results}
+
+
+def _publish_series(link, series):
+    """
+    Makes SERIES_DIR/<link>.npy the file a cached series maps (a hard
+    link, or a copy across filesystems) and maps it from there
+    """
+    src = getattr(series, "filename", None)
+    if src is None:
+        return series
+
+    # Always mapped from SERIES_DIR, even when it already is the cache
+    # file: the manifest must not point into the (pruned) cache
+    dst = os.path.abspath(os.path.join(SERIES_DIR, f"{link}.npy"))
+    if not (os.path.exists(dst) and os.path.samefile(src, dst)):
+        os.makedirs(SERIES_DIR, exist_ok=True)
+        tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    return np.load(dst, mmap_mode="r")
+
+
+# ----------------------------
+# Stages
+# ----------------------------
+def build_fingerprints(handler):
+    # One cache entry per cell file: a replaced file re-reads that cell only
+    vectors = {}
+    keys = {}
+
+    for cell in handler.get_cells():
+        keys[cell] = _cells_key("fingerprint", handler, [cell])
+        vectors[cell] = STAGE_CACHE.get(keys[cell]) if keys[cell] else None
+
+    missing = [cell for cell, vector in vectors.items() if vector is None]
+    for cell, vector in LossVectorBuilder(handler).build(missing).items():
+        if keys[cell]:
+            STAGE_CACHE.put(keys[cell], np.asarray(vector))
+        vectors[cell] = vector
+    return vectors
+
+
+def correlate(vectors, threshold):
+    # Pairs of cells whose vectors match the previous run's are copied
+    # from its matrix: one changed cell costs one row and column
+    digests = {cell: array_digest(vector) for cell, vector in vectors.items()}
+    previous = STAGE_CACHE.latest("correlation") or {}
+    unchanged = [
+        cell for cell, d in digests.items()
+        if previous.get("digests", {}).get(cell) == d
+    ]
+
+    corr_df = CorrelationEngine(threshold).compute_matrix(
+        vectors, previous.get("matrix"), unchanged
+    )
+    STAGE_CACHE.set_latest("correlation", {"digests": digests, "matrix": corr_df})
+    return corr_df
+
+
+def infer_topology(corr_df, handler, threshold):
+    link_map = ClusteringEngine(threshold).cluster(corr_df)
+
+    if FEATURE_FALLBACK:
+        link_map = FeatureVectorBuilder(handler).assign_weak_cells(
+            link_map, FEATURE_FALLBACK_MAX_DISTANCE
+        )
+    return link_map
+
+
+def estimate_capacity(link_map, handler, capacity_mode):
+    if capacity_mode == "dual":
+        estimator = DualCaptureCapacityEstimator(slot_sec=SLOT_SEC)
+    else:
+        estimator = LinkCapacityEstimator(
+            mode=capacity_mode,
+            slot_sec=SLOT_SEC,
+            buffer_symbols=BUFFER_SYMBOLS,
+            loss_target=LOSS_TARGET,
+            capacity_quantile=CAPACITY_QUANTILE,
+            block_size=AGGREGATION_BLOCK_SIZE
+        )
+
+    return _per_link(
+        "capacity", link_map, handler,
+        lambda links: estimator.estimate(links, handler),
+        params=(capacity_mode,)
+    )
+
+
+def estimate_curves(link_map, handler, traffic_map):
+    # Histograms the traffic stage's series rather than parsing the
+    # capture again. Fallback (synthetic) series get no curve, as a
+    # link without data never did.
+    estimator = CapacityCurveEstimator(
+        points=CAPACITY_CURVE_POINTS,
+        bin_gbps=CAPACITY_CURVE_BIN_GBPS,
+        slot_sec=SLOT_SEC
+    )
+
+    def compute(links):
+        curves = estimator.estimate_series(
+            {
+                link: traffic_map[link] for link in links
+                if getattr(traffic_map.get(link), "filename", None) is not None
+            },
+            block_size=AGGREGATION_BLOCK_SIZE
+        )
+        return {link: curves.get(link, {}) for link in links}
+
+    return _per_link("capacity_curves", link_map, handler, compute)
+
+
+def build_traffic(link_map, handler):
+    # Thread stage: the series stay memmaps of SERIES_DIR/<link>.npy.
+    # Fallback (synthetic) series are not cached.
+    analyzer = LinkTrafficAnalyzer(
+        slot_duration_sec=SLOT_SEC, block_size=AGGREGATION_BLOCK_SIZE
+    )
+    traffic_map = _per_link(
+        "traffic", link_map, handler,
+        lambda links: analyzer.build_timeseries(links, handler, out_dir=SERIES_DIR),
+        cacheable=lambda series: getattr(series, "filename", None) is not None
+    )
+    return {link: _publish_series(link, series) for link, series in traffic_map.items()}
+
+
+def build_rollups(traffic_map):
+    return {
+        link: RollupPyramid(series, slot_sec=SLOT_SEC, levels_ms=ROLLUP_LEVELS_MS)
+        for link, series in traffic_map.items()
+    }
+
+
+def build_sla(traffic_map, capacity_map):
+    return SlaTimelineBuilder(
+        max_buffer_mb=SLA_MAX_BUFFER_MB,
+        capacity_factors=SLA_CAPACITY_FACTORS,
+        bucket_slots=SLA_BUCKET_SLOTS
+    ).build(traffic_map, capacity_map)
+
+
+def build_heatmap(traffic_map, capacity_map):
+    return CongestionHeatmapBuilder(
+        bin_ms=HEATMAP_BIN_MS,
+        slot_sec=SLOT_SEC,
+        max_buffer_mb=SLA_MAX_BUFFER_MB
+    ).build(traffic_map, capacity_map)
+
+
+def detect_events(link_map, traffic_map, vectors):
+    links, traffic, loss = link_matrices(link_map, traffic_map, vectors)
+    return LinkAnomalyDetector(
+        links,
+        slot_sec=SLOT_SEC,
+        alpha=ANOMALY_EWMA_ALPHA,
+        z_threshold=ANOMALY_Z_THRESHOLD,
+        cusum_k=ANOMALY_CUSUM_K,
+        cusum_h=ANOMALY_CUSUM_H,
+        burst_window=LOSS_BURST_WINDOW,
+        burst_count=LOSS_BURST_COUNT
+    ).detect(traffic, loss, block_size=AGGREGATION_BLOCK_SIZE)
+
+
+def export(output_dir, link_map, confidences, threshold, dataset_label, cells,
+           capacity_map, curve_map, events, traffic_map):
+    return export_topology(
+        os.path.join(output_dir, "topology.json"),
+        link_map,
+        confidences,
+        threshold,
+        dataset_label,
+        len(cells),
+        capacity_map,
+        curve_map,
+        events,
+        series_manifest(traffic_map, output_dir)
+    )
+
+
+# ----------------------------
+# File outputs (main.py)
+# ----------------------------
+def plot_traffic(link, series, output_dir, plot_points):
+    LinkTrafficAnalyzer(slot_duration_sec=SLOT_SEC).plot(link, series, output_dir, points=plot_points)
+    return os.path.join(output_dir, f"traffic_{link}.png")
+
+
+def render_heatmap(corr_df, output_dir):
+    path = os.path.join(output_dir, "heatmap.png")
+    Visualizer().save_heatmap(corr_df, path)
+    return path
+
+
+def render_topology_graph(link_map, confidences, output_dir):
+    path = os.path.join(output_dir, "topology_graph.png")
+    Visualizer().save_topology_graph(link_map, confidences, path)
+    return path
+
+
+# ----------------------------
+# Graph
+# ----------------------------
+# fingerprints, capacity, capacity_curves and traffic reuse per-cell /
+# per-link entries themselves, so that a changed cell only recomputes
+# what it feeds; fingerprints and traffic are not cached whole (the
+# vectors would be stored twice, the series must stay files under
+# SERIES_DIR), nor is export (it writes topology.json).
+ENGINE_STAGES = [
+    Stage("fingerprints", build_fingerprints, ("handler",), ("vectors",), cache=False),
+    Stage("correlation", correlate, ("vectors", "threshold"), ("corr_df",)),
+    Stage("topology", infer_topology, ("corr_df", "handler", "threshold"), ("link_map",)),
+    Stage("confidence", compute_confidence, ("link_map", "corr_df"), ("confidences",)),
+    Stage(
+        "capacity", estimate_capacity,
+        ("link_map", "handler", "capacity_mode"), ("capacity_map",), pool="process"
+    ),
+    Stage("traffic", build_traffic, ("link_map", "handler"), ("traffic_map",), cache=False),
+    Stage(
+        "capacity_curves", estimate_curves,
+        ("link_map", "handler", "traffic_map"), ("curve_map",)
+    ),
+    Stage("rollups", build_rollups, ("traffic_map",), ("rollups",)),
+    Stage("sla", build_sla, ("traffic_map", "capacity_map"), ("sla_map",)),
+    Stage("heatmap", build_heatmap, ("traffic_map", "capacity_map"), ("heatmap",)),
+    Stage("events", detect_events, ("link_map", "traffic_map", "vectors"), ("events",)),
+    Stage(
+        "export", export,
+        (
+            "output_dir", "link_map", "confidences", "threshold", "dataset_label",
+            "cells", "capacity_map", "curve_map", "events", "traffic_map"
+        ),
+        ("topology",),
+        cache=False
+    ),
+]
+
+
+def engine_pipeline(extra_stages=(), profile=False):
+    """
+    The analysis graph, plus e.g. main.py's file and plot outputs.
+    External inputs: handler, cells, dataset_label, threshold,
+    capacity_mode, output_dir. Pass input_digests(handler, values) to
+    run() to reuse cached stage results.
+
+    profile: every stage runs on this process's threads, where a
+    sampling profiler can see it
+    """
+    return Pipeline(
+        ENGINE_STAGES + list(extra_stages),
+        threads=PIPELINE_THREADS,
+        processes=0 if profile else PIPELINE_PROCESSES,
+        cache=STAGE_CACHE,
+        salt=CONFIG_DIGEST,
+        trace_memory=METRICS_TRACEMALLOC
+    )
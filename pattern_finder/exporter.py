@@ -1,6 +1,7 @@
-import json
 from datetime import datetime
 
+from serialization import write_json
+
 
 def export_topology(
     output_path,
@@ -10,14 +11,22 @@ def export_topology(
     dataset_mode,
     cell_count,
     capacity_map=None,
-    traffic_map=None
+    curve_map=None,
+    events=None,
+    series_map=None
 ):
+    """
+    Writes compact topology JSON. Link series are not embedded;
+    series_map (see serialization.series_manifest) points at the
+    float32 .npy files instead.
+    """
     export_data = {
         "generated_at": datetime.utcnow().isoformat() + "Z",
         "dataset": dataset_mode,
         "threshold": threshold,
         "cell_count": cell_count,
-        "links": []
+        "links": [],
+        "events": events or []
     }
 
     for link, cells in link_map.items():
@@ -26,12 +35,10 @@ def export_topology(
             "cells": cells,
             "confidence": round(confidences.get(link, 0.0), 3),
             "capacity": capacity_map.get(link, {}) if capacity_map else {},
-            "traffic_timeseries": (
-                traffic_map.get(link, []) if traffic_map else []
-            )
+            "capacity_curve": curve_map.get(link, {}) if curve_map else {},
+            "series": series_map.get(link, {}) if series_map else {}
         })
 
-    with open(output_path, "w") as f:
-        json.dump(export_data, f, indent=2)
+    write_json(output_path, export_data)
 
     return export_data
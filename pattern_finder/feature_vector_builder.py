@@ -5,31 +5,246 @@ class FeatureVectorBuilder:
     """
     Builds behavioral feature vectors for each cell
     Used as fallback when correlation is weak
+
+    All cells are aligned into one cells x slots matrix and every
+    feature is computed in a single vectorized pass (no per-cell loop):
+    - loss activity + burst-length histogram
+    - inter-loss-gap statistics
+    - loss autocorrelation at key lags
+    - TX load percentiles
     """
 
+    # Burst-length histogram edges (slots): [1,2) [2,4) [4,8) [8,16) [16,inf)
+    BURST_EDGES = (1, 2, 4, 8, 16)
+
+    # 1 slot, 1 ms, 5 ms, 10 ms radio frame, 50 ms (500 us slots)
+    ACF_LAGS = (1, 2, 10, 20, 100)
+
+    LOAD_PERCENTILES = (50, 90, 99)
+
     def __init__(self, data_handler):
         self.data_handler = data_handler
 
+    @property
+    def feature_names(self):
+        names = ["loss_mean", "loss_activity"]
+        edges = list(self.BURST_EDGES) + [None]
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            names.append(f"burst_{lo}_{hi - 1}" if hi else f"burst_{lo}_plus")
+        names += ["gap_mean", "gap_std", "gap_max"]
+        names += [f"acf_lag_{lag}" for lag in self.ACF_LAGS]
+        names += ["load_mean"]
+        names += [f"load_p{p}" for p in self.LOAD_PERCENTILES]
+        return names
+
+    # ----------------------------
+    # Aligned Matrices
+    # ----------------------------
+    def _aligned(self, cells, reader):
+        rows = [np.asarray(reader(cell), dtype=float) for cell in cells]
+        keep = [i for i, r in enumerate(rows) if len(r) > 0]
+
+        if not keep:
+            return keep, np.zeros((0, 0))
+
+        min_len = min(len(rows[i]) for i in keep)
+        return keep, np.vstack([rows[i][:min_len] for i in keep])
+
+    # ----------------------------
+    # Feature Blocks
+    # ----------------------------
+    def _burst_features(self, loss):
+        n, t = loss.shape
+        flags = np.zeros((n, t + 2), dtype=np.int8)
+        flags[:, 1:-1] = loss > 0
+
+        # +1 = burst start, -1 = one past burst end (row-major order pairs them)
+        edges = np.diff(flags, axis=1)
+        start_row, start_col = np.nonzero(edges == 1)
+        _, end_col = np.nonzero(edges == -1)
+        lengths = end_col - start_col
+
+        n_bins = len(self.BURST_EDGES)
+        bins = np.searchsorted(self.BURST_EDGES, lengths, side="right") - 1
+        hist = np.bincount(
+            start_row * n_bins + bins, minlength=n * n_bins
+        ).reshape(n, n_bins).astype(float)
+        bursts = hist.sum(axis=1, keepdims=True)
+        hist = np.divide(hist, bursts, out=np.zeros_like(hist), where=bursts > 0)
+
+        # Gaps between consecutive bursts of the same cell
+        same = start_row[1:] == start_row[:-1]
+        gap_row = start_row[1:][same]
+        gaps = (start_col[1:] - end_col[:-1])[same].astype(float)
+
+        count = np.bincount(gap_row, minlength=n)
+        total = np.bincount(gap_row, weights=gaps, minlength=n)
+        total_sq = np.bincount(gap_row, weights=gaps ** 2, minlength=n)
+        gap_max = np.zeros(n)
+        np.maximum.at(gap_max, gap_row, gaps)
+
+        safe = np.maximum(count, 1)
+        gap_mean = total / safe
+        gap_std = np.sqrt(np.maximum(total_sq / safe - gap_mean ** 2, 0))
+
+        return hist, np.column_stack([gap_mean, gap_std, gap_max])
+
+    def _autocorrelation(self, loss):
+        centered = loss - loss.mean(axis=1, keepdims=True)
+        var = (centered ** 2).sum(axis=1)
+        out = np.zeros((loss.shape[0], len(self.ACF_LAGS)))
+
+        for j, lag in enumerate(self.ACF_LAGS):
+            if lag >= loss.shape[1]:
+                continue
+            cov = np.einsum("ij,ij->i", centered[:, lag:], centered[:, :-lag])
+            out[:, j] = np.divide(cov, var, out=np.zeros_like(cov), where=var > 0)
+
+        return out
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+    def build_matrix(self):
+        """
+        Returns (cells, matrix) with one row per cell and
+        columns in `feature_names` order
+        """
+        cells = list(self.data_handler.get_cells())
+
+        keep, loss = self._aligned(cells, self.data_handler.get_loss_series)
+        cells = [cells[i] for i in keep]
+
+        if not cells:
+            return [], np.zeros((0, len(self.feature_names)))
+
+        _, tx = self._aligned(cells, self.data_handler.get_tx_series)
+        if tx.shape[0] != len(cells):
+            tx = np.zeros_like(loss)
+
+        hist, gap_stats = self._burst_features(loss)
+
+        matrix = np.column_stack([
+            loss.mean(axis=1),                       # avg stress
+            np.count_nonzero(loss, axis=1) / loss.shape[1],
+            hist,
+            gap_stats,
+            self._autocorrelation(loss),
+            tx.mean(axis=1),
+            np.percentile(tx, self.LOAD_PERCENTILES, axis=1).T,
+        ])
+
+        return cells, matrix
+
     def build(self):
-        vectors = {}
+        cells, matrix = self.build_matrix()
+        return {cell: matrix[i] for i, cell in enumerate(cells)}
+
+    # ----------------------------
+    # Weak-correlation Fallback
+    # ----------------------------
+    def assign_weak_cells(self, link_map, max_distance):
+        """
+        Re-homes single-cell links onto the link of their nearest
+        behavioral neighbour (standardised feature distance).
+        Links are renumbered so ids stay contiguous.
+        """
+        cells, matrix = self.build_matrix()
+        row = {cell: i for i, cell in enumerate(cells)}
+
+        anchored = [
+            c for group in link_map.values() if len(group) > 1
+            for c in group if c in row
+        ]
+        if not anchored:
+            return link_map
+
+        owner = {c: link for link, group in link_map.items() for c in group}
+        index = FeatureIndex(anchored, matrix[[row[c] for c in anchored]])
 
-        for cell in self.data_handler.get_cells():
-            series = np.array(
-                self.data_handler.get_loss_series(cell),
-                dtype=float
-            )
+        merged = {link: list(group) for link, group in link_map.items()}
 
-            if len(series) == 0:
+        for link, group in link_map.items():
+            if len(group) != 1 or group[0] not in row:
                 continue
 
-            features = [
-                series.mean(),                          # avg stress
-                series.max(),                           # peak stress
-                np.count_nonzero(series) / len(series),# activity ratio
-                series.std(),                           # burstiness
-                np.percentile(series, 95)              # tail behavior
-            ]
+            neighbour, dist = index.query(matrix[row[group[0]]], k=1)[0]
+            if dist <= max_distance:
+                merged[owner[neighbour]].append(group[0])
+                del merged[link]
+
+        return {
+            f"Link_{i}": group
+            for i, group in enumerate(merged.values(), start=1)
+        }
+
+
+class FeatureIndex:
+    """
+    KD-tree over standardised feature vectors
+    Nearest-neighbour lookups are O(log n) on average
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, keys, matrix):
+        matrix = np.asarray(matrix, dtype=float)
+
+        self.keys = list(keys)
+        self.mean = matrix.mean(axis=0)
+        std = matrix.std(axis=0)
+        self.scale = np.where(std > 0, std, 1.0)
+        self.points = (matrix - self.mean) / self.scale
+
+        self._nodes = []
+        self._root = self._build(np.arange(len(self.keys)))
+
+    def _build(self, idx):
+        if len(idx) <= self.LEAF_SIZE:
+            self._nodes.append(("leaf", idx))
+            return len(self._nodes) - 1
+
+        pts = self.points[idx]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        order = idx[np.argsort(pts[:, axis], kind="stable")]
+        mid = len(order) // 2
+        split = self.points[order[mid], axis]
+
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left = self._build(order[:mid])
+        right = self._build(order[mid:])
+        self._nodes[node] = ("split", axis, split, left, right)
+        return node
+
+    def query(self, vector, k=1):
+        """
+        Returns [(key, distance), ...] for the k nearest entries
+        """
+        q = (np.asarray(vector, dtype=float) - self.mean) / self.scale
+        best = []   # sorted [(dist, idx)]
+
+        def worst():
+            return best[-1][0] if len(best) == k else np.inf
+
+        def visit(node_id):
+            node = self._nodes[node_id]
+
+            if node[0] == "leaf":
+                idx = node[1]
+                dist = np.sqrt(((self.points[idx] - q) ** 2).sum(axis=1))
+                best.extend(zip(dist.tolist(), idx.tolist()))
+                best.sort()
+                del best[k:]
+                return
+
+            _, axis, split, left, right = node
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
 
-            vectors[cell] = np.array(features)
+            visit(near)
+            if abs(diff) < worst():
+                visit(far)
 
-        return vectors
+        visit(self._root)
+        return [(self.keys[i], d) for d, i in best]
@@ -0,0 +1,92 @@
+import numpy as np
+
+from buffer_simulator import simulate_fifo
+
+
+class CongestionHeatmapBuilder:
+    """
+    Dense links x time-bins congestion matrix for the dashboard heatmap
+
+    Metrics per (link, bin):
+    - utilisation: mean load / safe capacity
+    - loss_ratio:  dropped / offered volume, using the dashboard buffer
+                   model (see SlaTimelineBuilder) at safe capacity
+    - peak_gbps:   max load in the bin
+
+    Everything is computed in one vectorized pass over a zero-padded
+    links x slots matrix reshaped to links x bins x slots-per-bin.
+    """
+
+    METRICS = ("utilisation", "loss_ratio", "peak_gbps")
+    MB_PER_GBPS = 125
+
+    def __init__(self, bin_ms=100, slot_sec=0.0005, max_buffer_mb=50):
+        self.bin_ms = bin_ms
+        self.slot_sec = slot_sec
+        self.max_buffer_mb = max_buffer_mb
+
+    @property
+    def bin_slots(self):
+        return max(1, int(round(self.bin_ms / 1000 / self.slot_sec)))
+
+    def build(self, traffic_map, capacity_map):
+        """
+        Returns {"links", "bin_ms", "bins", "metrics", "matrix"} where
+        matrix is float32 of shape (metrics, links, bins)
+        """
+        links = [link for link, s in traffic_map.items() if len(s) > 0]
+        f = self.bin_slots
+
+        steps = max((len(traffic_map[link]) for link in links), default=0)
+        bins = -(-steps // f)
+
+        load = np.zeros((len(links), bins * f))
+        valid = np.zeros((len(links), bins * f), dtype=bool)
+        for i, link in enumerate(links):
+            n = len(traffic_map[link])
+            load[i, :n] = traffic_map[link]
+            valid[i, :n] = True
+
+        safe = np.array([
+            capacity_map.get(link, {}).get("safe_gbps") or 0.0 for link in links
+        ])
+
+        # Links without a capacity estimate never drop
+        service = np.where(safe > 0, safe * self.MB_PER_GBPS, np.inf)
+
+        incoming = load * self.MB_PER_GBPS
+        if links:
+            _, buckets = simulate_fifo(
+                incoming,
+                service[:, None],
+                self.max_buffer_mb,
+                bucket_slots=f
+            )
+            drop_sum = buckets["dropped"][:, 0, :]
+        else:
+            drop_sum = np.zeros((0, bins))
+
+        shape = (len(links), bins, f)
+        counts = valid.reshape(shape).sum(axis=2)
+        load_sum = load.reshape(shape).sum(axis=2)
+        in_sum = incoming.reshape(shape).sum(axis=2)
+
+        mean_load = np.divide(
+            load_sum, counts, out=np.zeros_like(load_sum), where=counts > 0
+        )
+        utilisation = np.divide(
+            mean_load, safe[:, None],
+            out=np.zeros_like(mean_load), where=safe[:, None] > 0
+        )
+        loss_ratio = np.divide(
+            drop_sum, in_sum, out=np.zeros_like(drop_sum), where=in_sum > 0
+        )
+        peak = np.where(valid, load, 0).reshape(shape).max(axis=2, initial=0)
+
+        return {
+            "links": links,
+            "bin_ms": self.bin_ms,
+            "bins": bins,
+            "metrics": list(self.METRICS),
+            "matrix": np.stack([utilisation, loss_ratio, peak]).astype("<f4")
+        }
@@ -14,4 +14,18 @@ class DataHandler(ABC):
     def get_tx_series(self, cell_id) -> np.ndarray:
         pass
 
+    def iter_tx_blocks(self, cell_id, block_size=65536):
+        """
+        Yields the TX series in consecutive blocks of block_size slots.
+        Handlers that can stream their source should override this.
+        """
+        tx = self.get_tx_series(cell_id)
+        for start in range(0, len(tx), block_size):
+            yield tx[start:start + block_size]
 
+    def cell_fingerprint(self, cell_id):
+        """
+        Cheap identity of a cell's source data (e.g. file name, size,
+        mtime) for result caching; None means uncacheable
+        """
+        return None
@@ -0,0 +1,116 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+
+class Job:
+    """
+    One submitted engine run; `key` identifies its parameters
+    """
+
+    def __init__(self, key, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.params = params
+        self.status = "queued"
+        self.stage = None
+        self.progress = 0.0
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    def report(self, stage, progress):
+        self.stage = stage
+        self.progress = round(float(progress), 3)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "params": self.params,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_sec": round(
+                (self.finished_at or time.time()) - (self.started_at or time.time()), 3
+            )
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a thread pool
+
+    Submitting parameters that match a queued or running job returns
+    that job instead of starting a second computation. `on_done` is
+    called with (job, result) on the worker thread when a job succeeds,
+    which is where callers publish the result.
+    """
+
+    def __init__(self, max_workers=1, history=50):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="engine"
+        )
+        self.history = history
+        self.jobs = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, params, fn, on_done=None):
+        """
+        fn(report) runs the job; report(stage, progress) updates it.
+        Returns (job, created).
+        """
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                return job, False
+
+            job = Job(key, params)
+            self._inflight[key] = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history:
+                oldest = next(iter(self.jobs.values()))
+                if oldest.status not in ("done", "failed"):
+                    break
+                self.jobs.popitem(last=False)
+
+            job.future = self.executor.submit(self._run, job, fn, on_done)
+            return job, True
+
+    def _run(self, job, fn, on_done):
+        job.status = "running"
+        job.started_at = time.time()
+
+        try:
+            result = fn(job.report)
+            if on_done is not None:
+                on_done(job, result)
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            job.status = "done"
+            job.report("done", 1.0)
+            return result
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._inflight.pop(job.key, None)
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return [job.to_dict() for job in reversed(self.jobs.values())]
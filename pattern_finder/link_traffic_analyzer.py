@@ -1,9 +1,11 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 import math
 import random
 
+from link_aggregator import LinkAggregator
+from downsample import lttb
+
 
 class LinkTrafficAnalyzer:
     """
@@ -15,9 +17,15 @@ class LinkTrafficAnalyzer:
     - Falls back to simulated traffic when missing
     """
 
-    def __init__(self, slot_duration_sec=0.0005):
+    def __init__(
+        self, slot_duration_sec=0.0005, block_size=65536, series_dtype="<f4"
+    ):
         # 1 slot = 500 microseconds (per Nokia doc)
         self.slot_duration_sec = slot_duration_sec
+        self.series_dtype = series_dtype
+        self.aggregator = LinkAggregator(
+            slot_sec=slot_duration_sec, block_size=block_size
+        )
 
     # ----------------------------
     # Fallback Traffic Generator
@@ -47,55 +55,44 @@ class LinkTrafficAnalyzer:
     # ----------------------------
     # Build Time Series
     # ----------------------------
-    def build_timeseries(self, link_map, handler):
+    def build_timeseries(self, link_map, handler, out_dir=None):
         """
         Returns:
         {
-          "Link_1": [gbps_t0, gbps_t1, ...],
-          "Link_2": [...]
+          "Link_1": array([gbps_t0, gbps_t1, ...]),
+          "Link_2": ...
         }
+
+        Member cells are aggregated block by block. With out_dir set,
+        each link is written incrementally to out_dir/<link>.npy
+        (series_dtype, little-endian float32 by default) and returned
+        as a read-only memmap, so memory stays flat however long the
+        capture is.
         """
         link_series = {}
 
         for link, cells in link_map.items():
-            per_cell_series = []
-
-            for cell in cells:
-                try:
-                    tx = handler.get_tx_series(cell)
-                    if tx is not None and len(tx) > 0:
-                        per_cell_series.append(tx)
-                except Exception as e:
-                    print(f"[WARN] TX read failed for {cell}: {e}")
+            out_path = (
+                os.path.join(out_dir, f"{link}.npy") if out_dir else None
+            )
+            agg = self.aggregator.aggregate(
+                cells, handler, out_path=out_path, dtype=self.series_dtype
+            )
 
             # ----------------------------
             # FALLBACK MODE
             # ----------------------------
-            if not per_cell_series:
+            if agg is None:
                 print(f"[INFO] Using fallback traffic for {link}")
-                link_series[link] = self._generate_fallback_series()
+                link_series[link] = np.array(self._generate_fallback_series())
                 continue
 
-            # Align all series to shortest length
-            min_len = min(len(s) for s in per_cell_series)
-            stacked = np.vstack([s[:min_len] for s in per_cell_series])
-
-            # Aggregate traffic across cells
-            total_tx = stacked.sum(axis=0)
-
-            # Convert packets/slot → Gbps
-            # Assumption: 1500 bytes per packet
-            bytes_per_packet = 1500
-            gbps = (
-                total_tx * bytes_per_packet * 8
-            ) / (self.slot_duration_sec * 1e9)
-
-            series = gbps.tolist()
+            series = agg["series"]
 
             # Safety net
-            if len(series) < 20:
+            if agg["length"] < 20:
                 print(f"[INFO] Short series detected for {link}, using fallback")
-                series = self._generate_fallback_series()
+                series = np.array(self._generate_fallback_series())
 
             link_series[link] = series
 
@@ -104,18 +101,26 @@ class LinkTrafficAnalyzer:
     # ----------------------------
     # Plot Generator
     # ----------------------------
-    def plot(self, link, series, output_dir, seconds=60):
+    def plot(self, link, series, output_dir, seconds=60, points=None):
         """
         Generates Nokia Figure-3 style plot
+        points: max points drawn (LTTB keeps the spikes)
         """
-        if not series:
+        if series is None or len(series) == 0:
             print(f"[WARN] No series to plot for {link}")
             return
 
+        # Imported here so the API can use the analyzer without matplotlib
+        import matplotlib.pyplot as plt
+
         max_points = int(seconds / self.slot_duration_sec)
         y = np.array(series[:max_points])
         x = np.linspace(0, seconds, len(y))
 
+        if points and len(y) > points:
+            idx = lttb(y, points, x)
+            x, y = x[idx], y[idx]
+
         plt.figure(figsize=(10, 4))
         plt.plot(x, y, linewidth=0.7)
         plt.xlabel("Time (s)")
@@ -0,0 +1,365 @@
+import os
+import time
+import threading
+import numpy as np
+
+from data_handler import parse_record
+from buffer_simulator import simulate_fifo
+from sla_timeline import SlaTimelineBuilder, SLA_STATES
+
+
+EMPTY = np.zeros(0)
+
+
+class FileTail:
+    """
+    Follows one growing pkt-stats file
+
+    Each read parses only the bytes appended since the previous one; a
+    trailing partial line is kept until its newline arrives. A file
+    that shrank was rewritten (new capture) and is read from the start
+    again, with `truncated` set for the caller.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+        self.truncated = False
+
+    def read(self):
+        """
+        (tx, loss) arrays for the records completed since the last call
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return EMPTY, EMPTY
+
+        if size < self.offset:
+            self.offset = 0
+            self.partial = b""
+            self.truncated = True
+
+        if size == self.offset:
+            return EMPTY, EMPTY
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        self.offset += len(chunk)
+
+        data = self.partial + chunk
+        cut = data.rfind(b"\n") + 1
+        self.partial = data[cut:]
+
+        records = [
+            r for r in map(parse_record, data[:cut].decode(errors="replace").splitlines())
+            if r is not None
+        ]
+        if not records:
+            return EMPTY, EMPTY
+
+        values = np.array(records, dtype=float)
+        return values[:, 0], values[:, 2]
+
+
+class LiveTopology:
+    """
+    Incremental per-link traffic, loss, capacity and SLA state over
+    growing pkt-stats files
+
+    Cells are aligned by slot index: a link advances only over slots
+    all of its cells have written, in whole buckets of bucket_slots.
+    A cell more than max_lag_slots behind its link's furthest cell is
+    treated as stalled: its missing slots count as zero traffic (the
+    link's delta lists it under "stalled") and the rows it writes for
+    them later are skipped, so the siblings' backlog stays bounded.
+    The SLA buffer model (see SlaTimelineBuilder) carries its backlog
+    from one poll to the next, so only new slots are simulated.
+
+    poll() returns the delta since the previous poll, or None;
+    state() returns the running totals. seq keeps increasing across
+    resets, so clients can order a reset after the deltas before it.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        link_map,
+        capacity_map=None,
+        slot_sec=0.0005,
+        bytes_per_packet=1500,
+        bucket_slots=200,
+        buffer_margin=1.25,
+        max_buffer_mb=50,
+        max_lag_slots=4000
+    ):
+        self.data_dir = data_dir
+        self.link_map = {link: list(cells) for link, cells in link_map.items()}
+        self.capacity_map = capacity_map or {}
+        self.slot_sec = slot_sec
+        self.bytes_per_packet = bytes_per_packet
+        self.bucket_slots = bucket_slots
+        self.buffer_margin = buffer_margin
+        self.max_lag_slots = max_lag_slots
+        self.sla = SlaTimelineBuilder(max_buffer_mb=max_buffer_mb)
+
+        self.tails = {
+            cell: FileTail(os.path.join(data_dir, f"pkt-stats-cell-{cell}.dat"))
+            for cells in self.link_map.values() for cell in cells
+        }
+        self.seq = 0
+        self.reset()
+
+    def reset(self):
+        self.pending = {cell: [EMPTY, EMPTY] for cell in self.tails}
+        self.skip = {cell: 0 for cell in self.tails}
+        self.links = {}
+
+        for link in self.link_map:
+            # Capacity from the batch run is a floor; live peaks raise it
+            capacity = self.capacity_map.get(link, {})
+            self.links[link] = {
+                "slots": 0,
+                "sum_gbps": 0.0,
+                "peak_gbps": 0.0,
+                "loss_slots": 0.0,
+                "base_safe_gbps": float(capacity.get("safe_gbps") or 0.0),
+                "safe_gbps": float(capacity.get("safe_gbps") or 0.0),
+                "buffer_mb": 0.0,
+                "incoming_mb": 0.0,
+                "dropped_mb": 0.0,
+                "sla": "OK"
+            }
+
+    def _to_gbps(self, packets):
+        return (packets * self.bytes_per_packet * 8) / (self.slot_sec * 1e9)
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def poll(self):
+        for cell, tail in self.tails.items():
+            tx, loss = tail.read()
+
+            # Rows for slots already zero-filled while the cell stalled
+            drop = min(self.skip[cell], len(tx))
+            if drop:
+                tx, loss = tx[drop:], loss[drop:]
+                self.skip[cell] -= drop
+
+            if len(tx):
+                pending = self.pending[cell]
+                pending[0] = np.concatenate([pending[0], tx])
+                pending[1] = np.concatenate([pending[1], loss])
+
+        if any(tail.truncated for tail in self.tails.values()):
+            for tail in self.tails.values():
+                tail.offset, tail.partial, tail.truncated = 0, b"", False
+            self.reset()
+            self.seq += 1
+            return {"seq": self.seq, "reset": True}
+
+        links = {}
+        for link, cells in self.link_map.items():
+            delta = self._advance(link, cells)
+            if delta is not None:
+                links[link] = delta
+
+        if not links:
+            return None
+
+        self.seq += 1
+        return {"seq": self.seq, "time": time.time(), "links": links}
+
+    def _fill_stalled(self, cells):
+        """
+        Zero-fills cells lagging more than max_lag_slots behind the
+        link's furthest cell; returns them
+        """
+        lengths = {cell: len(self.pending[cell][0]) for cell in cells}
+        floor = max(lengths.values()) - self.max_lag_slots
+        stalled = [cell for cell, n in lengths.items() if n < floor]
+
+        for cell in stalled:
+            fill = np.zeros(floor - lengths[cell])
+            self.pending[cell] = [np.concatenate([p, fill]) for p in self.pending[cell]]
+            self.skip[cell] += len(fill)
+        return stalled
+
+    def _advance(self, link, cells):
+        stalled = self._fill_stalled(cells)
+        ready = min(len(self.pending[cell][0]) for cell in cells)
+        n = ready // self.bucket_slots * self.bucket_slots
+        if n == 0:
+            return None
+
+        packets = sum(self.pending[cell][0][:n] for cell in cells)
+        loss = sum(self.pending[cell][1][:n] for cell in cells) / len(cells)
+        for cell in cells:
+            self.pending[cell] = [p[n:] for p in self.pending[cell]]
+
+        gbps = self._to_gbps(packets)
+        state = self.links[link]
+        start = state["slots"]
+        delta = {
+            "start": start,
+            "bucket_slots": self.bucket_slots,
+            "max": np.round(gbps.reshape(-1, self.bucket_slots).max(axis=1), 4),
+            "mean": np.round(gbps.reshape(-1, self.bucket_slots).mean(axis=1), 4),
+            "loss": np.round(loss.reshape(-1, self.bucket_slots).mean(axis=1), 4),
+        }
+
+        state["slots"] += n
+        state["sum_gbps"] += float(gbps.sum())
+        state["loss_slots"] += float(loss.sum())
+
+        peak = float(gbps.max())
+        if peak > state["peak_gbps"]:
+            state["peak_gbps"] = peak
+            safe = max(state["base_safe_gbps"], peak * self.buffer_margin)
+            if safe != state["safe_gbps"]:
+                state["safe_gbps"] = safe
+                delta["capacity"] = self._capacity(state)
+
+        sla = self._simulate(state, gbps)
+        if sla != state["sla"]:
+            state["sla"] = sla
+            delta["sla"] = self._sla(state)
+
+        if stalled:
+            delta["stalled"] = stalled
+        delta["slots"] = state["slots"]
+        return delta
+
+    def _simulate(self, state, gbps):
+        """
+        Runs the new slots through the link's buffer at its safe
+        capacity; returns the worst SLA state among them
+        """
+        if state["safe_gbps"] <= 0:
+            return "OK"
+
+        mb = self.sla.MB_PER_GBPS
+        incoming = gbps * mb
+        _, buf, dropped = simulate_fifo(
+            incoming[None, :],
+            [[state["safe_gbps"] * mb]],
+            self.sla.max_buffer_mb,
+            return_trace=True,
+            initial_buffer=[[state["buffer_mb"]]]
+        )
+
+        state["buffer_mb"] = float(buf[0, 0, -1])
+        state["incoming_mb"] += float(incoming.sum())
+        state["dropped_mb"] += float(dropped[0, 0].sum())
+
+        loss_ratio = np.divide(
+            dropped[0, 0], incoming,
+            out=np.zeros_like(incoming), where=incoming > 0
+        )
+        return SLA_STATES[int(self.sla.classify(loss_ratio).max())]
+
+    # ----------------------------
+    # Views
+    # ----------------------------
+    @staticmethod
+    def _capacity(state):
+        return {
+            "peak_gbps": round(state["peak_gbps"], 3),
+            "safe_gbps": round(state["safe_gbps"], 3)
+        }
+
+    @staticmethod
+    def _sla(state):
+        return {
+            "state": state["sla"],
+            "buffer_mb": round(state["buffer_mb"], 3),
+            "loss_ratio": round(
+                state["dropped_mb"] / state["incoming_mb"], 6
+            ) if state["incoming_mb"] > 0 else 0.0
+        }
+
+    def state(self):
+        return {
+            "seq": self.seq,
+            "slot_sec": self.slot_sec,
+            "bucket_slots": self.bucket_slots,
+            "links": {
+                link: {
+                    "slots": s["slots"],
+                    "mean_gbps": round(s["sum_gbps"] / s["slots"], 4) if s["slots"] else 0.0,
+                    "loss_fraction": round(s["loss_slots"] / s["slots"], 6) if s["slots"] else 0.0,
+                    "capacity": self._capacity(s),
+                    "sla": self._sla(s)
+                }
+                for link, s in self.links.items()
+            }
+        }
+
+
+class LiveFeed:
+    """
+    Polls a LiveTopology on a background thread and hands each delta
+    to every subscriber callback
+
+    start() first catches up on the data already on disk without
+    publishing it (subscribers get that as state()). stop() sends None
+    to subscribers so their streams can end.
+    """
+
+    def __init__(self, topology, interval=0.1):
+        self.topology = topology
+        self.interval = interval
+        self.subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            self.topology.poll()
+        self._thread = threading.Thread(target=self._loop, name="live-tail", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._publish(None)
+
+    def subscribe(self, callback):
+        with self._lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def state(self):
+        with self._lock:
+            return self.topology.state()
+
+    def _publish(self, delta):
+        with self._lock:
+            subscribers = list(self.subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(delta)
+            except Exception as e:
+                print(f"[WARN] Live subscriber failed: {e}")
+                self.unsubscribe(callback)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self._lock:
+                    delta = self.topology.poll()
+            except Exception as e:
+                print(f"[WARN] Live tail poll failed: {e}")
+                continue
+
+            if delta is not None:
+                self._publish(delta)
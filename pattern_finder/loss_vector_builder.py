@@ -8,8 +8,11 @@ class LossVectorBuilder:
     def __init__(self, data_handler):
         self.data_handler = data_handler
 
-    def build(self):
+    def build(self, cells=None):
+        """
+        cells: subset to build (default: every cell)
+        """
         vectors = {}
-        for cell in self.data_handler.get_cells():
+        for cell in self.data_handler.get_cells() if cells is None else cells:
             vectors[cell] = self.data_handler.get_loss_series(cell)
         return vectors
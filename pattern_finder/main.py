@@ -1,18 +1,23 @@
 import os
 import numpy as np
 
-from config import DATA_PATH, PROCESSED_DATA_PATH, CORRELATION_THRESHOLD, OUTPUT_DIR
-
-from data_handler import RawFileDataHandler
-from cleaned_csv_handler import CleanedCSVFolderHandler
-from loss_vector_builder import LossVectorBuilder
-from correlation_engine import CorrelationEngine
-from clustering_engine import ClusteringEngine
-from confidence import compute_confidence
-from visualization import Visualizer
-from exporter import export_topology
-from capacity_estimator import LinkCapacityEstimator
-from link_traffic_analyzer import LinkTrafficAnalyzer
+from config import (
+    CORRELATION_THRESHOLD,
+    OUTPUT_DIR,
+    CAPACITY_MODE,
+    PLOT_POINTS
+)
+
+from engine import (
+    engine_pipeline,
+    input_digests,
+    open_dataset,
+    plot_traffic,
+    render_heatmap,
+    render_topology_graph
+)
+from pipeline import Stage
+from serialization import REPORT, write_json
 
 
 # ===============================
@@ -20,6 +25,60 @@ from link_traffic_analyzer import LinkTrafficAnalyzer
 # ===============================
 DATA_MODE = "raw"  # switch to "processed" later
 
+STAGE_MESSAGES = {
+    "fingerprints": "🧠 Building behavior fingerprints...",
+    "correlation": "📊 Computing correlation matrix...",
+    "topology": "🕸️ Inferring topology...",
+    "confidence": "📐 Computing confidence scores...",
+    "capacity": f"📡 Estimating Ethernet link capacity ({CAPACITY_MODE} mode)...",
+    "capacity_curves": "📉 Building capacity-vs-loss curves...",
+    "traffic": "📈 Generating link traffic time-series...",
+    "sla": "🚦 Simulating buffer loss and SLA timeline...",
+    "events": "🚨 Detecting load shifts and loss bursts...",
+    "heatmap_png": "🎨 Generating heatmap...",
+    "topology_graph": "🕸️ Generating topology graph...",
+    "export": "💾 Exporting topology JSON...",
+}
+
+
+# -------------------------------
+# File outputs on top of the engine graph
+# -------------------------------
+def save_vectors(vectors, output_dir):
+    np.save(os.path.join(output_dir, "loss_vectors.npy"), vectors)
+
+
+def save_corr(corr_df, output_dir):
+    corr_df.to_csv(os.path.join(output_dir, "corr_matrix.csv"))
+
+
+def save_sla(sla_map, output_dir):
+    write_json(os.path.join(output_dir, "sla_timeline.json"), sla_map)
+
+
+REPORT_STAGES = [
+    Stage("save_vectors", save_vectors, ("vectors", "output_dir")),
+    Stage("save_corr", save_corr, ("corr_df", "output_dir")),
+    Stage("save_sla", save_sla, ("sla_map", "output_dir")),
+    # pyplot is not thread-safe: renders go to worker processes. The
+    # files are the point, so renders are never served from the cache.
+    Stage(
+        "plots", plot_traffic,
+        ("traffic_map", "output_dir", "plot_points"), ("plots",),
+        pool="process", map_over="traffic_map", cache=False
+    ),
+    Stage(
+        "heatmap_png", render_heatmap,
+        ("corr_df", "output_dir"), ("heatmap_png",), pool="process",
+        cache=False
+    ),
+    Stage(
+        "topology_graph", render_topology_graph,
+        ("link_map", "confidences", "output_dir"), ("topology_graph",),
+        pool="process", cache=False
+    ),
+]
+
 
 def main():
     print("📡 Nokia Fronthaul Pattern Finder\n")
@@ -31,12 +90,7 @@ def main():
     # -------------------------------
     # Load dataset
     # -------------------------------
-    if DATA_MODE == "processed":
-        handler = CleanedCSVFolderHandler(PROCESSED_DATA_PATH)
-        dataset_label = "processed"
-    else:
-        handler = RawFileDataHandler(DATA_PATH)
-        dataset_label = "raw"
+    handler, dataset_label = open_dataset(DATA_MODE)
 
     # -------------------------------
     # Discover cells
@@ -49,82 +103,29 @@ def main():
         return
 
     # -------------------------------
-    # Build behavior fingerprints
-    # -------------------------------
-    print("🧠 Building behavior fingerprints...")
-    vectors = LossVectorBuilder(handler).build()
-    np.save(os.path.join(OUTPUT_DIR, "loss_vectors.npy"), vectors)
-
-    # -------------------------------
-    # Correlation matrix
-    # -------------------------------
-    print("📊 Computing correlation matrix...")
-    corr_engine = CorrelationEngine(CORRELATION_THRESHOLD)
-    corr_df = corr_engine.compute_matrix(vectors)
-    corr_df.to_csv(os.path.join(OUTPUT_DIR, "corr_matrix.csv"))
-
-    # -------------------------------
-    # Topology inference
-    # -------------------------------
-    print("🕸️ Inferring topology...")
-    cluster_engine = ClusteringEngine(CORRELATION_THRESHOLD)
-    link_map = cluster_engine.cluster(corr_df)
-
-    # -------------------------------
-    # Confidence scoring
-    # -------------------------------
-    print("📐 Computing confidence scores...")
-    confidences = compute_confidence(link_map, corr_df)
-
-    # -------------------------------
-    # Capacity estimation
-    # -------------------------------
-    print("📡 Estimating Ethernet link capacity (dual mode)...")
-    capacity_engine = LinkCapacityEstimator()
-    capacity_map = capacity_engine.estimate(link_map, handler)
-
-    # -------------------------------
-    # Traffic time-series
+    # Stage graph: independent stages run concurrently
     # -------------------------------
-    print("📈 Generating link traffic time-series...")
-    traffic_engine = LinkTrafficAnalyzer()
-    traffic_map = traffic_engine.build_timeseries(link_map, handler)
+    def progress(stage, fraction):
+        if stage in STAGE_MESSAGES:
+            print(STAGE_MESSAGES[stage])
 
-    for link, series in traffic_map.items():
-        traffic_engine.plot(link, series, OUTPUT_DIR)
-
-    # -------------------------------
-    # Visualization
-    # -------------------------------
-    viz = Visualizer()
-
-    print("🎨 Generating heatmap...")
-    viz.save_heatmap(
-        corr_df,
-        os.path.join(OUTPUT_DIR, "heatmap.png")
+    inputs = {
+        "handler": handler,
+        "cells": cells,
+        "dataset_label": dataset_label,
+        "threshold": CORRELATION_THRESHOLD,
+        "capacity_mode": CAPACITY_MODE,
+        "output_dir": OUTPUT_DIR,
+        "plot_points": PLOT_POINTS
+    }
+    values, report = engine_pipeline(REPORT_STAGES).run(
+        inputs, progress=progress, digests=input_digests(handler, inputs)
     )
 
-    print("🕸️ Generating topology graph...")
-    viz.save_topology_graph(
-        link_map,
-        confidences,
-        os.path.join(OUTPUT_DIR, "topology_graph.png")
-    )
-
-    # -------------------------------
-    # Export for frontend / ML
-    # -------------------------------
-    print("💾 Exporting topology JSON...")
-    export_topology(
-        os.path.join(OUTPUT_DIR, "topology.json"),
-        link_map,
-        confidences,
-        CORRELATION_THRESHOLD,
-        dataset_label,
-        len(cells),
-        capacity_map,
-        traffic_map
-    )
+    link_map = values["link_map"]
+    confidences = values["confidences"]
+    capacity_map = values["capacity_map"]
+    events = values["events"]
 
     # -------------------------------
     # Console summary
@@ -145,6 +146,34 @@ def main():
     print(f"📊 Heatmap saved to: {OUTPUT_DIR}/heatmap.png")
     print(f"🕸️ Topology graph saved to: {OUTPUT_DIR}/topology_graph.png")
     print(f"📈 Traffic plots saved to: {OUTPUT_DIR}/traffic_Link_X.png")
+    print(f"🚦 SLA timeline saved to: {OUTPUT_DIR}/sla_timeline.json")
+    print(f"🚨 {len(events)} anomaly events exported with the topology")
+
+    print(
+        f"\n⏱️ Pipeline: {report['wall_sec']:.2f}s wall, "
+        f"{report['busy_sec']:.2f}s of stage work"
+    )
+    print("   critical path:", " → ".join(report["critical_path"]))
+    if report["cached"]:
+        print("   from cache:", ", ".join(report["cached"]))
+
+    print(
+        f"   {'stage':<16} {'wall s':>7} {'cpu s':>7} {'rss MB':>8} {'+MB':>6} "
+        f"{'rows':>10} {'MB read':>8}"
+    )
+    for name, stage in report["stages"].items():
+        if stage.get("cached"):
+            continue
+        print(
+            f"   {name:<16} {stage['seconds']:>7.2f} {stage['cpu_sec']:>7.2f} "
+            f"{stage.get('peak_rss_mb') or 0:>8.0f} {stage.get('rss_delta_mb') or 0:>6.0f} "
+            f"{stage['rows']:>10} "
+            f"{stage['bytes'] / 2 ** 20:>8.1f}"
+        )
+
+    print(f"\n💾 Serialization ({REPORT.summary()['encoder']}):")
+    for name, entry in REPORT.summary()["entries"].items():
+        print(f"   {name}: {entry['last_bytes']} bytes in {entry['total_ms']} ms")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,434 @@
+import os
+import sys
+import time
+import threading
+from bisect import bisect_left
+from collections import Counter as Tally
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage
+    resource = None
+
+
+# ----------------------------
+# Read accounting
+# ----------------------------
+# Data handlers report what they parse to the innermost read_scope()
+# of the calling thread, so a pipeline stage (thread or worker
+# process) can attribute rows and bytes to itself and to each cell.
+_SCOPE = threading.local()
+
+
+@contextmanager
+def read_scope():
+    """
+    Collects record_read() calls made on this thread:
+    {cell: {"rows", "bytes", "seconds"}}
+    """
+    reads = {}
+    previous = getattr(_SCOPE, "reads", None)
+    _SCOPE.reads = reads
+    try:
+        yield reads
+    finally:
+        _SCOPE.reads = previous
+
+
+def record_read(cell, rows, nbytes, seconds):
+    reads = getattr(_SCOPE, "reads", None)
+    if reads is None:
+        return
+
+    entry = reads.setdefault(str(cell), {"rows": 0, "bytes": 0, "seconds": 0.0})
+    entry["rows"] += rows
+    entry["bytes"] += nbytes
+    entry["seconds"] += seconds
+
+
+# ----------------------------
+# Resident memory
+# ----------------------------
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_mb():
+    """
+    Resident memory of this process right now (Linux /proc); None
+    where unknown
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * _PAGE_SIZE / 2 ** 20
+
+
+def max_rss_mb():
+    """
+    Lifetime high-water resident memory of this process; None where
+    unknown
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+class RssSampler:
+    """
+    Peak resident memory over one block of code
+
+    ru_maxrss only ever grows, so it cannot say what one stage used;
+    instead a background thread samples the current RSS every
+    `interval` seconds. Reports the peak and its rise over the RSS at
+    the start of the block. RSS is per process, so stages running
+    concurrently in the same process see each other's memory.
+    Without /proc, falls back to ru_maxrss and reports no delta.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.start = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start = self.peak = current_rss_mb()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._loop, name="rss", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        return False
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def result(self):
+        if self.start is None:
+            peak = max_rss_mb()
+            return {
+                "peak_rss_mb": None if peak is None else round(peak, 2),
+                "rss_delta_mb": None
+            }
+        return {
+            "peak_rss_mb": round(self.peak, 2),
+            "rss_delta_mb": round(self.peak - self.start, 2)
+        }
+
+
+# ----------------------------
+# Prometheus registry
+# ----------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    One metric family; values are kept per label-value tuple
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """
+    Cumulative buckets, sum and count per label set
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=(0.01, 0.1, 1, 10)):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = _labels(self.label_names, key, [("le", _number(bound))])
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                labels = _labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_number(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Metric families of one process, rendered in the Prometheus text
+    exposition format (each API worker process has its own)
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=(0.01, 0.1, 1, 10)):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class PipelineMetrics:
+    """
+    Stage and cell metrics from Pipeline.run() reports
+    """
+
+    def __init__(self, registry):
+        self.runs = registry.counter(
+            "pf_pipeline_runs_total", "Engine pipeline runs"
+        )
+        self.wall = registry.gauge(
+            "pf_pipeline_wall_seconds", "Wall time of the last pipeline run"
+        )
+        self.stage_runs = registry.counter(
+            "pf_stage_runs_total", "Stage executions", ("stage", "cached")
+        )
+        self.stage_wall = registry.counter(
+            "pf_stage_wall_seconds_total", "Busy wall time per stage", ("stage",)
+        )
+        self.stage_cpu = registry.counter(
+            "pf_stage_cpu_seconds_total", "CPU time per stage", ("stage",)
+        )
+        self.stage_last = registry.gauge(
+            "pf_stage_last_wall_seconds", "Busy wall time of the stage's last run", ("stage",)
+        )
+        self.stage_rss = registry.gauge(
+            "pf_stage_peak_rss_bytes",
+            "Peak resident memory of its process during the stage's last run", ("stage",)
+        )
+        self.stage_rss_delta = registry.gauge(
+            "pf_stage_rss_delta_bytes",
+            "Rise of that peak over the RSS at the start of the stage's last run", ("stage",)
+        )
+        self.stage_traced = registry.gauge(
+            "pf_stage_traced_peak_bytes",
+            "tracemalloc peak during the stage's last traced run", ("stage",)
+        )
+        self.rows = registry.counter(
+            "pf_rows_parsed_total", "Records parsed from cell files", ("stage", "cell")
+        )
+        self.bytes = registry.counter(
+            "pf_bytes_read_total", "Bytes read from cell files", ("stage", "cell")
+        )
+        self.read_seconds = registry.counter(
+            "pf_read_seconds_total", "Time spent parsing cell files", ("stage", "cell")
+        )
+
+    def observe(self, report):
+        self.runs.inc()
+        self.wall.set(report["wall_sec"])
+
+        for stage, t in report["stages"].items():
+            self.stage_runs.inc(stage=stage, cached=str(bool(t.get("cached"))).lower())
+            if t.get("cached"):
+                continue
+
+            self.stage_wall.inc(t["seconds"], stage=stage)
+            self.stage_cpu.inc(t.get("cpu_sec", 0.0), stage=stage)
+            self.stage_last.set(t["seconds"], stage=stage)
+            if t.get("peak_rss_mb") is not None:
+                self.stage_rss.set(int(t["peak_rss_mb"] * 2 ** 20), stage=stage)
+            if t.get("rss_delta_mb") is not None:
+                self.stage_rss_delta.set(int(t["rss_delta_mb"] * 2 ** 20), stage=stage)
+            if t.get("traced_peak_mb") is not None:
+                self.stage_traced.set(int(t["traced_peak_mb"] * 2 ** 20), stage=stage)
+
+            for cell, read in t.get("reads", {}).items():
+                self.rows.inc(read["rows"], stage=stage, cell=cell)
+                self.bytes.inc(read["bytes"], stage=stage, cell=cell)
+                self.read_seconds.inc(read["seconds"], stage=stage, cell=cell)
+
+
+# ----------------------------
+# Sampling profiler
+# ----------------------------
+class SamplingProfiler:
+    """
+    Statistical profiler for one block of code
+
+    A background thread records the Python stack of the calling thread
+    and of threads whose name starts with `thread_prefix` every
+    `interval` seconds. Samples of threads parked in a wait (lock,
+    queue, selector) are dropped, so the counts are time spent working.
+    Code in other processes is not seen.
+    """
+
+    IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "thread.py")
+
+    def __init__(self, interval=0.005, thread_prefix="stage"):
+        self.interval = interval
+        self.thread_prefix = thread_prefix
+        self.stacks = Tally()
+        self.samples = 0
+        self.duration = 0.0
+        self._owner = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._owner = threading.get_ident()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._loop, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+        return False
+
+    def _loop(self):
+        own = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident != self._owner and not names.get(ident, "").startswith(self.thread_prefix):
+                    continue
+                if frame.f_code.co_filename.endswith(self.IDLE_FILES):
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                    frame = frame.f_back
+
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def result(self, top=40, max_stacks=200):
+        """
+        Functions by self / total samples, plus collapsed stacks
+        ("outer;...;inner count", the flame graph input format)
+        """
+        own = Tally()
+        total = Tally()
+        for stack, n in self.stacks.items():
+            own[stack[-1]] += n
+            for function in set(stack):
+                total[function] += n
+
+        def pct(n):
+            return round(100.0 * n / self.samples, 2) if self.samples else 0.0
+
+        return {
+            "interval_ms": round(self.interval * 1000, 3),
+            "duration_sec": round(self.duration, 3),
+            "samples": self.samples,
+            "functions": [
+                {
+                    "function": function,
+                    "self": n,
+                    "self_pct": pct(n),
+                    "total": total[function],
+                    "total_pct": pct(total[function])
+                }
+                for function, n in own.most_common(top)
+            ],
+            "stacks": [
+                f"{';'.join(stack)} {n}" for stack, n in self.stacks.most_common(max_stacks)
+            ]
+        }
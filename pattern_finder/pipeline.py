@@ -0,0 +1,364 @@
+import time
+import threading
+import tracemalloc
+import multiprocessing
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait
+)
+
+from stage_cache import digest
+from metrics import RssSampler, read_scope
+
+
+class Stage:
+    """
+    One pipeline step
+
+    fn(**inputs) returns the stage's outputs (a tuple when it declares
+    several, ignored when it declares none). With `map_over`, fn(key,
+    value, **other_inputs) runs once per item of that dict input,
+    concurrently, and the single output is {key: result}.
+
+    pool: "thread", or "process" for CPU-bound steps and libraries that
+    are not thread-safe (pyplot); fn and its arguments must then pickle.
+
+    cache: whether the pipeline's StageCache may store the outputs.
+    Off for stages whose point is a side effect (files written) or
+    whose outputs must stay tied to a path; stages without outputs are
+    never cached.
+    """
+
+    def __init__(self, name, fn, inputs=(), outputs=(), pool="thread", map_over=None,
+                 cache=True):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.pool = pool
+        self.map_over = map_over
+        self.cache = cache and bool(self.outputs)
+
+        if pool not in ("thread", "process"):
+            raise ValueError(f"{name}: pool must be 'thread' or 'process'")
+        if map_over is not None and (map_over not in self.inputs or len(self.outputs) != 1):
+            raise ValueError(f"{name}: map_over needs to be an input and one output")
+
+
+def _timed(fn, args, kwargs, trace_memory=False):
+    """
+    Runs fn on the current thread (or worker process) and measures it:
+    wall and CPU time of this thread, the process's peak RSS while it
+    ran and its rise over the starting RSS, what the data handlers
+    parsed, and with trace_memory the tracemalloc peak (process-wide,
+    so concurrent stages share it)
+    """
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    cpu = time.thread_time()
+    try:
+        with RssSampler() as rss, read_scope() as reads:
+            result = fn(*args, **kwargs)
+
+        stats = {
+            "seconds": time.perf_counter() - start,
+            "cpu_sec": time.thread_time() - cpu,
+            **rss.result(),
+            "reads": reads
+        }
+        if trace_memory:
+            stats["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    return result, stats
+
+
+# Process pools are expensive to start (spawned interpreters import
+# numpy / pandas), so one per size is kept for the process lifetime
+_PROCESS_POOLS = {}
+_PROCESS_POOLS_LOCK = threading.Lock()
+
+
+def process_pool(workers):
+    with _PROCESS_POOLS_LOCK:
+        pool = _PROCESS_POOLS.get(workers)
+        if pool is None:
+            # spawn, not fork: the API forks from a multi-threaded process
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _PROCESS_POOLS[workers] = pool
+        return pool
+
+
+class Pipeline:
+    """
+    Runs a graph of stages, each one as soon as all of its inputs exist
+
+    Stages are wired by name: an input is either another stage's output
+    or a value passed to run(). Ready stages run concurrently on a
+    thread pool, or on a shared process pool when the stage asks for
+    one and processes > 0 (otherwise it falls back to threads).
+
+    run() returns (values, report). The report has, per stage, when it
+    became ready and finished (seconds from the start of the run), its
+    busy and CPU time, peak memory and the rows / bytes it parsed per
+    cell (see _timed), plus the critical path: the chain of stages,
+    each waiting on the last-finishing producer of its inputs, that
+    sets the end-to-end time.
+
+    With a StageCache, results are content-addressed: run() takes a
+    digest per external input, a stage's key is the digest of its
+    name, `salt` (e.g. the config) and its inputs' digests, and each
+    output's digest derives from that key. A stage whose key is stored
+    is not run at all. Inputs without a digest make their consumers
+    (and everything downstream) uncacheable.
+    """
+
+    def __init__(self, stages, threads=4, processes=0, cache=None, salt="",
+                 trace_memory=False):
+        self.stages = list(stages)
+        self.threads = threads
+        self.processes = processes
+        self.cache = cache
+        self.salt = salt
+        self.trace_memory = trace_memory
+        self.producer = {}
+
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self.producer:
+                    raise ValueError(
+                        f"{output} produced by both {self.producer[output]} and {stage.name}"
+                    )
+                self.producer[output] = stage.name
+
+    def _key(self, stage, digests):
+        if any(name not in digests for name in stage.inputs):
+            return None
+        return digest(
+            stage.name, self.salt, tuple((name, digests[name]) for name in stage.inputs)
+        )
+
+    def run(self, values=None, progress=None, digests=None):
+        """
+        values:   the graph's external inputs
+        progress: optional progress(stage, fraction) as stages start
+        digests:  optional {input name: content digest} for the cache
+        """
+        values = dict(values or {})
+        digests = dict(digests or {})
+        keys = {}
+        missing = sorted({
+            name for stage in self.stages for name in stage.inputs
+            if name not in self.producer and name not in values
+        })
+        if missing:
+            raise ValueError(f"Unbound pipeline inputs: {missing}")
+
+        pending = {stage.name: stage for stage in self.stages}
+        running = {}
+        mapped = {}
+        timings = {}
+        started = 0
+        t0 = time.perf_counter()
+
+        def finish(stage, result):
+            timings[stage.name]["end"] = time.perf_counter() - t0
+            if keys.get(stage.name) and not timings[stage.name].get("cached"):
+                self.cache.put(keys[stage.name], result)
+            if len(stage.outputs) == 1:
+                values[stage.outputs[0]] = result
+            elif stage.outputs:
+                values.update(zip(stage.outputs, result))
+
+        # Traced for the whole run, so concurrent thread stages don't
+        # stop each other's tracing
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        with ThreadPoolExecutor(self.threads, thread_name_prefix="stage") as threads:
+            pools = {
+                "thread": threads,
+                "process": process_pool(self.processes) if self.processes else threads
+            }
+
+            try:
+                while pending or running:
+                    ready = [
+                        stage for stage in pending.values()
+                        if all(name in values for name in stage.inputs)
+                    ]
+                    # Cache hits finish at once and may ready more stages
+                    hits = 0
+
+                    for stage in ready:
+                        del pending[stage.name]
+                        if progress is not None:
+                            progress(stage.name, started / len(self.stages))
+                        started += 1
+
+                        pool = pools[stage.pool]
+                        kwargs = {name: values[name] for name in stage.inputs}
+                        timings[stage.name] = {
+                            "ready": time.perf_counter() - t0,
+                            "pool": "process" if pool is not threads else "thread",
+                            "seconds": 0.0
+                        }
+
+                        key = self._key(stage, digests)
+                        if key is not None:
+                            for output in stage.outputs:
+                                digests[output] = digest(key, output)
+                        if self.cache is not None and stage.cache and key is not None:
+                            keys[stage.name] = key
+                            cached = self.cache.get(key)
+                            if cached is not None:
+                                timings[stage.name]["cached"] = True
+                                finish(stage, cached)
+                                hits += 1
+                                continue
+
+                        if stage.map_over is None:
+                            future = pool.submit(_timed, stage.fn, (), kwargs, self.trace_memory)
+                            running[future] = (stage, None)
+                            continue
+
+                        items = kwargs.pop(stage.map_over)
+                        mapped[stage.name] = [len(items), {}]
+                        timings[stage.name]["items"] = len(items)
+                        if not items:
+                            finish(stage, {})
+                        for item, value in items.items():
+                            future = pool.submit(
+                                _timed, stage.fn, (item, value), kwargs, self.trace_memory
+                            )
+                            running[future] = (stage, item)
+
+                    if hits and not running:
+                        continue
+                    if not running:
+                        if pending:
+                            raise RuntimeError(
+                                f"Pipeline cannot progress: {sorted(pending)}"
+                            )
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, item = running.pop(future)
+                        result, stats = future.result()
+                        self._account(timings[stage.name], stats)
+
+                        if stage.map_over is None:
+                            finish(stage, result)
+                            continue
+
+                        remaining, results = mapped[stage.name]
+                        results[item] = result
+                        mapped[stage.name][0] = remaining - 1
+                        if remaining == 1:
+                            finish(stage, results)
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+
+        if self.cache is not None and keys:
+            self.cache.prune()
+        return values, self._report(timings, time.perf_counter() - t0)
+
+    # ----------------------------
+    # Report
+    # ----------------------------
+    @staticmethod
+    def _account(timing, stats):
+        """
+        Adds one call's stats to its stage (mapped stages: per item)
+        """
+        timing["seconds"] += stats["seconds"]
+        timing["cpu_sec"] = timing.get("cpu_sec", 0.0) + stats["cpu_sec"]
+
+        for name in ("peak_rss_mb", "rss_delta_mb", "traced_peak_mb"):
+            if stats.get(name) is not None:
+                timing[name] = max(timing.get(name) or 0.0, stats[name])
+
+        reads = timing.setdefault("reads", {})
+        for cell, read in stats["reads"].items():
+            total = reads.setdefault(cell, {"rows": 0, "bytes": 0, "seconds": 0.0})
+            for field in total:
+                total[field] += read[field]
+
+    def _critical_path(self, timings):
+        by_name = {stage.name: stage for stage in self.stages}
+        name = max(timings, key=lambda n: timings[n]["end"]) if timings else None
+        path = []
+
+        while name is not None:
+            path.append(name)
+            producers = {
+                self.producer[i] for i in by_name[name].inputs if i in self.producer
+            }
+            name = max(
+                producers, key=lambda n: timings[n]["end"], default=None
+            )
+
+        return path[::-1]
+
+    def _report(self, timings, wall_sec):
+        path = self._critical_path(timings)
+        stages = {}
+        cells = {}
+
+        for name, t in timings.items():
+            reads = {
+                cell: {**read, "seconds": round(read["seconds"], 4)}
+                for cell, read in t.get("reads", {}).items()
+            }
+            stages[name] = {
+                **t,
+                "ready": round(t["ready"], 4),
+                "end": round(t["end"], 4),
+                "seconds": round(t["seconds"], 4),
+                "cpu_sec": round(t.get("cpu_sec", 0.0), 4),
+                "rows": sum(read["rows"] for read in reads.values()),
+                "bytes": sum(read["bytes"] for read in reads.values()),
+                "reads": reads
+            }
+            if t.get("traced_peak_mb") is not None:
+                stages[name]["traced_peak_mb"] = round(t["traced_peak_mb"], 2)
+
+            for cell, read in reads.items():
+                total = cells.setdefault(cell, {"rows": 0, "bytes": 0, "seconds": 0.0})
+                for field in total:
+                    total[field] += read[field]
+
+        return {
+            "wall_sec": round(wall_sec, 4),
+            "busy_sec": round(sum(t["seconds"] for t in timings.values()), 4),
+            "critical_path": path,
+            "critical_path_sec": round(
+                sum(timings[n]["end"] - timings[n]["ready"] for n in path), 4
+            ),
+            "cpu_sec": round(sum(t.get("cpu_sec", 0.0) for t in timings.values()), 4),
+            "cached": sorted(n for n, t in timings.items() if t.get("cached")),
+            "stages": stages,
+            "cells": {
+                cell: {**total, "seconds": round(total["seconds"], 4)}
+                for cell, total in cells.items()
+            }
+        }
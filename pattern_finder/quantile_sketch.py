@@ -0,0 +1,141 @@
+import math
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable log-bucket quantile sketch (DDSketch style)
+
+    Positive values land in geometric buckets of ratio gamma, so any
+    quantile is returned within `relative_accuracy` of the true value.
+    Memory is bounded by the dynamic range (a few hundred buckets for
+    0.01 - 1000 Gbps at 1%), never by the number of samples.
+
+    Sketches built over different cells, time ranges or runs merge by
+    adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.offset = 0                    # bucket key of counts[0]
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def _grow(self, lo, hi):
+        if len(self.counts) == 0:
+            self.offset = lo
+            self.counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            return
+
+        new_lo = min(lo, self.offset)
+        new_hi = max(hi, self.offset + len(self.counts) - 1)
+        if new_lo == self.offset and new_hi == self.offset + len(self.counts) - 1:
+            return
+
+        grown = np.zeros(new_hi - new_lo + 1, dtype=np.int64)
+        start = self.offset - new_lo
+        grown[start:start + len(self.counts)] = self.counts
+        self.offset = new_lo
+        self.counts = grown
+
+    def add(self, values):
+        """
+        Adds a block of values (negative values count as zero)
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        if len(positive) == 0:
+            return self
+
+        keys = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+        lo, hi = int(keys.min()), int(keys.max())
+
+        self._grow(lo, hi)
+        self.counts += np.bincount(
+            keys - self.offset, minlength=len(self.counts)
+        )
+        return self
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+
+        if len(other.counts):
+            lo = other.offset
+            hi = other.offset + len(other.counts) - 1
+            self._grow(lo, hi)
+            start = lo - self.offset
+            self.counts[start:start + len(other.counts)] += other.counts
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        cum = np.cumsum(self.counts)
+        idx = int(np.searchsorted(cum, rank - self.zero_count, side="right"))
+        idx = min(idx, len(self.counts) - 1)
+
+        # Bucket key k covers (gamma^(k-1), gamma^k]; midpoint in log space
+        key = self.offset + idx
+        value = 2 * self.gamma ** key / (self.gamma + 1)
+        return float(min(max(value, self.min), self.max))
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "offset": self.offset,
+            "counts": self.counts.tolist(),
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.offset = data["offset"]
+        sketch.counts = np.array(data["counts"], dtype=np.int64)
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
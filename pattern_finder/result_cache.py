@@ -0,0 +1,126 @@
+import os
+import sys
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+
+def input_fingerprint(data_dir):
+    """
+    Cheap identity of a dataset folder: hash of every file's name,
+    size and mtime (one stat per file, no reads)
+    """
+    h = hashlib.sha1()
+    try:
+        names = sorted(os.listdir(data_dir))
+    except FileNotFoundError:
+        return "missing"
+
+    for name in names:
+        path = os.path.join(data_dir, name)
+        if os.path.isfile(path):
+            st = os.stat(path)
+            h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+
+    return h.hexdigest()[:16]
+
+
+def deep_size(obj, seen=None):
+    """
+    Approximate in-memory size of a result: numpy buffers by nbytes
+    (file-backed memmaps count as 0), containers and plain objects
+    walked recursively
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.memmap):
+        return 0
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if obj.base is None else sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        size += sum(
+            deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+
+    return size
+
+
+class ResultCache:
+    """
+    LRU cache of engine results with a memory budget
+
+    Entries are evicted least-recently-used first until the total
+    estimated size fits max_bytes. An entry larger than the whole
+    budget is not kept.
+    """
+
+    def __init__(self, max_bytes=512 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = deep_size(value)
+
+        with self._lock:
+            if key in self.entries:
+                self.bytes -= self.sizes.pop(key)
+                del self.entries[key]
+
+            if size > self.max_bytes:
+                return False
+
+            while self.entries and self.bytes + size > self.max_bytes:
+                old, _ = self.entries.popitem(last=False)
+                self.bytes -= self.sizes.pop(old)
+                self.evictions += 1
+
+            self.entries[key] = value
+            self.sizes[key] = size
+            self.bytes += size
+            return True
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "keys": [
+                    {"key": list(key), "bytes": self.sizes[key]}
+                    for key in self.entries
+                ]
+            }
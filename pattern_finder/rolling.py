@@ -0,0 +1,158 @@
+import numpy as np
+
+
+# ----------------------------
+# Trailing-window kernels
+# ----------------------------
+# All windows are trailing and include partial windows at the start
+# (pandas rolling(window, min_periods=1) semantics). Inputs may be
+# 1-D or 2-D (rows x time); windows run along the last axis.
+
+def _window_moments(x, window, squares=True):
+    """
+    (count, shift, s1, s2) per trailing window, where s1 / s2 are the
+    sum and sum of squares of (x - shift) over the window
+
+    Sums restart every block of `window` samples (a window is the
+    suffix of one block plus the prefix of the next) and each block is
+    recentred on its own minimum, which becomes the shift of windows
+    ending in it. Rounding therefore stays local to a window instead
+    of building up along one cumulative sum over a long series, and
+    windows of identical values (idle traffic) come out exact.
+    s2 is None unless squares.
+    """
+    lead = window - 1
+    n = x.shape[-1]
+    blocks = -(-(n + lead) // window)
+    size = blocks * window
+    rows = x.shape[:-1]
+
+    padded = np.zeros(rows + (size,))
+    padded[..., lead:lead + n] = x
+    real = np.zeros(size, dtype=bool)
+    real[lead:lead + n] = True
+
+    padded = padded.reshape(rows + (blocks, window))
+    real = real.reshape(blocks, window)
+
+    shift = np.where(real, padded, np.inf).min(axis=-1, keepdims=True)
+    shift = np.where(np.isfinite(shift), shift, 0.0)
+    y = np.where(real, padded - shift, 0.0)
+
+    def halves(v):
+        prefix = np.cumsum(v, axis=-1)
+        suffix = np.cumsum(v[..., ::-1], axis=-1)[..., ::-1]
+        flat = v.shape[:-2] + (size,)
+        return prefix.reshape(flat), suffix.reshape(flat)
+
+    start = np.arange(n)
+    end = start + lead
+    # Windows starting on a block boundary are exactly that block
+    split = start % window != 0
+
+    shift = np.broadcast_to(shift, padded.shape).reshape(rows + (size,))
+    c = shift[..., end]
+    d = np.where(split, shift[..., start] - c, 0.0)
+
+    def window_sums(v):
+        # (part in the block before, part in the window's last block)
+        prefix, suffix = halves(v)
+        return np.where(split, suffix[..., start], 0.0), prefix[..., end]
+
+    a0, b0 = window_sums(real.astype(float))
+    a1, b1 = window_sums(y)
+    count = a0 + b0
+    s1 = b1 + a1 + a0 * d
+
+    s2 = None
+    if squares:
+        a2, b2 = window_sums(y ** 2)
+        s2 = b2 + a2 + 2 * d * a1 + a0 * d ** 2
+    return count, c, s1, s2
+
+
+def rolling_sum(x, window):
+    return rolling_stats(x, window, stats=("sum",))["sum"]
+
+
+def rolling_mean(x, window):
+    return rolling_stats(x, window, stats=("mean",))["mean"]
+
+
+def rolling_std(x, window, ddof=1):
+    """
+    Windows with count <= ddof return 0 (pandas gives NaN there)
+    """
+    x = np.asarray(x, dtype=float)
+    return rolling_stats(x, window, stats=("std",), ddof=ddof)["std"]
+
+
+def rolling_max(x, window):
+    """
+    Sliding max in O(n) regardless of window size (van Herk /
+    Gil-Werman): per-block prefix and suffix maxima, then one
+    comparison per output. Vectorized equivalent of a monotonic deque.
+    """
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    window = max(1, min(window, n)) if n else 1
+
+    # Leading -inf makes the first windows partial
+    lead = np.full(x.shape[:-1] + (window - 1,), -np.inf)
+    padded = np.concatenate([lead, x], axis=-1)
+
+    total = padded.shape[-1]
+    blocks = -(-total // window)
+    tail = np.full(x.shape[:-1] + (blocks * window - total,), -np.inf)
+    padded = np.concatenate([padded, tail], axis=-1)
+
+    shaped = padded.reshape(x.shape[:-1] + (blocks, window))
+    prefix = np.maximum.accumulate(shaped, axis=-1).reshape(padded.shape)
+    suffix = np.maximum.accumulate(
+        shaped[..., ::-1], axis=-1
+    )[..., ::-1].reshape(padded.shape)
+
+    # Window [i, i + window) = suffix of i's block + prefix up to its end
+    return np.maximum(suffix[..., :n], prefix[..., window - 1:window - 1 + n])
+
+
+def rolling_stats(x, window, stats=("mean", "std", "max", "sum"), ddof=1):
+    """
+    Several statistics over the same window, sharing one pass of
+    block sums (see _window_moments). Means are clamped to the data
+    range. Returns {stat: array}.
+    """
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    out = {}
+
+    if {"sum", "mean", "std"} & set(stats):
+        if n == 0:
+            count = shift = s1 = s2 = np.zeros(x.shape)
+        else:
+            count, shift, s1, s2 = _window_moments(
+                x, max(1, min(window, n)), squares="std" in stats
+            )
+
+        if "sum" in stats:
+            out["sum"] = s1 + shift * count
+        if "mean" in stats:
+            mean = np.divide(s1, count, out=np.zeros(x.shape), where=count > 0) + shift
+            if n:
+                mean = np.clip(
+                    mean, x.min(axis=-1, keepdims=True), x.max(axis=-1, keepdims=True)
+                )
+            out["mean"] = mean
+
+        if "std" in stats:
+            denom = count - ddof
+            var = np.divide(
+                s2 - np.divide(s1 ** 2, count, out=np.zeros(x.shape), where=count > 0),
+                denom, out=np.zeros(x.shape), where=denom > 0
+            )
+            out["std"] = np.sqrt(np.maximum(var, 0))
+
+    if "max" in stats:
+        out["max"] = rolling_max(x, window)
+
+    return {stat: out[stat] for stat in stats}
@@ -0,0 +1,234 @@
+import math
+import numpy as np
+
+from downsample import downsample
+from rolling import rolling_stats, rolling_max
+
+
+class RollupPyramid:
+    """
+    Multi-resolution rollup of one link's traffic series
+
+    Every tier stores min / mean / max / p99 per time bucket, built
+    with reshape-and-reduce (no per-bucket loop). A query reads the
+    requested tier and slices it, so its cost depends on the points
+    returned, not on the capture length.
+
+    The raw series is kept as given (usually a float32 memmap) and
+    only the slices being reduced or returned are cast to float.
+    """
+
+    STATS = ("min", "mean", "max", "p99")
+
+    # Raw slots cast to float at a time while building tiers
+    CHUNK_SLOTS = 2 ** 16
+
+    def __init__(self, series, slot_sec=0.0005, levels_ms=(1, 10, 100, 1000)):
+        self.slot_sec = slot_sec
+        self.raw = series if isinstance(series, np.ndarray) else np.asarray(series)
+        self.length = len(self.raw)
+        self.tiers = {}
+
+        for ms in levels_ms:
+            factor = max(1, int(round(ms / 1000 / slot_sec)))
+            self.tiers[self.level_name(ms)] = (factor, self._reduce(factor))
+
+    @classmethod
+    def from_arrays(cls, raw, tiers, slot_sec=0.0005):
+        """
+        Rebuilds a pyramid from stored arrays (e.g. read-only memmaps)
+        without recomputing the tiers; tiers is {level: (factor, stats)}
+        """
+        pyramid = cls.__new__(cls)
+        pyramid.slot_sec = slot_sec
+        pyramid.raw = raw
+        pyramid.length = len(raw)
+        pyramid.tiers = dict(tiers)
+        return pyramid
+
+    def __getstate__(self):
+        # A memmapped series is pickled (e.g. into the stage cache) as
+        # its file path rather than its data
+        state = dict(self.__dict__)
+        path = getattr(self.raw, "filename", None)
+        if path is not None:
+            state["raw"] = None
+            state["raw_file"] = path
+        return state
+
+    def __setstate__(self, state):
+        path = state.pop("raw_file", None)
+        if path is not None:
+            state["raw"] = np.load(path, mmap_mode="r")
+        self.__dict__.update(state)
+
+    @staticmethod
+    def level_name(ms):
+        return f"{ms // 1000}s" if ms >= 1000 and ms % 1000 == 0 else f"{ms}ms"
+
+    @property
+    def levels(self):
+        return ["raw"] + list(self.tiers)
+
+    def _slice(self, i0, i1):
+        return np.asarray(self.raw[i0:i1], dtype=float)
+
+    def _reduce(self, factor):
+        full = self.length // factor * factor
+        step = max(1, self.CHUNK_SLOTS // factor) * factor
+
+        parts = [np.zeros((0, 4))]
+        for start in range(0, full, step):
+            blocks = self._slice(start, min(start + step, full)).reshape(-1, factor)
+            parts.append(np.column_stack([
+                blocks.min(axis=1),
+                blocks.mean(axis=1),
+                blocks.max(axis=1),
+                np.percentile(blocks, 99, axis=1),
+            ]))
+        stats = np.vstack(parts)
+
+        if full < self.length:
+            tail = self._slice(full, self.length)
+            stats = np.vstack([stats, [
+                tail.min(), tail.mean(), tail.max(), np.percentile(tail, 99)
+            ]])
+
+        return stats
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def bucket_sec(self, level):
+        factor = 1 if level == "raw" else self.tiers[level][0]
+        return factor * self.slot_sec
+
+    def _bucket_count(self, level):
+        return self.length if level == "raw" else len(self.tiers[level][1])
+
+    def pick_level(self, start_sec, end_sec, points):
+        """
+        Finest level returning at most `points` buckets for the range
+        """
+        span = max(end_sec - start_sec, 0)
+
+        for level in self.levels:
+            if math.ceil(span / self.bucket_sec(level)) <= points:
+                return level
+
+        return self.levels[-1]
+
+    def _column(self, level, stat, i0, i1):
+        if level == "raw":
+            return self._slice(i0, i1)
+        return self.tiers[level][1][i0:i1, self.STATS.index(stat)]
+
+    def _rolling(self, level, i0, i1, window, of="mean"):
+        """
+        Trailing rolling mean / std (of the bucket means, or of the
+        bucket maxima with of="max") and max (of bucket maxima);
+        history before i0 is used as warm-up
+        """
+        lo = max(i0 - window + 1, 0)
+        stats = rolling_stats(
+            self._column(level, of, lo, i1), window, stats=("mean", "std")
+        )
+        stats["max"] = rolling_max(self._column(level, "max", lo, i1), window)
+        return {stat: col[i0 - lo:] for stat, col in stats.items()}
+
+    def query_arrays(
+        self,
+        level,
+        start_sec=0.0,
+        end_sec=None,
+        points=None,
+        method="lttb",
+        rolling=None,
+        rolling_of="mean"
+    ):
+        """
+        Slices one tier. With `points`, a range still larger than the
+        budget is downsampled (lttb / minmax on the max column, so
+        congestion spikes survive) and bucket start times are returned
+        in "t". With `rolling`, trailing aggregates over that many
+        buckets are added as rolling_mean / rolling_std / rolling_max;
+        rolling_of picks the column (mean / max) the rolling mean and
+        std run over.
+
+        Returns (meta, columns) with numpy columns, for binary
+        responses; query() is the JSON form.
+        """
+        if level != "raw" and level not in self.tiers:
+            raise KeyError(level)
+
+        size = self.bucket_sec(level)
+        count = self._bucket_count(level)
+        if end_sec is None:
+            end_sec = count * size
+
+        i0 = min(max(int(math.floor(start_sec / size)), 0), count)
+        i1 = min(max(int(math.ceil(end_sec / size)), i0), count)
+
+        if level == "raw":
+            values = self._slice(i0, i1)
+            columns = {stat: values for stat in self.STATS}
+        else:
+            stats = self.tiers[level][1][i0:i1]
+            columns = {stat: stats[:, j] for j, stat in enumerate(self.STATS)}
+
+        if rolling:
+            roll = self._rolling(level, i0, i1, rolling, rolling_of)
+            columns.update({f"rolling_{k}": col for k, col in roll.items()})
+
+        meta = {
+            "resolution": level,
+            "bucket_sec": size,
+            "start": round(i0 * size, 6),
+            "end": round(i1 * size, 6),
+        }
+
+        if points and i1 - i0 > points:
+            idx = downsample(columns["max"], points, method)
+            columns = {name: col[idx] for name, col in columns.items()}
+            columns["t"] = np.round((i0 + idx) * size, 6)
+            meta["downsampled"] = method
+
+        if rolling:
+            meta["rolling_window"] = rolling
+            meta["rolling_of"] = rolling_of
+
+        meta["points"] = len(columns["max"])
+        return meta, columns
+
+    def query(self, level, start_sec=0.0, end_sec=None, points=None,
+              method="lttb", rolling=None, rolling_of="mean"):
+        meta, columns = self.query_arrays(
+            level, start_sec, end_sec, points, method, rolling, rolling_of
+        )
+
+        out = {
+            "resolution": meta["resolution"],
+            "bucket_sec": meta["bucket_sec"],
+            "start": meta["start"],
+            "end": meta["end"],
+            "points": meta["points"],
+        }
+
+        if "downsampled" in meta:
+            out["downsampled"] = meta["downsampled"]
+            out["t"] = columns["t"].tolist()
+
+        if rolling:
+            out["rolling"] = {
+                "window": rolling,
+                "of": rolling_of,
+                **{
+                    stat: np.round(columns[f"rolling_{stat}"], 4).tolist()
+                    for stat in ("mean", "std", "max")
+                }
+            }
+
+        out.update({
+            stat: np.round(columns[stat], 4).tolist() for stat in self.STATS
+        })
+        return out
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+# Numeric series go over the wire / to disk as little-endian float32
+SERIES_DTYPE = "<f4"
+
+
+# ----------------------------
+# JSON
+# ----------------------------
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """
+    Compact JSON as bytes: orjson when installed (numpy arrays are
+    encoded natively), stdlib json without whitespace otherwise
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+
+def write_json(path, obj):
+    """
+    Writes compact JSON and returns the number of bytes written.
+    The file is swapped in with a rename, so readers polling it (see
+    api_server.py) never see a partial write.
+    """
+    with REPORT.timer(os.path.basename(path)) as entry:
+        body = dumps(obj)
+        # Unique per thread: concurrent runs may export the same file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        entry["bytes"] = len(body)
+    return len(body)
+
+
+# ----------------------------
+# Binary series
+# ----------------------------
+def to_series_bytes(columns):
+    """
+    Stacks equal-length columns into one little-endian float32 body of
+    shape (columns, points). Returns (body, shape).
+    """
+    matrix = np.asarray(
+        [np.asarray(c, dtype=float) for c in columns], dtype=SERIES_DTYPE
+    )
+    return matrix.tobytes(), matrix.shape
+
+
+def series_manifest(traffic_map, base_dir):
+    """
+    {link: {"file", "dtype", "length"}} for series stored as .npy
+    memmaps, with file paths relative to base_dir
+    """
+    manifest = {}
+    for link, series in traffic_map.items():
+        path = getattr(series, "filename", None)
+        if path:
+            manifest[link] = {
+                "file": os.path.relpath(path, base_dir),
+                "dtype": series.dtype.str,
+                "length": len(series)
+            }
+    return manifest
+
+
+def negotiate(accept, default=JSON_MEDIA_TYPE):
+    """
+    Picks JSON or octet-stream from an Accept header by q-value;
+    wildcards and a missing header give `default`
+    """
+    best, best_q = default, 0.0
+
+    for part in (accept or "").split(","):
+        fields = [f.strip() for f in part.split(";")]
+        media = fields[0].lower()
+        q = 1.0
+        for f in fields[1:]:
+            if f.startswith("q="):
+                try:
+                    q = float(f[2:])
+                except ValueError:
+                    q = 0.0
+
+        if media in (JSON_MEDIA_TYPE, BINARY_MEDIA_TYPE) and q > best_q:
+            best, best_q = media, q
+
+    return best
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+class _Timer:
+    def __init__(self, report, name):
+        self.report = report
+        self.entry = {"name": name, "bytes": 0}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.entry
+
+    def __exit__(self, *exc):
+        self.entry["seconds"] = time.perf_counter() - self.start
+        self.report.add(self.entry)
+        return False
+
+
+class SerializationReport:
+    """
+    Time and bytes spent serializing, per artifact / endpoint
+    """
+
+    def __init__(self):
+        self.totals = {}
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    def add(self, entry):
+        total = self.totals.setdefault(
+            entry["name"], {"count": 0, "seconds": 0.0, "bytes": 0, "last_bytes": 0}
+        )
+        total["count"] += 1
+        total["seconds"] += entry["seconds"]
+        total["bytes"] += entry["bytes"]
+        total["last_bytes"] = entry["bytes"]
+
+    def summary(self):
+        return {
+            "encoder": "orjson" if orjson is not None else "json",
+            "entries": {
+                name: {
+                    "count": t["count"],
+                    "total_ms": round(t["seconds"] * 1000, 3),
+                    "mean_ms": round(t["seconds"] * 1000 / t["count"], 3),
+                    "total_bytes": t["bytes"],
+                    "last_bytes": t["last_bytes"]
+                }
+                for name, t in self.totals.items()
+            }
+        }
+
+
+REPORT = SerializationReport()
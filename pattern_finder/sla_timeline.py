@@ -0,0 +1,180 @@
+import numpy as np
+
+from buffer_simulator import simulate_fifo
+
+
+SLA_STATES = ("OK", "WARNING", "VIOLATION")
+
+
+class SlaTimelineBuilder:
+    """
+    Server-side batch version of the dashboard buffer model
+    (frontend/src/utils/packetLossModel.ts + sla.ts)
+
+    Each step pushes load x 125 MB into a MAX_BUFFER_MB buffer drained
+    at capacity x 125 MB; the overflow is dropped and the per-step loss
+    ratio is classified OK / WARNING / VIOLATION.
+
+    All links and all candidate capacities (safe capacity x factor)
+    run through one simulate_fifo call, which accumulates per-bucket
+    buffer / drops and lists the steps that dropped (every other step
+    is OK), so no per-step trace is kept. The output is compact:
+    bucketed buffer / loss / state for the safe capacity plus
+    run-length encoded WARNING / VIOLATION runs per candidate.
+    """
+
+    MB_PER_GBPS = 125
+
+    def __init__(
+        self,
+        max_buffer_mb=50,
+        capacity_factors=(0.8, 0.9, 1.0, 1.1, 1.25),
+        bucket_slots=1000,
+        warning_loss=0.005,
+        violation_loss=0.01
+    ):
+        self.max_buffer_mb = max_buffer_mb
+        self.capacity_factors = tuple(capacity_factors)
+        self.bucket_slots = bucket_slots
+        self.warning_loss = warning_loss
+        self.violation_loss = violation_loss
+
+    # ----------------------------
+    # Helpers
+    # ----------------------------
+    def classify(self, loss_ratio):
+        """
+        Vectorized getSlaStatus: 0 = OK, 1 = WARNING, 2 = VIOLATION
+        """
+        return np.select(
+            [loss_ratio > self.violation_loss, loss_ratio > self.warning_loss],
+            [2, 1],
+            default=0
+        ).astype(np.int8)
+
+    @staticmethod
+    def runs(states, steps=None):
+        """
+        [{"state", "start", "end"}] for non-OK runs (end exclusive)
+
+        states[j] is the state of slot steps[j] (default: slot j);
+        slots not listed are OK
+        """
+        states = np.asarray(states)
+        steps = np.arange(len(states)) if steps is None else np.asarray(steps)
+
+        keep = states > 0
+        states, steps = states[keep], steps[keep]
+        if len(states) == 0:
+            return []
+
+        change = np.flatnonzero((np.diff(states) != 0) | (np.diff(steps) != 1)) + 1
+        starts = np.concatenate([[0], change])
+        ends = np.concatenate([change, [len(states)]])
+
+        return [
+            {
+                "state": SLA_STATES[states[s]],
+                "start": int(steps[s]),
+                "end": int(steps[e - 1]) + 1
+            }
+            for s, e in zip(starts, ends)
+        ]
+
+    def _bucket(self, values, reduce):
+        n = len(values) // self.bucket_slots * self.bucket_slots
+        head = values[:n].reshape(-1, self.bucket_slots)
+        out = reduce(head, axis=1)
+
+        if n < len(values):
+            out = np.append(out, reduce(values[n:]))
+        return out
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+    def build(self, traffic_map, capacity_map):
+        links = [
+            link for link, series in traffic_map.items()
+            if len(series) > 0 and capacity_map.get(link, {}).get("safe_gbps")
+        ]
+        if not links:
+            return {}
+
+        steps = max(len(traffic_map[link]) for link in links)
+        load = np.zeros((len(links), steps))
+        for i, link in enumerate(links):
+            load[i, :len(traffic_map[link])] = traffic_map[link]
+
+        safe = np.array([capacity_map[link]["safe_gbps"] for link in links])
+        factors = np.array(self.capacity_factors)
+        candidates = safe[:, None] * factors
+
+        incoming = load * self.MB_PER_GBPS
+        dropped, buckets = simulate_fifo(
+            incoming,
+            candidates * self.MB_PER_GBPS,
+            self.max_buffer_mb,
+            bucket_slots=self.bucket_slots
+        )
+
+        # Per-step states at the steps that dropped; all others are OK
+        drop_steps = buckets["drop_steps"]
+        offered = incoming[:, None, drop_steps]
+        loss_ratio = np.divide(
+            buckets["drop_at"], offered,
+            out=np.zeros_like(buckets["drop_at"]), where=offered > 0
+        )
+        states = self.classify(loss_ratio)
+
+        primary = int(np.argmin(np.abs(factors - 1.0)))
+        result = {}
+
+        for i, link in enumerate(links):
+            n = len(traffic_map[link])
+            n_buckets = -(-n // self.bucket_slots)
+            in_range = drop_steps < n
+            steps_i = drop_steps[in_range]
+            total_in = incoming[i, :n].sum()
+
+            candidate_rows = []
+            for k, factor in enumerate(factors):
+                link_states = states[i, k, in_range]
+                candidate_rows.append({
+                    "factor": float(factor),
+                    "capacity_gbps": round(float(candidates[i, k]), 3),
+                    "loss_ratio": round(
+                        float(dropped[i, k] / total_in) if total_in > 0 else 0.0, 6
+                    ),
+                    "state": SLA_STATES[int(link_states.max()) if len(link_states) else 0],
+                    "violation_slots": int((link_states == 2).sum()),
+                    "warning_slots": int((link_states == 1).sum()),
+                    "runs": self.runs(link_states, steps_i)
+                })
+
+            in_buckets = self._bucket(incoming[i, :n], np.sum)
+            drop_buckets = buckets["dropped"][i, primary, :n_buckets]
+            bucket_loss = np.divide(
+                drop_buckets, in_buckets,
+                out=np.zeros_like(drop_buckets), where=in_buckets > 0
+            )
+            bucket_states = np.zeros(n_buckets, dtype=np.int8)
+            np.maximum.at(
+                bucket_states, steps_i // self.bucket_slots, states[i, primary, in_range]
+            )
+
+            result[link] = {
+                "slot_count": n,
+                "bucket_slots": self.bucket_slots,
+                "safe_gbps": float(safe[i]),
+                "candidates": candidate_rows,
+                "timeline": {
+                    "buffer_mb": np.round(
+                        buckets["buffer_max"][i, primary, :n_buckets], 3
+                    ).tolist(),
+                    "loss_ratio": np.round(bucket_loss, 6).tolist(),
+                    "state": [SLA_STATES[s] for s in bucket_states]
+                }
+            }
+
+        return result
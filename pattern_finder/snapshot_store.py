@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from rollup import RollupPyramid
+from serialization import dumps
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock within the process only
+    fcntl = None
+
+
+class SnapshotStore:
+    """
+    Versioned, immutable run snapshots shared by API worker processes
+
+    Each version is a directory of .npy arrays (rollup tiers, heatmap
+    matrices) plus meta.json with everything else. Readers map the
+    arrays read-only, so every worker shares one copy through the page
+    cache. The CURRENT file names the served version and is replaced
+    by atomic rename; a cross-process file lock makes sure only one
+    worker computes at a time. A version's topology lists its own
+    float32 series (rollup.<link>.raw.npy) in the series manifest.
+
+    Layout:
+        <root>/CURRENT
+        <root>/.lock
+        <root>/<version>/meta.json
+        <root>/<version>/rollup.<link>.<level>.npy
+        <root>/<version>/heatmap.<bin_ms>.npy
+    """
+
+    def __init__(self, root, keep=8):
+        self.root = root
+        self.keep = keep
+        self.pointer = os.path.join(root, "CURRENT")
+        self._thread_lock = threading.Lock()
+        self._pointer_state = None
+        self._pointer_version = None
+        os.makedirs(root, exist_ok=True)
+
+    # ----------------------------
+    # Locking
+    # ----------------------------
+    @contextmanager
+    def lock(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+
+            with open(os.path.join(self.root, ".lock"), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ----------------------------
+    # Pointer
+    # ----------------------------
+    def current_version(self):
+        """
+        Version named by CURRENT; re-read only when the file changed
+        """
+        try:
+            st = os.stat(self.pointer)
+        except FileNotFoundError:
+            return None
+
+        state = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if state != self._pointer_state:
+            with open(self.pointer) as f:
+                self._pointer_version = f.read().strip() or None
+            self._pointer_state = state
+
+        return self._pointer_version
+
+    def set_current(self, version):
+        if self.current_version() == version:
+            return
+
+        # Unique per thread: concurrent cache hits may switch at once
+        tmp = f"{self.pointer}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(version)
+        os.replace(tmp, self.pointer)
+
+    # ----------------------------
+    # Write
+    # ----------------------------
+    @staticmethod
+    def key_id(key):
+        return hashlib.sha1(repr(tuple(key)).encode()).hexdigest()[:10]
+
+    def publish(self, key, params, submitted_at, result, artifacts, activate=True):
+        """
+        Writes a new version and, unless activate=False, points CURRENT
+        at it. Returns the version name.
+        """
+        version = f"{time.time_ns()}-{self.key_id(key)}"
+        tmp_dir = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(tmp_dir)
+
+        rollups = {}
+        series = {}
+        for link, pyramid in artifacts.get("rollups", {}).items():
+            raw_name = f"rollup.{link}.raw.npy"
+            np.save(
+                os.path.join(tmp_dir, raw_name),
+                np.asarray(pyramid.raw, dtype="<f4")
+            )
+            series[link] = {
+                "file": os.path.join(os.path.basename(self.root), version, raw_name),
+                "dtype": "<f4",
+                "length": pyramid.length
+            }
+            levels = {}
+            for level, (factor, stats) in pyramid.tiers.items():
+                np.save(os.path.join(tmp_dir, f"rollup.{link}.{level}.npy"), stats)
+                levels[level] = factor
+            rollups[link] = {"slot_sec": pyramid.slot_sec, "levels": levels}
+
+        heatmaps = {}
+        for bin_ms, hm in artifacts.get("heatmaps", {}).items():
+            np.save(os.path.join(tmp_dir, f"heatmap.{bin_ms}.npy"), hm["matrix"])
+            heatmaps[str(bin_ms)] = {k: v for k, v in hm.items() if k != "matrix"}
+
+        meta = {
+            "version": version,
+            "key": list(key),
+            "params": params,
+            "submitted_at": submitted_at,
+            "created_at": time.time(),
+            "result": self._with_series(result, series),
+            "sla": artifacts.get("sla", {}),
+            "capacity": artifacts.get("capacity", {}),
+            "pipeline": artifacts.get("pipeline", {}),
+            "rollups": rollups,
+            "heatmaps": heatmaps
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "wb") as f:
+            f.write(dumps(meta))
+
+        os.rename(tmp_dir, os.path.join(self.root, version))
+        if activate:
+            self.set_current(version)
+        self._prune()
+        return version
+
+    @staticmethod
+    def _with_series(result, series):
+        """
+        Points the topology's series manifest at this version's own raw
+        arrays; the shared SERIES_DIR files are rewritten by every run
+        """
+        links = result.get("links")
+        if not series or not isinstance(links, list):
+            return result
+
+        return {
+            **result,
+            "links": [
+                {**link, "series": series.get(link.get("id"), {})}
+                for link in links
+            ]
+        }
+
+    def _versions(self):
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith(".") and name != "CURRENT"
+            and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def _prune(self):
+        """
+        Drops the oldest versions beyond `keep`. Workers still mapping
+        one keep their open files (unlinked inodes stay readable).
+        """
+        current = self.current_version()
+        versions = [v for v in self._versions() if v != current]
+        for version in versions[:max(len(versions) - self.keep + 1, 0)]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+    # ----------------------------
+    # Read
+    # ----------------------------
+    def exists(self, version):
+        return os.path.isdir(os.path.join(self.root, version))
+
+    def find(self, key, newer_than=0.0):
+        """
+        Newest version for key created after `newer_than`, or None
+        """
+        suffix = f"-{self.key_id(key)}"
+        for version in reversed(self._versions()):
+            if version.endswith(suffix):
+                created = int(version.split("-")[0]) / 1e9
+                return version if created > newer_than else None
+        return None
+
+    def load(self, version):
+        """
+        Snapshot dict with arrays mapped read-only; None if the version
+        has been pruned
+        """
+        path = os.path.join(self.root, version)
+        try:
+            with open(os.path.join(path, "meta.json"), "rb") as f:
+                meta = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+        def mapped(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        rollups = {
+            link: RollupPyramid.from_arrays(
+                mapped(f"rollup.{link}.raw.npy"),
+                {
+                    level: (factor, mapped(f"rollup.{link}.{level}.npy"))
+                    for level, factor in info["levels"].items()
+                },
+                info["slot_sec"]
+            )
+            for link, info in meta["rollups"].items()
+        }
+
+        heatmaps = {
+            int(bin_ms): {**hm, "matrix": mapped(f"heatmap.{bin_ms}.npy")}
+            for bin_ms, hm in meta["heatmaps"].items()
+        }
+
+        return {
+            "version": version,
+            "key": tuple(meta["key"]),
+            "params": meta["params"],
+            "submitted_at": meta["submitted_at"],
+            "result": meta["result"],
+            "artifacts": {
+                "sla": meta["sla"],
+                "rollups": rollups,
+                "capacity": meta["capacity"],
+                "pipeline": meta.get("pipeline", {}),
+                "heatmaps": heatmaps
+            }
+        }
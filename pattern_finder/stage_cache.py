@@ -0,0 +1,223 @@
+import os
+import pickle
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def digest(*parts):
+    """
+    Stable hex digest of plain values (str / numbers / tuples / dicts
+    of those) through their repr
+    """
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def array_digest(values):
+    """
+    Digest of an array's dtype, shape and bytes
+    """
+    values = np.ascontiguousarray(values)
+    h = hashlib.sha1(f"{values.dtype.str}:{values.shape};".encode())
+    h.update(values.data)
+    return h.hexdigest()
+
+
+def file_fingerprint(path):
+    """
+    Name, size and mtime of a file (one stat, no read); None if missing
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class StageCache:
+    """
+    Content-addressed on-disk cache of stage results
+
+    Keys are digests of everything a result depends on (input file
+    fingerprints, config, upstream keys), so an entry never goes stale:
+    changed inputs simply give a new key. Entries are immutable once
+    written and shared by processes. Arrays are stored as .npy and come
+    back as read-only memmaps; anything else is pickled.
+
+    Besides keyed entries, `latest(name)` keeps one mutable slot per
+    name for results that are updated incrementally from the previous
+    run rather than looked up exactly.
+
+    Layout:
+        <root>/<key[:2]>/<key>/value.npy | value.pkl
+        <root>/latest/<name>.pkl
+    """
+
+    def __init__(self, root, max_bytes=1024 * 2 ** 20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._bypass = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _tmp(self, path):
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @contextmanager
+    def bypassed(self):
+        """
+        Every lookup (keyed and latest) misses while active, so the
+        stages inside do their full work, e.g. under a profiler.
+        Results are still stored.
+        """
+        with self._lock:
+            self._bypass += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._bypass -= 1
+
+    # ----------------------------
+    # Keyed entries
+    # ----------------------------
+    def get(self, key):
+        """
+        Stored value, or None on a miss
+        """
+        if self._bypass:
+            return None
+
+        path = self._path(key)
+        try:
+            if os.path.exists(os.path.join(path, "value.npy")):
+                value = np.load(os.path.join(path, "value.npy"), mmap_mode="r")
+            else:
+                with open(os.path.join(path, "value.pkl"), "rb") as f:
+                    value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self._count(False)
+            return None
+
+        # Directory mtime is the recency used by prune()
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self._count(True)
+        return value
+
+    def put(self, key, value):
+        if value is None:
+            return
+
+        path = self._path(key)
+        if os.path.isdir(path):
+            return
+
+        tmp = self._tmp(path)
+        os.makedirs(tmp, exist_ok=True)
+        if isinstance(value, np.ndarray):
+            np.save(os.path.join(tmp, "value.npy"), value)
+        else:
+            with open(os.path.join(tmp, "value.pkl"), "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    # ----------------------------
+    # Latest slots
+    # ----------------------------
+    def latest(self, name):
+        if self._bypass:
+            return None
+
+        try:
+            with open(os.path.join(self.root, "latest", f"{name}.pkl"), "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set_latest(self, name, value):
+        path = os.path.join(self.root, "latest", f"{name}.pkl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp = self._tmp(path)
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    # ----------------------------
+    # Size limit
+    # ----------------------------
+    def _entries(self):
+        try:
+            shards = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for shard in shards:
+            shard_dir = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    size = sum(
+                        os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+                    )
+                    entries.append((os.path.getmtime(path), size, path))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def prune(self):
+        """
+        Drops least recently used entries until the cache fits
+        max_bytes. Returns the number removed.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling import rolling_max, rolling_mean, rolling_stats, rolling_sum
+
+
+def spiky(n=200_000, seed=0):
+    """
+    Mostly idle traffic with rare large bursts and a busy stretch
+    """
+    rng = np.random.default_rng(seed)
+    x = np.zeros(n)
+    x[rng.integers(0, n, n // 400)] = rng.uniform(1e5, 1e6, n // 400)
+    x[: n // 4] = rng.gamma(1.0, 1e5, n // 4)
+    return x
+
+
+def idle_bursts(n=200):
+    return np.tile([0.0] * 10 + [1e6] * 3, -(-n // 13))[:n]
+
+
+@pytest.mark.parametrize("series", [spiky(), idle_bursts()], ids=["spiky", "idle_bursts"])
+@pytest.mark.parametrize("window", [1, 3, 5, 20])
+def test_matches_pandas(series, window):
+    expected = pd.Series(series).rolling(window, min_periods=1)
+    stats = rolling_stats(series, window)
+
+    scale = np.abs(series).max()
+    np.testing.assert_allclose(stats["mean"], expected.mean(), rtol=0, atol=1e-12 * scale)
+    np.testing.assert_allclose(stats["sum"], expected.sum(), rtol=0, atol=1e-12 * scale * window)
+    np.testing.assert_allclose(stats["std"], expected.std().fillna(0), rtol=0, atol=1e-9 * scale)
+    np.testing.assert_array_equal(stats["max"], expected.max())
+
+
+@pytest.mark.parametrize("window", [5, 20, 1000])
+def test_idle_windows_are_exact(window):
+    series = spiky()
+    stats = rolling_stats(series, window)
+
+    # Windows containing only zeros
+    idle = rolling_max(series, window) == 0
+    assert idle.any()
+    assert (stats["mean"][idle] == 0).all()
+    assert (stats["std"][idle] == 0).all()
+    assert (stats["mean"] >= 0).all()
+
+
+def test_rows_and_short_inputs():
+    rows = np.vstack([spiky(5000, seed=1), spiky(5000, seed=2)])
+    np.testing.assert_allclose(
+        rolling_mean(rows, 7)[1], pd.Series(rows[1]).rolling(7, min_periods=1).mean(),
+        rtol=0, atol=1e-6
+    )
+    np.testing.assert_allclose(rolling_sum([1.0, 2.0, 3.0], 10), [1.0, 3.0, 6.0])
+    assert rolling_stats(np.array([]), 5)["std"].shape == (0,)
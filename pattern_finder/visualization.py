@@ -1,12 +1,14 @@
 # visualization.py
-
-import matplotlib.pyplot as plt
-import seaborn as sns
-import networkx as nx
+#
+# Plotting libraries are imported inside the methods: they take most of
+# the package's import time and the API never plots.
 
 
 class Visualizer:
     def save_heatmap(self, corr_df, output_path):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(10, 8))
         sns.heatmap(corr_df, cmap="coolwarm", square=True)
         plt.title("Cell Correlation Heatmap")
@@ -15,6 +17,9 @@ class Visualizer:
         plt.close()
 
     def save_topology_graph(self, link_map, confidences, output_path):
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         G = nx.Graph()
 
         for link, cells in link_map.items():